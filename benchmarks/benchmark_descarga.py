@@ -0,0 +1,78 @@
+######################################################################
+# BENCHMARK: DESCARGA DE RESULTADOS CON collect() FRENTE A ARROW
+#
+# Uso (desde la raíz del repositorio):
+#   python benchmarks/benchmark_descarga.py --credenciales ruta/snowflake_credentials.json
+######################################################################
+
+# Librerias
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import conexion
+import datos_exportaciones as exportaciones
+
+# Función para medir los métodos de descarga sobre la consulta de exportaciones sin filtros (informe Colombia)
+def comparar_metodos_descarga(session, years, metodos=('filas', 'arrow', 'lotes'), repeticiones=3):
+    """
+    Ejecuta get_data_exportaciones sin filtros geográficos con cada método de descarga y mide tiempo y memoria.
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    years (list): Lista de años a consultar.
+    metodos (tuple): Métodos de descarga de conexion.ejecutar_consulta a comparar.
+    repeticiones (int): Número de repeticiones por método; se reporta la mejor.
+
+    Retorna:
+    list: Diccionarios con el método, filas, mejor tiempo (s), pico de memoria de Python (MB) y memoria del DataFrame (MB).
+    """
+
+    # Desactivar la caché de resultados de Snowflake para que todas las repeticiones ejecuten la consulta
+    session.sql("ALTER SESSION SET USE_CACHED_RESULT = FALSE").collect()
+
+    resultados = []
+    metodo_original = conexion.METODO_DESCARGA
+    try:
+        for metodo in metodos:
+            conexion.METODO_DESCARGA = metodo
+            tiempos = []
+            pico = 0
+            for _ in range(repeticiones):
+                tracemalloc.start()
+                inicio = time.perf_counter()
+                data = exportaciones.get_data_exportaciones(session, years=years)
+                tiempos.append(time.perf_counter() - inicio)
+                pico = max(pico, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            resultados.append({
+                'metodo': metodo,
+                'filas': len(data),
+                'tiempo_s': min(tiempos),
+                'pico_python_mb': pico / 1e6,
+                'memoria_df_mb': data.memory_usage(deep=True).sum() / 1e6,
+            })
+    finally:
+        conexion.METODO_DESCARGA = metodo_original
+        session.sql("ALTER SESSION UNSET USE_CACHED_RESULT").collect()
+
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara collect() frente a la descarga Arrow de resultados de Snowflake.")
+    parser.add_argument('--credenciales', default=None, help="Archivo JSON de credenciales de Snowflake.")
+    parser.add_argument('--years', nargs='+', default=['2022', '2023'], help="Años a consultar.")
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    session = conexion.crear_sesion(args.credenciales)
+    try:
+        for fila in comparar_metodos_descarga(session, args.years, repeticiones=args.repeticiones):
+            print(f"{fila['metodo']:>6}: {fila['filas']:>9,} filas | {fila['tiempo_s']:8.2f} s | "
+                  f"pico Python {fila['pico_python_mb']:9.1f} MB | DataFrame {fila['memoria_df_mb']:9.1f} MB")
+    finally:
+        session.close()
\ No newline at end of file
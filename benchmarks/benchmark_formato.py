@@ -0,0 +1,104 @@
+######################################################################
+# BENCHMARK: FORMATO DE NÚMEROS EN ESPAÑOL CELDA POR CELDA FRENTE A VECTORIAL
+#
+# Uso (desde la raíz del repositorio):
+#   python benchmarks/benchmark_formato.py --filas 100000
+######################################################################
+
+# Librerias
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import formato
+
+# Función para crear una tabla numérica con la forma de las tablas de los informes
+def crear_tabla(filas, semilla=0):
+    """
+    Parámetros:
+    filas (int): Número de filas.
+    semilla (int): Semilla aleatoria.
+
+    Retorna:
+    DataFrame: Columnas de valores en USD de dos años, variación y participación (con ceros, nulos e infinitos).
+    """
+    rng = np.random.default_rng(semilla)
+    year1 = np.round(rng.lognormal(12, 3, filas), 2) * (rng.random(filas) > 0.05)
+    year2 = np.round(rng.lognormal(12, 3, filas), 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variacion = (year2 - year1) / year1 * 100
+    return pd.DataFrame({
+        'CATEGORIA': [f'Categoría {i}' for i in range(filas)],
+        '2023 (USD FOB)': year1,
+        '2024 (USD FOB)': year2,
+        'Variación (%)': variacion,
+        'Participación 2024 (%)': year2 / year2.sum() * 100,
+    })
+
+# Función con el formato original: format() por celda y reemplazo de separadores por celda
+def formato_por_celda(tabla):
+    """
+    Parámetros:
+    tabla (DataFrame): Tabla de crear_tabla.
+
+    Retorna:
+    DataFrame: Tabla formateada como lo hacían las funciones de tablas de datos_exportaciones.
+    """
+    tabla = tabla.copy()
+    tabla[['2023 (USD FOB)', '2024 (USD FOB)']] = tabla[['2023 (USD FOB)', '2024 (USD FOB)']].apply(lambda columna: columna.map('{:,.0f}'.format))
+    tabla[['Variación (%)', 'Participación 2024 (%)']] = tabla[['Variación (%)', 'Participación 2024 (%)']].apply(lambda columna: columna.map('{:.1f}%'.format))
+    tabla = tabla.astype(str)
+    for col in tabla.columns[1:]:
+        tabla[col] = tabla[col].apply(lambda x: x.replace(',', 'X').replace('.', ',').replace('X', '.'))
+    return tabla
+
+# Función con el formato vectorial del módulo formato
+def formato_vectorial(tabla):
+    """
+    Parámetros:
+    tabla (DataFrame): Tabla de crear_tabla.
+
+    Retorna:
+    DataFrame: Tabla formateada con formato.formatear_columnas.
+    """
+    tabla = tabla.copy()
+    formato.formatear_columnas(tabla, ['2023 (USD FOB)', '2024 (USD FOB)'])
+    formato.formatear_columnas(tabla, ['Variación (%)', 'Participación 2024 (%)'], decimales=1, miles=False, sufijo='%')
+    tabla['CATEGORIA'] = tabla['CATEGORIA'].astype(str)
+    return tabla
+
+# Función para medir ambos métodos y verificar que producen el mismo texto
+def comparar_formatos(filas, repeticiones=3):
+    """
+    Parámetros:
+    filas (int): Número de filas de la tabla.
+    repeticiones (int): Número de repeticiones por método; se reporta la mejor.
+
+    Retorna:
+    list: Diccionarios con el método, el mejor tiempo (s) y si el resultado es idéntico al formato original.
+    """
+    tabla = crear_tabla(filas)
+    referencia = formato_por_celda(tabla)
+    resultados = []
+    for nombre, metodo in [('por celda', formato_por_celda), ('vectorial', formato_vectorial)]:
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultado = metodo(tabla)
+            tiempos.append(time.perf_counter() - inicio)
+        resultados.append({'metodo': nombre, 'tiempo_s': min(tiempos), 'identico': resultado.equals(referencia)})
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara el formato de números en español por celda frente al formato vectorial.")
+    parser.add_argument('--filas', type=int, default=100000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    for fila in comparar_formatos(args.filas, args.repeticiones):
+        print(f"{fila['metodo']:>10}: {fila['tiempo_s']:8.3f} s | idéntico al original: {fila['identico']}")
\ No newline at end of file
@@ -0,0 +1,97 @@
+######################################################################
+# BENCHMARK: TABLAS DE WORD CELDA POR CELDA FRENTE A XML EN UNA PASADA
+#
+# Uso (desde la raíz del repositorio):
+#   python benchmarks/benchmark_tablas.py --filas 200 --tablas 10
+######################################################################
+
+# Librerias
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from docx import Document
+from lxml import etree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import formato
+import documentos
+
+# Función para crear un resultado numérico con la forma de las tablas resumen de los informes
+def crear_tabla(filas, semilla=0):
+    """
+    Parámetros:
+    filas (int): Número de filas regulares (se agregan 'Otros' y 'Total').
+    semilla (int): Semilla aleatoria.
+
+    Retorna:
+    formato.TablaResultado: Tabla con etiquetas, valores en USD de dos años, variación y participación.
+    """
+    rng = np.random.default_rng(semilla)
+    year1 = np.round(rng.lognormal(12, 3, filas + 2), 2)
+    year2 = np.round(rng.lognormal(12, 3, filas + 2), 2)
+    year1[-1], year2[-1] = year1[:-1].sum(), year2[:-1].sum()
+    datos = pd.DataFrame({
+        'Sector': [f'Sector {i}' for i in range(filas)] + ['Otros', 'Total'],
+        '2023 (USD FOB)': year1,
+        '2024 (USD FOB)': year2,
+        'Variación (%)': (year2 - year1) / year1 * 100,
+        'Participación 2024 (%)': year2 / year2[-1] * 100,
+    })
+    formatos = {'2023 (USD FOB)': formato.FORMATO_VALOR, '2024 (USD FOB)': formato.FORMATO_VALOR,
+                'Variación (%)': formato.FORMATO_PORCENTAJE, 'Participación 2024 (%)': formato.FORMATO_PORCENTAJE}
+    return formato.TablaResultado(datos, formato.roles_por_etiqueta(datos['Sector']), formatos)
+
+# Función para agregar las tablas a un documento nuevo con uno de los dos métodos
+def crear_documento(tablas, xml):
+    """
+    Parámetros:
+    tablas (list): Tablas de crear_tabla.
+    xml (bool): Valor de documentos.TABLAS_XML.
+
+    Retorna:
+    Document: Documento con las tablas.
+    """
+    documentos.TABLAS_XML = xml
+    doc = Document()
+    documentos.estilos(doc)
+    for tabla in tablas:
+        documentos.add_table(doc, tabla, 'Table Grid')
+    return doc
+
+# Función para medir ambos métodos y verificar que producen el mismo XML
+def comparar_tablas(filas, numero_tablas, repeticiones=3):
+    """
+    Parámetros:
+    filas (int): Número de filas de cada tabla.
+    numero_tablas (int): Número de tablas por documento.
+    repeticiones (int): Número de repeticiones por método; se reporta la mejor.
+
+    Retorna:
+    list: Diccionarios con el método, el mejor tiempo (s) y si el XML del documento es idéntico al de add_table celda por celda.
+    """
+    tablas = [crear_tabla(filas, semilla) for semilla in range(numero_tablas)]
+    referencia = etree.tostring(crear_documento(tablas, xml=False).element.body)
+    resultados = []
+    for nombre, xml in [('celda por celda', False), ('xml', True)]:
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            doc = crear_documento(tablas, xml)
+            tiempos.append(time.perf_counter() - inicio)
+        resultados.append({'metodo': nombre, 'tiempo_s': min(tiempos), 'identico': etree.tostring(doc.element.body) == referencia})
+    documentos.TABLAS_XML = True
+    return resultados
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara add_table celda por celda frente a la construcción del XML de las tablas en una pasada.")
+    parser.add_argument('--filas', type=int, default=200)
+    parser.add_argument('--tablas', type=int, default=10)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    for fila in comparar_tablas(args.filas, args.tablas, args.repeticiones):
+        print(f"{fila['metodo']:>15}: {fila['tiempo_s']:8.3f} s | XML idéntico al original: {fila['identico']}")
\ No newline at end of file
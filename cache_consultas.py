@@ -0,0 +1,345 @@
+# Librerias
+import os
+import json
+import time
+import uuid
+import hashlib
+import inspect
+import functools
+from datetime import date
+import pandas as pd
+import pyarrow as pa
+
+#########################################################
+# FUNCIONES PARA GUARDAR EN DISCO LOS RESULTADOS DE CONSULTAS
+#########################################################
+
+# Parámetros de la caché (se pueden cambiar con variables de entorno)
+# Carpeta donde se guardan los resultados
+DIRECTORIO_CACHE = os.environ.get('DOCUMENTOS_CACHE_DIR', '.cache_consultas')
+# Activar o desactivar la caché
+CACHE_ACTIVA = os.environ.get('DOCUMENTOS_CACHE', '1') != '0'
+# Tiempo de vida de cada resultado en segundos (24 horas)
+TTL_SEGUNDOS = int(os.environ.get('DOCUMENTOS_CACHE_TTL', 24 * 60 * 60))
+# Tamaño máximo de la carpeta en bytes (2 GB); al superarlo se eliminan los resultados usados hace más tiempo
+TAMANO_MAXIMO_BYTES = int(os.environ.get('DOCUMENTOS_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+# Compresión de los archivos Arrow IPC: None, 'lz4' o 'zstd'.
+# Sin compresión los archivos se leen con memory map y varios procesos comparten las mismas páginas;
+# con compresión ocupan menos disco, pero cada lectura descomprime una copia privada.
+COMPRESION = os.environ.get('DOCUMENTOS_CACHE_COMPRESION') or None
+# Versión del formato de la caché: cambiarla invalida todos los resultados guardados
+VERSION_CACHE = 1
+# Mes del año siguiente a partir del cual un año se considera cerrado (sus datos ya no cambian)
+MES_CIERRE = int(os.environ.get('DOCUMENTOS_CACHE_MES_CIERRE', 4))
+# Plazo en segundos para terminar de escribir un resultado: los archivos sin metadatos más recientes se consideran en escritura
+PLAZO_ESCRITURA_SEGUNDOS = int(os.environ.get('DOCUMENTOS_CACHE_PLAZO_ESCRITURA', 10 * 60))
+# Subcarpeta de los resultados de años cerrados: no vencen ni se eliminan por tamaño, solo con invalidar_cache
+SUBDIRECTORIO_PERMANENTE = 'permanente'
+
+# Función para saber si un año o periodo está cerrado
+def es_year_cerrado(year, hoy=None):
+    """
+    Indica si un año (e.g., '2023') o un periodo de un año (e.g., '2023(Ene-Abr)') está cerrado, es decir,
+    si ya pasó el mes MES_CIERRE del año siguiente y sus datos no van a cambiar.
+
+    Parámetros:
+    year (str): Año o periodo.
+    hoy (date): Fecha de referencia. Por defecto la fecha actual.
+
+    Retorna:
+    bool: True si el año está cerrado.
+    """
+    hoy = hoy or date.today()
+    try:
+        anio = int(str(year).split('(')[0])
+    except ValueError:
+        return False
+    return (hoy.year, hoy.month) >= (anio + 1, MES_CIERRE)
+
+# Función para obtener la carpeta de los resultados temporales o permanentes
+def _directorio(permanente=False):
+    return os.path.join(DIRECTORIO_CACHE, SUBDIRECTORIO_PERMANENTE) if permanente else DIRECTORIO_CACHE
+
+# Función para normalizar un argumento de filtro
+def normalizar_argumento(valor):
+    """
+    Normaliza un argumento para que filtros equivalentes generen la misma llave.
+
+    Parámetros:
+    valor: Valor del argumento (lista, None o escalar).
+
+    Retorna:
+    Valor normalizado: listas ordenadas y sin duplicados; listas vacías como None.
+    """
+    if isinstance(valor, (list, tuple, set)):
+        valores = sorted({str(v) for v in valor})
+        return valores if valores else None
+    return valor
+
+# Función para calcular la llave de un resultado
+def clave_cache(nombre, argumentos):
+    """
+    Calcula la llave de un resultado a partir del nombre de la función, de sus argumentos normalizados y de
+    datos_exportaciones.TIPOS_COMPACTOS (los resultados guardados con y sin tipos compactos no se mezclan).
+
+    Parámetros:
+    nombre (str): Nombre de la función que obtiene los datos.
+    argumentos (dict): Argumentos de la función, sin la sesión.
+
+    Retorna:
+    str: Llave hexadecimal del resultado.
+    """
+    # Se importa aquí porque datos_exportaciones importa este módulo; al calcular una llave ya está cargado
+    import datos_exportaciones
+    contenido = {'version': VERSION_CACHE, 'tipos_compactos': datos_exportaciones.TIPOS_COMPACTOS, 'funcion': nombre,
+                 'argumentos': {k: normalizar_argumento(v) for k, v in sorted(argumentos.items())}}
+    texto = json.dumps(contenido, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+# Función para leer un resultado de la caché
+def leer_cache(clave, ttl=None):
+    """
+    Lee un resultado guardado si existe y no ha vencido. Los DataFrames se leen con memory map y sus columnas numéricas
+    sin nulos no se copian (son de solo lectura: las funciones que las modifican deben trabajar sobre una copia).
+    Los resultados permanentes (años cerrados) no vencen.
+
+    Parámetros:
+    clave (str): Llave del resultado.
+    ttl (int): Tiempo de vida en segundos. Por defecto TTL_SEGUNDOS; None en ambos significa sin vencimiento.
+
+    Retorna:
+    Resultado guardado (DataFrame, tupla de DataFrames o escalar) o None si no existe o venció.
+    """
+    ttl = TTL_SEGUNDOS if ttl is None else ttl
+    try:
+        # Buscar primero entre los resultados permanentes
+        directorio = _directorio(permanente=True)
+        ruta_meta = os.path.join(directorio, f'{clave}.json')
+        if not os.path.exists(ruta_meta):
+            directorio = _directorio()
+            ruta_meta = os.path.join(directorio, f'{clave}.json')
+        with open(ruta_meta, 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        if ttl and not meta.get('permanente') and time.time() - meta['creado'] > ttl:
+            return None
+
+        # Leer los DataFrames con memory map sin copiar los datos: con split_blocks cada columna numérica sin nulos es una vista
+        # de solo lectura sobre las páginas del archivo (compartidas entre procesos) y self_destruct libera la tabla Arrow a medida
+        # que se convierte. El mapa se mantiene mientras alguna columna lo use, aunque el archivo se elimine después.
+        frames = []
+        for archivo in meta['archivos']:
+            tabla = pa.ipc.open_file(pa.memory_map(os.path.join(directorio, archivo), 'r')).read_all()
+            frames.append(tabla.to_pandas(split_blocks=True, self_destruct=True))
+            del tabla
+
+        # Marcar el resultado como usado recientemente (para el orden LRU)
+        os.utime(ruta_meta)
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        # Resultado inexistente, eliminado por otro proceso o incompleto
+        return None
+
+    if meta['tipo'] == 'escalar':
+        return meta['valor']
+    if meta['tipo'] == 'tupla':
+        return tuple(frames)
+    return frames[0]
+
+# Función para escribir un archivo de forma atómica
+def _escribir_atomico(ruta, escribir):
+    ruta_temporal = f'{ruta}.{uuid.uuid4().hex}.tmp'
+    try:
+        escribir(ruta_temporal)
+        os.replace(ruta_temporal, ruta)
+    finally:
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+
+# Función para guardar un resultado en la caché
+def escribir_cache(clave, resultado, permanente=False):
+    """
+    Guarda un resultado en disco como archivos Arrow IPC más un archivo JSON de metadatos.
+
+    Parámetros:
+    clave (str): Llave del resultado.
+    resultado: DataFrame, tupla de DataFrames o escalar (por ejemplo el número de empresas).
+    permanente (bool): Si es True (datos de años cerrados), el resultado no vence ni se elimina por tamaño.
+    """
+    directorio = _directorio(permanente)
+    os.makedirs(directorio, exist_ok=True)
+
+    # 1. Clasificar el resultado
+    if isinstance(resultado, pd.DataFrame):
+        tipo, frames = 'dataframe', [resultado]
+    elif isinstance(resultado, tuple):
+        tipo, frames = 'tupla', list(resultado)
+    else:
+        tipo, frames = 'escalar', []
+
+    # 2. Escribir los DataFrames
+    opciones = pa.ipc.IpcWriteOptions(compression=COMPRESION)
+    archivos = []
+    for i, frame in enumerate(frames):
+        archivo = f'{clave}_{i}.arrow'
+        tabla = pa.Table.from_pandas(frame, preserve_index=False)
+
+        def escribir(ruta, tabla=tabla):
+            with pa.OSFile(ruta, 'wb') as sink:
+                with pa.ipc.new_file(sink, tabla.schema, options=opciones) as writer:
+                    writer.write_table(tabla)
+
+        _escribir_atomico(os.path.join(directorio, archivo), escribir)
+        archivos.append(archivo)
+
+    # 3. Escribir los metadatos al final: el resultado solo es visible cuando está completo
+    meta = {'tipo': tipo, 'archivos': archivos, 'creado': time.time(), 'permanente': permanente,
+            'valor': int(resultado) if tipo == 'escalar' else None}
+
+    def escribir_meta(ruta):
+        with open(ruta, 'w', encoding='utf-8') as file:
+            json.dump(meta, file)
+
+    _escribir_atomico(os.path.join(directorio, f'{clave}.json'), escribir_meta)
+
+    # 4. Respetar el tamaño máximo de la carpeta
+    depurar_cache()
+
+# Función para eliminar un resultado de la caché
+def eliminar_cache(clave, permanente=False):
+    """
+    Elimina un resultado (metadatos y archivos Arrow) de la caché.
+
+    Parámetros:
+    clave (str): Llave del resultado.
+    permanente (bool): Si es True, elimina el resultado de la carpeta de resultados permanentes.
+    """
+    directorio = _directorio(permanente)
+    for archivo in os.listdir(directorio):
+        if archivo.startswith(clave):
+            try:
+                os.remove(os.path.join(directorio, archivo))
+            except OSError:
+                pass
+
+# Función para eliminar los resultados vencidos y los menos usados
+def depurar_cache(tamano_maximo=None):
+    """
+    Elimina los resultados vencidos y, si la carpeta supera el tamaño máximo, los usados hace más tiempo (LRU).
+    Los resultados permanentes no se tienen en cuenta.
+
+    Parámetros:
+    tamano_maximo (int): Tamaño máximo en bytes. Por defecto TAMANO_MAXIMO_BYTES.
+    """
+    tamano_maximo = TAMANO_MAXIMO_BYTES if tamano_maximo is None else tamano_maximo
+    if not os.path.isdir(DIRECTORIO_CACHE):
+        return
+
+    # 1. Calcular el tamaño y el último uso de cada resultado
+    entradas = {}
+    for archivo in os.listdir(DIRECTORIO_CACHE):
+        clave = archivo.split('.')[0].split('_')[0]
+        ruta = os.path.join(DIRECTORIO_CACHE, archivo)
+        if not os.path.isfile(ruta):
+            continue
+        try:
+            estado = os.stat(ruta)
+        except OSError:
+            continue
+        entrada = entradas.setdefault(clave, {'tamano': 0, 'ultimo_uso': None, 'ultima_escritura': 0})
+        entrada['tamano'] += estado.st_size
+        entrada['ultima_escritura'] = max(entrada['ultima_escritura'], estado.st_mtime)
+        if archivo.endswith('.json'):
+            entrada['ultimo_uso'] = estado.st_mtime
+
+    # 2. Los resultados sin metadatos pueden estar escribiéndose en otro hilo o proceso: se respetan durante el plazo
+    # de escritura y, después, se tratan como restos de una escritura interrumpida usados por última vez al escribirse
+    ahora = time.time()
+    for clave in list(entradas):
+        entrada = entradas[clave]
+        if entrada['ultimo_uso'] is None:
+            if ahora - entrada['ultima_escritura'] < PLAZO_ESCRITURA_SEGUNDOS:
+                del entradas[clave]
+                continue
+            entrada['ultimo_uso'] = entrada['ultima_escritura']
+
+    # 3. Eliminar los vencidos y luego los menos usados hasta respetar el tamaño máximo
+    total = sum(entrada['tamano'] for entrada in entradas.values())
+    for clave, entrada in sorted(entradas.items(), key=lambda item: item[1]['ultimo_uso']):
+        vencido = TTL_SEGUNDOS and ahora - entrada['ultimo_uso'] > TTL_SEGUNDOS
+        if total <= tamano_maximo and not vencido:
+            continue
+        eliminar_cache(clave)
+        total -= entrada['tamano']
+
+# Función para vaciar la caché
+def limpiar_cache(permanentes=True):
+    """
+    Elimina los resultados guardados en la caché.
+
+    Parámetros:
+    permanentes (bool): Si es True, también elimina los resultados permanentes de años cerrados.
+    """
+    directorios = [_directorio(), _directorio(permanente=True)] if permanentes else [_directorio()]
+    for directorio in directorios:
+        if not os.path.isdir(directorio):
+            continue
+        for archivo in os.listdir(directorio):
+            ruta = os.path.join(directorio, archivo)
+            if not os.path.isfile(ruta):
+                continue
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+# Función para invalidar los resultados permanentes de años cerrados
+def invalidar_cache():
+    """
+    Elimina los resultados permanentes de años cerrados, por ejemplo después de una corrección de la base de datos.
+    """
+    directorio = _directorio(permanente=True)
+    if os.path.isdir(directorio):
+        for archivo in os.listdir(directorio):
+            try:
+                os.remove(os.path.join(directorio, archivo))
+            except OSError:
+                pass
+
+# Decorador para guardar en disco el resultado de una función de consulta
+def cache_disco(funcion):
+    """
+    Envuelve una función de consulta cuyo primer argumento es la sesión de Snowflake para que su resultado
+    se guarde en disco, con una llave calculada a partir de los demás argumentos normalizados.
+    Si la función recibe years y todos los años están cerrados, el resultado se guarda de forma permanente.
+
+    Parámetros:
+    funcion (callable): Función de consulta (e.g., get_data_exportaciones).
+
+    Retorna:
+    callable: Función con el mismo contrato que consulta primero la caché.
+    """
+    firma = inspect.signature(funcion)
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if not CACHE_ACTIVA:
+            return funcion(*args, **kwargs)
+
+        # 1. Calcular la llave con los argumentos normalizados (sin la sesión)
+        argumentos = firma.bind(*args, **kwargs)
+        argumentos.apply_defaults()
+        argumentos = dict(argumentos.arguments)
+        argumentos.pop('session', None)
+        clave = clave_cache(funcion.__name__, argumentos)
+
+        # 2. Consultar la caché
+        resultado = leer_cache(clave)
+        if resultado is not None:
+            return resultado
+
+        # 3. Ejecutar la consulta y guardar el resultado (de forma permanente si solo incluye años cerrados)
+        resultado = funcion(*args, **kwargs)
+        years = argumentos.get('years')
+        escribir_cache(clave, resultado, permanente=bool(years) and all(es_year_cerrado(year) for year in years))
+        return resultado
+
+    return envoltura
\ No newline at end of file
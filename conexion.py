@@ -0,0 +1,114 @@
+# Librerias
+import os
+import json
+import time
+import threading
+from snowflake.snowpark import Session
+import pandas as pd
+import trazas
+
+###########################################################
+# FUNCIONES PARA CONECTARSE A SNOWFLAKE Y EJECUTAR CONSULTAS
+###########################################################
+
+# Método por defecto para descargar resultados: 'arrow' (to_pandas), 'lotes' (to_pandas_batches) o 'filas' (collect)
+METODO_DESCARGA = 'arrow'
+# Tipo de resultado del trabajo asíncrono de Snowpark para cada método de descarga
+TIPOS_RESULTADO = {'arrow': 'pandas', 'lotes': 'pandas_batches', 'filas': 'row'}
+# Número máximo de caracteres de la consulta que se guardan en la traza
+LONGITUD_MAXIMA_CONSULTA = 500
+
+# Función para crear una sesión de Snowflake a partir de un archivo de credenciales
+def crear_sesion(ruta_credenciales=None):
+    """
+    Crea una sesión de Snowpark a partir de un archivo JSON de credenciales, igual que en el notebook de creación de tablas.
+
+    Parámetros:
+    ruta_credenciales (str): Ruta al archivo JSON con las llaves ACCOUNT_SNOWFLAKE, USER_SNOWFLAKE, PASSWORD_SNOWFLAKE y ROLE_SNOWFLAKE.
+    Por defecto se usa Desktop/Conn/snowflake_credentials.json en la carpeta del usuario.
+
+    Retorna:
+    snowflake.snowpark.Session: Sesión activa en Snowflake.
+    """
+
+    # 1. Definir la ruta al archivo de credenciales
+    if ruta_credenciales is None:
+        ruta_credenciales = os.path.join(os.path.expanduser("~"), "Desktop", "Conn", "snowflake_credentials.json")
+
+    # 2. Leer las credenciales
+    with open(ruta_credenciales, 'r') as file:
+        credentials = json.load(file)
+
+    # 3. Definir los parámetros de conexión y crear la sesión
+    connection_parameters = {
+        "account": credentials["ACCOUNT_SNOWFLAKE"],
+        "user": credentials["USER_SNOWFLAKE"],
+        "password": credentials["PASSWORD_SNOWFLAKE"],
+        "role": credentials["ROLE_SNOWFLAKE"]
+    }
+    return Session.builder.configs(connection_parameters).create()
+
+# Función para ejecutar una consulta y obtener un DataFrame de pandas
+def ejecutar_consulta(session, query, metodo=None, params=None):
+    """
+    Ejecuta una consulta SQL en Snowflake y devuelve el resultado como DataFrame de pandas.
+
+    Con el método 'arrow' los resultados llegan como lotes Arrow y se convierten directamente en columnas de pandas,
+    sin crear un objeto Row de Python por cada fila como ocurre con collect().
+
+    Cada consulta lleva el QUERY_TAG del informe en curso y se registra en su traza (ver trazas.py) con el
+    query ID de Snowflake, el tiempo total y de conversión a pandas, el número de filas y los bytes aproximados.
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    query (str): Consulta SQL a ejecutar.
+    metodo (str): 'arrow' (to_pandas), 'lotes' (to_pandas_batches) o 'filas' (collect). Por defecto METODO_DESCARGA.
+    params (list): Valores de las variables de enlace (?) de la consulta, en orden (ver consultas.construir_filtros_sql).
+
+    Retorna:
+    DataFrame: Resultado de la consulta. Si no hay filas, conserva los nombres de las columnas (excepto con 'filas').
+    """
+
+    metodo = metodo or METODO_DESCARGA
+    if metodo not in TIPOS_RESULTADO:
+        raise ValueError("El método de descarga debe ser 'arrow', 'lotes' o 'filas'")
+
+    # 1. Enviar la consulta con el QUERY_TAG del informe en curso y esperar el resultado
+    query_tag = trazas.query_tag()
+    inicio_reloj = time.time()
+    inicio = time.perf_counter()
+    job = session.sql(query, params=params or None).collect_nowait(statement_params={'QUERY_TAG': query_tag})
+    resultado = job.result(TIPOS_RESULTADO[metodo])
+    fin_consulta = time.perf_counter()
+
+    # 2. Convertir el resultado en un DataFrame de pandas
+    if metodo == 'arrow':
+        # Descarga columnar en un solo DataFrame
+        data = resultado
+    elif metodo == 'lotes':
+        # Descarga columnar por lotes, útil para resultados muy grandes
+        lotes = list(resultado)
+        if len(lotes) == 1:
+            data = lotes[0]
+        else:
+            data = pd.concat(lotes, ignore_index=True) if lotes else pd.DataFrame()
+    else:
+        # Descarga fila por fila (método original)
+        data = pd.DataFrame(resultado)
+    fin = time.perf_counter()
+
+    # 3. Registrar la consulta en la traza del informe en curso (trazas.finalizar_traza la completa con los tiempos del servidor si recibe la sesión)
+    trazas.registrar_consulta({
+        'query_id': job.query_id,
+        'query_tag': query_tag,
+        'consulta': ' '.join(query.split())[:LONGITUD_MAXIMA_CONSULTA],
+        'parametros': len(params or []),
+        'metodo': metodo,
+        'hilo': threading.current_thread().name,
+        'inicio': inicio_reloj,
+        'segundos_total': fin - inicio,
+        'segundos_conversion': fin - fin_consulta,
+        'filas': len(data),
+        'bytes': int(data.memory_usage(index=False, deep=True).sum()),
+    })
+    return data
\ No newline at end of file
@@ -0,0 +1,215 @@
+# Librerias
+import conexion
+
+######################################################
+# FUNCIONES PARA CONSTRUIR CONSULTAS SQL PARAMETRIZADAS
+######################################################
+
+# Tabla base de exportaciones
+TABLA_EXPORTACIONES = 'DOCUMENTOS_COLOMBIA.EXPORTACIONES.BASE_EXPORTACIONES'
+
+# Orden fijo de los filtros: (nombre del parámetro, columna de la tabla)
+# La columna de departamentos depende de la consulta (DEPARTAMENTO_ORIGEN o DPTO_MAS_EXPORTA_ESTRELLA)
+FILTROS = [
+    ('continentes', 'CONTINENTE'),
+    ('zonas_geograficas', 'ZONA_GEOGRAFICA'),
+    ('paises', 'PAIS_DESTINO'),
+    ('departamentos', None),
+    ('hubs', 'HUB'),
+    ('tlcs', 'TLCS'),
+    ('tipo_tlcss', 'TIPO_ACUERDO'),
+    ('tipos', 'TIPO'),
+    ('years', 'YEAR'),
+]
+
+# Función para verificar que los filtros son listas o None
+def validar_filtros(*filtros):
+    """
+    Verifica que todos los filtros sean listas o None.
+
+    Parámetros:
+    filtros: Filtros a verificar.
+    """
+    for param in filtros:
+        if param is not None and not isinstance(param, list):
+            raise ValueError("Todos los parámetros deben ser listas o None")
+
+# Función para construir una condición IN con variables de enlace
+def condicion_in(columna, valores, alias='A'):
+    """
+    Construye una condición ' AND alias.COLUMNA IN (?, ?, ...)' con un marcador por valor.
+    Los valores se ordenan y se eliminan duplicados, de modo que la misma selección produce siempre
+    el mismo texto SQL y los mismos parámetros (y aprovecha la caché de resultados de Snowflake).
+
+    Parámetros:
+    columna (str): Columna a filtrar.
+    valores (list): Valores permitidos.
+    alias (str): Alias de la tabla en la consulta.
+
+    Retorna:
+    tuple: Texto de la condición y lista de parámetros.
+    """
+    valores = sorted(set(valores), key=str)
+    marcadores = ', '.join(['?'] * len(valores))
+    return f" AND {alias}.{columna} IN ({marcadores})", valores
+
+# Función para construir las condiciones de filtro comunes a las consultas
+def construir_filtros_sql(continentes=None, zonas_geograficas=None, paises=None, departamentos=None, hubs=None, tlcs=None, tipo_tlcss=None,
+                          tipos=None, years=None, columna_departamento='DEPARTAMENTO_ORIGEN', alias='A'):
+    """
+    Construye las condiciones AND de la cláusula WHERE a partir de los filtros proporcionados, con variables de enlace.
+
+    Parámetros:
+    continentes (list): Lista de continentes a filtrar.
+    zonas_geograficas (list): Lista de zonas geográficas a filtrar.
+    paises (list): Lista de países a filtrar.
+    departamentos (list): Lista de departamentos a filtrar.
+    hubs (list): Lista de hubs a filtrar.
+    tlcs (list): Lista de tratados de libre comercio a filtrar.
+    tipo_tlcss (list): Lista de tipos de acuerdos comerciales a filtrar.
+    tipos (list): Lista de tipos de posición arancelaria a filtrar.
+    years (list): Lista de años a filtrar.
+    columna_departamento (str): Columna sobre la que se filtran los departamentos ('DEPARTAMENTO_ORIGEN' o 'DPTO_MAS_EXPORTA_ESTRELLA').
+    alias (str): Alias de la tabla en la consulta.
+
+    Retorna:
+    tuple: Condiciones SQL listas para concatenar a la consulta y lista de parámetros en el mismo orden de los marcadores.
+    """
+    valores_filtros = {
+        'continentes': continentes,
+        'zonas_geograficas': zonas_geograficas,
+        'paises': paises,
+        'departamentos': departamentos,
+        'hubs': hubs,
+        'tlcs': tlcs,
+        'tipo_tlcss': tipo_tlcss,
+        'tipos': tipos,
+        'years': years,
+    }
+    condiciones = ''
+    parametros = []
+    for nombre, columna in FILTROS:
+        valores = valores_filtros[nombre]
+        if valores:
+            condicion, valores = condicion_in(columna or columna_departamento, valores, alias)
+            condiciones += condicion
+            parametros += valores
+    return condiciones, parametros
+
+######################################################
+# TABLAS PREAGREGADAS DE EXPORTACIONES
+######################################################
+
+# Columnas por las que se puede filtrar cualquier consulta (además de la columna de departamentos de cada consulta)
+COLUMNAS_FILTRO = ['CONTINENTE', 'ZONA_GEOGRAFICA', 'PAIS_DESTINO', 'HUB', 'TLCS', 'TIPO_ACUERDO', 'TIPO', 'YEAR']
+
+# Tablas preagregadas: nombre -> (columnas de agrupación, columnas de valor sumadas, tipos de posición que conserva o None si todos)
+# Las columnas de valor conservan su nombre, de modo que SUM(A.VALOR_USD) sobre la tabla preagregada da el mismo resultado que sobre la base
+TABLAS_AGREGADAS = {
+    # Sumas por categoría y año para las tablas resumen y de subsectores
+    'DOCUMENTOS_COLOMBIA.EXPORTACIONES.AGG_EXPORTACIONES_CATEGORIAS': (
+        COLUMNAS_FILTRO + ['DEPARTAMENTO_ORIGEN', 'CADENA', 'SECTOR', 'SUBSECTOR'],
+        ['VALOR_USD', 'PESO_KG'],
+        None),
+    # Totales por empresa (NIT) y año para el número de empresas y la tabla de empresas. Solo tiene las columnas que leen
+    # esas consultas: el NIT con sus atributos estrella (razón social, sector, tipo, cadena y departamento que más exporta),
+    # que dependen solo del NIT, y las columnas de filtro, que (salvo TLCS y TIPO_ACUERDO) dependen solo del país. Por eso
+    # queda una fila por empresa, país, acuerdo y año, en lugar de una por subpartida, departamento de origen y medio de
+    # transporte: la reducción frente a la base es el número promedio de esas combinaciones por empresa, país y año, además
+    # de las filas mineras, que las consultas de empresas nunca leen (crear_tablas_agregadas devuelve ambos conteos).
+    'DOCUMENTOS_COLOMBIA.EXPORTACIONES.AGG_EXPORTACIONES_EMPRESAS': (
+        COLUMNAS_FILTRO + ['DPTO_MAS_EXPORTA_ESTRELLA', 'NIT_EXPORTADOR', 'RAZON_SOCIAL', 'SECTOR_ESTRELLA', 'TIPO_ESTRELLA', 'CADENA_ESTRELLA'],
+        ['VALOR_USD'],
+        ['No Mineras']),
+}
+
+# Usar las tablas preagregadas cuando existan y contengan las columnas de la consulta
+USAR_TABLAS_AGREGADAS = True
+
+# Tablas preagregadas disponibles en Snowflake (se consulta una vez por proceso)
+_tablas_disponibles = None
+
+# Función para crear o reemplazar las tablas preagregadas
+def crear_tablas_agregadas(session):
+    """
+    Crea o reemplaza en Snowflake las tablas preagregadas a partir de BASE_EXPORTACIONES.
+    Se debe ejecutar cada vez que se carga de nuevo la tabla base (ver el notebook de creación de tablas).
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+
+    Retorna:
+    dict: Número de filas de la tabla base y de cada tabla preagregada.
+    """
+    global _tablas_disponibles
+
+    filas = {TABLA_EXPORTACIONES: int(conexion.ejecutar_consulta(session, f"SELECT COUNT(*) AS FILAS FROM {TABLA_EXPORTACIONES}")['FILAS'].iloc[0])}
+    for tabla, (columnas, valores, tipos) in TABLAS_AGREGADAS.items():
+        # 1. Agrupar la tabla base por las columnas de la tabla preagregada (solo los tipos de posición que conserva)
+        columnas_sql = ', '.join([f'A.{columna}' for columna in columnas])
+        valores_sql = ', '.join([f'SUM(A.{valor}) AS {valor}' for valor in valores])
+        tipos_sql = ', '.join([f"'{tipo}'" for tipo in tipos or []])
+        condicion = f"WHERE A.TIPO IN ({tipos_sql})" if tipos else ''
+        query = f"""
+        CREATE OR REPLACE TABLE {tabla} AS
+        SELECT {columnas_sql}, {valores_sql}
+        FROM {TABLA_EXPORTACIONES} AS A
+        {condicion}
+        GROUP BY {columnas_sql}
+        """
+        session.sql(query).collect()
+
+        # 2. Contar las filas de la tabla creada
+        filas[tabla] = int(conexion.ejecutar_consulta(session, f"SELECT COUNT(*) AS FILAS FROM {tabla}")['FILAS'].iloc[0])
+
+    # Volver a consultar las tablas disponibles en la siguiente consulta
+    _tablas_disponibles = None
+    return filas
+
+# Función para obtener las tablas preagregadas que existen en Snowflake
+def tablas_agregadas_disponibles(session):
+    """
+    Consulta una sola vez por proceso qué tablas preagregadas existen en el esquema de exportaciones.
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+
+    Retorna:
+    set: Nombres completos de las tablas preagregadas disponibles.
+    """
+    global _tablas_disponibles
+
+    if _tablas_disponibles is None:
+        query = """
+        SELECT TABLE_NAME
+        FROM DOCUMENTOS_COLOMBIA.INFORMATION_SCHEMA.TABLES
+        WHERE TABLE_SCHEMA = 'EXPORTACIONES'
+        """
+        data = conexion.ejecutar_consulta(session, query)
+        existentes = set(data['TABLE_NAME']) if not data.empty else set()
+        _tablas_disponibles = {tabla for tabla in TABLAS_AGREGADAS if tabla.split('.')[-1] in existentes}
+    return _tablas_disponibles
+
+# Función para elegir la tabla de exportaciones a consultar
+def tabla_exportaciones(session, columnas, tipos=None):
+    """
+    Devuelve la primera tabla preagregada disponible que contiene todas las columnas de la consulta
+    (más las columnas de filtro) y todos los tipos de posición que lee, o la tabla base si ninguna cumple.
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    columnas (list): Columnas que usa la consulta en SELECT, WHERE y GROUP BY (incluida la columna de departamentos).
+    tipos (list): Tipos de posición a los que la consulta siempre se restringe (e.g., ['No Mineras']). None si lee todos.
+
+    Retorna:
+    str: Nombre completo de la tabla a usar en el FROM.
+    """
+    if not USAR_TABLAS_AGREGADAS:
+        return TABLA_EXPORTACIONES
+    necesarias = set(columnas) | set(COLUMNAS_FILTRO)
+    disponibles = tablas_agregadas_disponibles(session)
+    for tabla in [tabla for tabla in TABLAS_AGREGADAS if tabla in disponibles]:
+        dimensiones, valores, tipos_tabla = TABLAS_AGREGADAS[tabla]
+        if necesarias <= set(dimensiones) | set(valores) and (tipos_tabla is None or (tipos is not None and set(tipos) <= set(tipos_tabla))):
+            return tabla
+    return TABLA_EXPORTACIONES
\ No newline at end of file
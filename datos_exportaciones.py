@@ -8,6 +8,17 @@ import numpy as np
 import time
 import re
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from collections.abc import Sequence
+from pandas.api.types import union_categoricals
+import contextvars
+import conexion
+import consultas
+import cache_consultas
+import trazas
+import formato
+import informes
 
 
 #######################################################################
@@ -15,6 +26,7 @@ import warnings
 #######################################################################
 
 # Función para obtener los datos de exportaciones agrupados
+@cache_consultas.cache_disco
 def get_data_exportaciones(session, continentes=None, zonas_geograficas=None, paises=None, departamentos=None, hubs=None,tlcs=None, tipo_tlcss=None, tipos=None, years=None):
     """
     Extrae datos de exportaciones desde Snowflake aplicando filtros específicos y agrupa los resultados.
@@ -43,9 +55,7 @@ def get_data_exportaciones(session, continentes=None, zonas_geograficas=None, pa
     """
     
     # 1. Verificar que los parámetros son listas o None
-    for param in [tipos, continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, years]:
-        if param is not None and not isinstance(param, list):
-            raise ValueError("Todos los parámetros deben ser listas o None")
+    consultas.validar_filtros(tipos, continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, years)
         
     # 2. Construir la consulta SQL base
     query = """
@@ -75,34 +85,8 @@ def get_data_exportaciones(session, continentes=None, zonas_geograficas=None, pa
     """
     
     # 3. Añadir condiciones a la consulta SQL según los parámetros proporcionados
-
-    # Agrupación geográfica: 
-    if continentes:
-        query += f""" AND A.CONTINENTE IN ({','.join([f"'{continente}'" for continente in continentes])})"""
-    if zonas_geograficas:
-        query += f""" AND A.ZONA_GEOGRAFICA IN ({','.join([f"'{zona}'" for zona in zonas_geograficas])})"""
-    if paises:
-        query += f""" AND A.PAIS_DESTINO IN ({','.join([f"'{pais}'" for pais in paises])})"""
-    if departamentos:
-        query += f""" AND A.DEPARTAMENTO_ORIGEN IN ({','.join([f"'{departamento}'" for departamento in departamentos])})"""
-        
-    # Agrupación administrativa:
-    if hubs:
-        query += f""" AND A.HUB IN ({','.join([f"'{hub}'" for hub in hubs])})"""
-    
-    # Acuerdo comercial:
-    if tlcs:
-        query += f""" AND A.TLCS IN ({','.join([f"'{tlc}'" for tlc in tlcs])})"""
-    if tipo_tlcss:
-        query += f""" AND A.TIPO_ACUERDO IN ({','.join([f"'{tipo_tlcs}'" for tipo_tlcs in tipo_tlcss])})"""
-    
-    # Posición arancelaria:
-    if tipos:
-        query += f""" AND A.TIPO IN ({','.join([f"'{tipo}'" for tipo in tipos])})"""
-
-    # Agrupación de fechas (dos fechas siempre):
-    if years:
-        query += f""" AND A.YEAR IN ({','.join([f"'{year}'" for year in years])})"""
+    condiciones, parametros = consultas.construir_filtros_sql(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years)
+    query += condiciones
     
     # Agregar group by 
     query += """
@@ -128,12 +112,18 @@ def get_data_exportaciones(session, continentes=None, zonas_geograficas=None, pa
     """
     
     # 4. Ejecutar la consulta SQL y convertir los resultados en un DataFrame de pandas
-    data = pd.DataFrame(session.sql(query).collect())
+    data = compactar_tipos(conexion.ejecutar_consulta(session, query, params=parametros))
     
     # 5. Devolver el DataFrame resultante
     return data
 
+# Columnas que usan las consultas de empresas (para elegir la tabla preagregada de empresas)
+COLUMNAS_EMPRESAS = ['NIT_EXPORTADOR', 'RAZON_SOCIAL', 'SECTOR_ESTRELLA', 'TIPO_ESTRELLA', 'CADENA_ESTRELLA', 'DPTO_MAS_EXPORTA_ESTRELLA', 'VALOR_USD']
+# Tipos de posición que leen las consultas de empresas (todas filtran A.TIPO = 'No Mineras')
+TIPOS_EMPRESAS = ['No Mineras']
+
 # Función para obtener el número de empresas
+@cache_consultas.cache_disco
 def get_data_exportaciones_numero_empresas(session, continentes=None, zonas_geograficas=None, paises=None, departamentos=None, hubs=None, tlcs=None, tipo_tlcss=None, tipos=None, years=None, umbral=10000):
     """
     Extrae datos de exportaciones desde Snowflake aplicando filtros específicos y cuenta el número de empresas únicas que superan un umbral de exportación.
@@ -155,28 +145,30 @@ def get_data_exportaciones_numero_empresas(session, continentes=None, zonas_geog
     1. Verificar que los parámetros son listas o None.
     2. Construir la consulta SQL base.
     3. Añadir condiciones a la consulta SQL según los parámetros proporcionados.
-    4. Ejecutar la consulta SQL y convertir los resultados en un DataFrame de pandas.
-    5. Filtrar el DataFrame para empresas que superan el umbral de exportación.
-    6. Contar el número de empresas únicas.
-    7. Devolver el número de empresas únicas.
+    4. Agrupar por empresa y año, conservar con HAVING las que superan el umbral y contarlas con COUNT(DISTINCT).
+    5. Ejecutar la consulta SQL: Snowflake devuelve una sola fila con el conteo.
+    6. Devolver el número de empresas únicas.
 
     Retorna:
     int: Número de empresas únicas que superan el umbral de exportación.
     """
     
     # 1. Verificar que los parámetros son listas o None
-    for param in [continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years]:
-        if param is not None and not isinstance(param, list):
-            raise ValueError("Todos los parámetros deben ser listas o None")
+    consultas.validar_filtros(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years)
+    if isinstance(umbral, bool) or not isinstance(umbral, (int, float)):
+        raise ValueError("El umbral debe ser numérico")
         
     # 2. Construir la consulta SQL base
-    query = """
+    tabla = consultas.tabla_exportaciones(session, COLUMNAS_EMPRESAS, TIPOS_EMPRESAS)
+    query = f"""
+    SELECT COUNT(DISTINCT E.NIT_EXPORTADOR) AS NUMERO_EMPRESAS
+    FROM (
     SELECT A.NIT_EXPORTADOR,
         A.RAZON_SOCIAL,
         A.SECTOR_ESTRELLA,
         A.YEAR, 
         SUM(A.VALOR_USD) AS VALOR_USD
-    FROM DOCUMENTOS_COLOMBIA.EXPORTACIONES.BASE_EXPORTACIONES AS A
+    FROM {tabla} AS A
     WHERE A.TIPO = 'No Mineras' 
         AND A.TIPO_ESTRELLA = 'No Mineras' 
         AND A.CADENA_ESTRELLA IN ('Agroalimentos', 'Industrias 4.0', 'Metalmecánica y Otras Industrias', 'Químicos y Ciencias de la Vida', 'Sistema Moda')
@@ -184,56 +176,109 @@ def get_data_exportaciones_numero_empresas(session, continentes=None, zonas_geog
     """
 
     # 3. Añadir condiciones a la consulta SQL según los parámetros proporcionados
-
-    # Agrupación geográfica: 
-    if continentes:
-        query += f""" AND A.CONTINENTE IN ({','.join([f"'{continente}'" for continente in continentes])})"""
-    if zonas_geograficas:
-        query += f""" AND A.ZONA_GEOGRAFICA IN ({','.join([f"'{zona}'" for zona in zonas_geograficas])})"""
-    if paises:
-        query += f""" AND A.PAIS_DESTINO IN ({','.join([f"'{pais}'" for pais in paises])})"""
-    if departamentos:
-        query += f""" AND A.DPTO_MAS_EXPORTA_ESTRELLA IN ({','.join([f"'{departamento}'" for departamento in departamentos])})"""
-        
-    # Agrupación administrativa:
-    if hubs:
-        query += f""" AND A.HUB IN ({','.join([f"'{hub}'" for hub in hubs])})"""
-    
-    # Acuerdo comercial:
-    if tlcs:
-        query += f""" AND A.TLCS IN ({','.join([f"'{tlc}'" for tlc in tlcs])})"""
-    if tipo_tlcss:
-        query += f""" AND A.TIPO_ACUERDO IN ({','.join([f"'{tipo_tlcs}'" for tipo_tlcs in tipo_tlcss])})"""
+    condiciones, parametros = consultas.construir_filtros_sql(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years,
+                                                                columna_departamento='DPTO_MAS_EXPORTA_ESTRELLA')
+    query += condiciones
     
-    # Posición arancelaria:
-    if tipos:
-        query += f""" AND A.TIPO IN ({','.join([f"'{tipo}'" for tipo in tipos])})"""
-
-    # Agrupación de fechas (dos fechas siempre):
-    if years:
-        query += f""" AND A.YEAR IN ({','.join([f"'{year}'" for year in years])})"""
-    
-    # 4. Añadir group by
+    # 4. Añadir group by, el umbral en HAVING y cerrar la subconsulta del conteo
     query += """
     GROUP BY A.NIT_EXPORTADOR,
         A.RAZON_SOCIAL,
         A.SECTOR_ESTRELLA,
-        A.YEAR;
+        A.YEAR
+    HAVING SUM(A.VALOR_USD) > ?
+    ) AS E;
     """
 
-    # 5. Ejecutar la consulta SQL y convertir los resultados en un DataFrame de pandas
-    data = pd.DataFrame(session.sql(query).collect())
+    # 5. Ejecutar la consulta SQL: el resultado es una sola fila
+    data = conexion.ejecutar_consulta(session, query, params=parametros + [umbral])
 
-    # 6. Filtrar el DataFrame para empresas que superan el umbral de exportación
-    dfcuenta = data[data['VALOR_USD'] > umbral]
+    # 6. Devolver el número de empresas únicas
+    empresas_unicas = int(data['NUMERO_EMPRESAS'].iloc[0]) if not data.empty else 0
+    return empresas_unicas
 
-    # 7. Contar el número de empresas únicas
-    empresas_unicas = dfcuenta['NIT_EXPORTADOR'].nunique()
+# Función para obtener el número de empresas para varios umbrales y años en una sola consulta
+@cache_consultas.cache_disco
+def get_data_exportaciones_numero_empresas_umbrales(session, continentes=None, zonas_geograficas=None, paises=None, departamentos=None, hubs=None, tlcs=None, tipo_tlcss=None, tipos=None, years=None, umbrales=None):
+    """
+    Cuenta en Snowflake, en una sola consulta, el número de empresas únicas que superan cada umbral de exportación,
+    por año y para el total de los años consultados.
 
-    # 8. Devolver el número de empresas únicas
-    return empresas_unicas
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    continentes (list): Lista de continentes a filtrar.
+    zonas_geograficas (list): Lista de zonas geográficas a filtrar.
+    paises (list): Lista de países a filtrar.
+    departamentos (list): Lista de departamentos a filtrar.
+    hubs (list): Lista de hubs a filtrar.
+    tlcs (list): Lista de tratados de libre comercio a filtrar.
+    tipo_tlcss (list): Lista de tipos de acuerdos comerciales a filtrar.
+    tipos (list): Lista de tipos de posición arancelaria a filtrar.
+    years (list): Lista de años a filtrar.
+    umbrales (list): Lista de umbrales mínimos de exportación en USD. Por defecto [10000].
+
+    Pasos del proceso:
+    1. Verificar que los parámetros son listas o None y que los umbrales son numéricos.
+    2. Construir la subconsulta con el valor exportado por empresa y año (mismas condiciones que get_data_exportaciones_numero_empresas).
+    3. Contar con COUNT(DISTINCT) las empresas que superan cada umbral, por año y para el total (GROUPING SETS).
+    4. Ejecutar la consulta SQL y pasar el resultado a formato largo.
+
+    Retorna:
+    DataFrame: Columnas YEAR, UMBRAL y NUMERO_EMPRESAS. La fila con YEAR = None corresponde al total de los años consultados.
+    """
+
+    # 1. Verificar que los parámetros son listas o None y que los umbrales son numéricos
+    consultas.validar_filtros(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years, umbrales)
+    umbrales = umbrales or [10000]
+    for umbral in umbrales:
+        if isinstance(umbral, bool) or not isinstance(umbral, (int, float)):
+            raise ValueError("Los umbrales deben ser numéricos")
+
+    # 2. Construir la subconsulta con el valor exportado por empresa y año
+    tabla = consultas.tabla_exportaciones(session, COLUMNAS_EMPRESAS, TIPOS_EMPRESAS)
+    query = f"""
+    WITH E AS (
+    SELECT A.NIT_EXPORTADOR,
+        A.YEAR,
+        SUM(A.VALOR_USD) AS VALOR_USD
+    FROM {tabla} AS A
+    WHERE A.TIPO = 'No Mineras' 
+        AND A.TIPO_ESTRELLA = 'No Mineras' 
+        AND A.CADENA_ESTRELLA IN ('Agroalimentos', 'Industrias 4.0', 'Metalmecánica y Otras Industrias', 'Químicos y Ciencias de la Vida', 'Sistema Moda')
+        AND A.NIT_EXPORTADOR NOT IN ('-1')
+    """
+    condiciones, parametros = consultas.construir_filtros_sql(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years,
+                                                                columna_departamento='DPTO_MAS_EXPORTA_ESTRELLA')
+    query += condiciones
+    query += """
+    GROUP BY A.NIT_EXPORTADOR,
+        A.RAZON_SOCIAL,
+        A.SECTOR_ESTRELLA,
+        A.YEAR
+    )
+    """
+
+    # 3. Contar las empresas que superan cada umbral, por año y para el total de los años
+    conteos = ',\n        '.join([f"COUNT(DISTINCT CASE WHEN E.VALOR_USD > ? THEN E.NIT_EXPORTADOR END) AS UMBRAL_{i}"
+                                   for i in range(len(umbrales))])
+    query += f"""
+    SELECT E.YEAR,
+        {conteos}
+    FROM E
+    GROUP BY GROUPING SETS ((E.YEAR), ());
+    """
+
+    # 4. Ejecutar la consulta SQL y pasar a formato largo (una fila por año y umbral)
+    data = conexion.ejecutar_consulta(session, query, params=parametros + umbrales)
+    data = data.melt(id_vars='YEAR', value_vars=[f'UMBRAL_{i}' for i in range(len(umbrales))], var_name='UMBRAL', value_name='NUMERO_EMPRESAS')
+    data['UMBRAL'] = data['UMBRAL'].map({f'UMBRAL_{i}': umbral for i, umbral in enumerate(umbrales)})
+    data['NUMERO_EMPRESAS'] = data['NUMERO_EMPRESAS'].astype(int)
+    data['YEAR'] = data['YEAR'].astype(object).where(data['YEAR'].notna(), None)
+
+    return data[['YEAR', 'UMBRAL', 'NUMERO_EMPRESAS']]
 
 # Función para obtener los datos de empresas con NIT, nombre y sector estrella
+@cache_consultas.cache_disco
 def get_data_exportaciones_empresas(session, continentes=None,zonas_geograficas=None, paises=None, departamentos=None, hubs=None, tlcs=None, tipo_tlcss=None, tipos=None, years=None):
     """
     Extrae datos de exportaciones desde Snowflake aplicando filtros específicos y obtiene información de empresas y totales de exportación.
@@ -266,52 +311,26 @@ def get_data_exportaciones_empresas(session, continentes=None,zonas_geograficas=
     """
     
     # 1. Verificar que los parámetros son listas o None
-    for param in [continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years]:
-        if param is not None and not isinstance(param, list):
-            raise ValueError("Todos los parámetros deben ser listas o None")
+    consultas.validar_filtros(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years)
         
     # 2. Construir la consulta SQL de datos de empresas
-    query1 = """
+    tabla = consultas.tabla_exportaciones(session, COLUMNAS_EMPRESAS, TIPOS_EMPRESAS)
+    query1 = f"""
     SELECT A.NIT_EXPORTADOR,
         A.RAZON_SOCIAL,
         A.SECTOR_ESTRELLA,
         A.YEAR, 
         SUM(A.Valor_USD) AS VALOR_USD
-    FROM DOCUMENTOS_COLOMBIA.EXPORTACIONES.BASE_EXPORTACIONES AS A
+    FROM {tabla} AS A
     WHERE A.TIPO = 'No Mineras' 
         AND A.TIPO_ESTRELLA = 'No Mineras' 
         AND A.NIT_EXPORTADOR NOT IN ('-1')
     """
     
     # 3. Añadir condiciones a la consulta SQL según los parámetros proporcionados
-
-    # Agrupación geográfica: 
-    if continentes:
-        query1 += f""" AND A.CONTINENTE IN ({','.join([f"'{continente}'" for continente in continentes])})"""
-    if zonas_geograficas:
-        query1 += f""" AND A.ZONA_GEOGRAFICA IN ({','.join([f"'{zona}'" for zona in zonas_geograficas])})"""
-    if paises:
-        query1 += f""" AND A.PAIS_DESTINO IN ({','.join([f"'{pais}'" for pais in paises])})"""
-    if departamentos:
-        query1 += f""" AND A.DPTO_MAS_EXPORTA_ESTRELLA IN ({','.join([f"'{departamento}'" for departamento in departamentos])})"""
-        
-    # Agrupación administrativa:
-    if hubs:
-        query1 += f""" AND A.HUB IN ({','.join([f"'{hub}'" for hub in hubs])})"""
-    
-    # Acuerdo comercial:
-    if tlcs:
-        query1 += f""" AND A.TLCS IN ({','.join([f"'{tlc}'" for tlc in tlcs])})"""
-    if tipo_tlcss:
-        query1 += f""" AND A.TIPO_ACUERDO IN ({','.join([f"'{tipo_tlcs}'" for tipo_tlcs in tipo_tlcss])})"""
-    
-    # Posición arancelaria:
-    if tipos:
-        query1 += f""" AND A.TIPO IN ({','.join([f"'{tipo}'" for tipo in tipos])})"""
-
-    # Agrupación de fechas (dos fechas siempre):
-    if years:
-        query1 += f""" AND A.YEAR IN ({','.join([f"'{year}'" for year in years])})"""    
+    condiciones, parametros = consultas.construir_filtros_sql(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years,
+                                                                columna_departamento='DPTO_MAS_EXPORTA_ESTRELLA')
+    query1 += condiciones
     
     # Añadir group by
     query1 += """
@@ -322,42 +341,15 @@ def get_data_exportaciones_empresas(session, continentes=None,zonas_geograficas=
     """
 
     # 4. Construir la consulta SQL del total
-    query2 = """
+    query2 = f"""
     SELECT A.YEAR, 
         SUM(A.Valor_USD) AS VALOR_USD
-    FROM DOCUMENTOS_COLOMBIA.EXPORTACIONES.BASE_EXPORTACIONES AS A
+    FROM {tabla} AS A
     WHERE A.TIPO = 'No Mineras' 
     """
     
     # 5. Añadir condiciones a la consulta SQL según los parámetros proporcionados
-
-    # Agrupación geográfica: 
-    if continentes:
-        query2 += f""" AND A.CONTINENTE IN ({','.join([f"'{continente}'" for continente in continentes])})"""
-    if zonas_geograficas:
-        query2 += f""" AND A.ZONA_GEOGRAFICA IN ({','.join([f"'{zona}'" for zona in zonas_geograficas])})"""
-    if paises:
-        query2 += f""" AND A.PAIS_DESTINO IN ({','.join([f"'{pais}'" for pais in paises])})"""
-    if departamentos:
-        query2 += f""" AND A.DPTO_MAS_EXPORTA_ESTRELLA IN ({','.join([f"'{departamento}'" for departamento in departamentos])})"""
-        
-    # Agrupación administrativa:
-    if hubs:
-        query2 += f""" AND A.HUB IN ({','.join([f"'{hub}'" for hub in hubs])})"""
-    
-    # Acuerdo comercial:
-    if tlcs:
-        query2 += f""" AND A.TLCS IN ({','.join([f"'{tlc}'" for tlc in tlcs])})"""
-    if tipo_tlcss:
-        query2 += f""" AND A.TIPO_ACUERDO IN ({','.join([f"'{tipo_tlcs}'" for tipo_tlcs in tipo_tlcss])})"""
-    
-    # Posición arancelaria:
-    if tipos:
-        query2 += f""" AND A.TIPO IN ({','.join([f"'{tipo}'" for tipo in tipos])})"""
-
-    # Agrupación de fechas (dos fechas siempre):
-    if years:
-        query2 += f""" AND A.YEAR IN ({','.join([f"'{year}'" for year in years])})"""    
+    query2 += condiciones
     
     # Añadir group by
     query2 += """
@@ -365,13 +357,312 @@ def get_data_exportaciones_empresas(session, continentes=None,zonas_geograficas=
     """
     
     # 6. Ejecutar la consulta SQL de empresas
-    df_empresas = pd.DataFrame(session.sql(query1).collect())
+    df_empresas = conexion.ejecutar_consulta(session, query1, params=parametros)
 
     # 7. Ejecutar la consulta SQL de totales
-    df_totales = pd.DataFrame(session.sql(query2).collect())
+    df_totales = conexion.ejecutar_consulta(session, query2, params=parametros)
     
     # 8. Devolver los DataFrames de empresas y totales
-    return df_empresas, df_totales
+    return compactar_tipos(df_empresas), compactar_tipos(df_totales)
+
+# Número de empresas de la tabla de empresas (las demás se suman en 'Otros')
+TOP_EMPRESAS = 5
+
+# Función para obtener en una sola consulta el top de empresas ordenado en Snowflake, los totales y el número de empresas
+@cache_consultas.cache_disco
+def get_data_exportaciones_empresas_consolidado(session, continentes=None, zonas_geograficas=None, paises=None, departamentos=None, hubs=None, tlcs=None, tipo_tlcss=None, tipos=None, years=None,
+                                                dimension=None, year_ranking=None, top_n=TOP_EMPRESAS, umbral=10000):
+    """
+    Extrae en una sola consulta la información que hoy requieren get_data_exportaciones_numero_empresas y las dos consultas de
+    get_data_exportaciones_empresas, pero Snowflake ordena las empresas con funciones de ventana y devuelve solo las filas de
+    las top_n empresas y una fila por año con la suma de las demás. El tamaño del resultado no depende del número de empresas
+    exportadoras, ni en un solo informe ni en la generación masiva (una partición por miembro de la dimensión).
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    continentes (list): Lista de continentes a filtrar.
+    zonas_geograficas (list): Lista de zonas geográficas a filtrar.
+    paises (list): Lista de países a filtrar.
+    departamentos (list): Lista de departamentos a filtrar.
+    hubs (list): Lista de hubs a filtrar.
+    tlcs (list): Lista de tratados de libre comercio a filtrar.
+    tipo_tlcss (list): Lista de tipos de acuerdos comerciales a filtrar.
+    tipos (list): Lista de tipos de posición arancelaria a filtrar.
+    years (list): Lista de años a filtrar (deben ir juntos todos los años de la tabla: el orden depende de year_ranking).
+    dimension (str): Columna que se agrega a todas las agrupaciones y particiones (e.g., 'DPTO_MAS_EXPORTA_ESTRELLA') para obtener
+        en la misma consulta el top, los totales y el número de empresas de cada miembro de la dimensión.
+    year_ranking (str): Año por cuyo valor se ordenan las empresas (normalmente el último de years). Es obligatorio: la llave
+        de cache_consultas.cache_disco ordena las listas, así que no se puede deducir del orden de years.
+    top_n (int): Número de empresas a devolver por miembro.
+    umbral (int): Umbral mínimo de exportación en USD para contar una empresa.
+
+    Pasos del proceso:
+    1. Verificar que los parámetros son listas o None.
+    2. Sumar el valor por empresa y año (por miembro de la dimensión, si se indica); las condiciones propias de cada consulta
+       original se aplican dentro de cada suma.
+    3. Calcular con funciones de ventana el valor de cada empresa en year_ranking y su posición (los empates se ordenan por el
+       texto del NIT, la razón social y el sector, igual que top_empresas con el resultado completo).
+    4. Agrupar por posición y año: las posiciones mayores a top_n se juntan en la posición top_n + 1 sin NIT, razón social ni sector.
+    5. Agregar las filas de totales por año y la del número de empresas que superan el umbral en algún año.
+    6. Ejecutar la consulta SQL y separar las filas de empresas, totales y número de empresas.
+
+    Retorna:
+    tuple: DataFrame de empresas (NIT_EXPORTADOR, RAZON_SOCIAL, SECTOR_ESTRELLA, YEAR, POSICION, VALOR_USD), DataFrame de totales
+    (YEAR, VALOR_USD) y DataFrame con el número de empresas (NUMERO_EMPRESAS), todos con la columna de la dimensión si se indica.
+    """
+
+    # 1. Verificar que los parámetros son listas o None
+    consultas.validar_filtros(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years)
+    if year_ranking is None:
+        raise ValueError("Se debe indicar year_ranking (el año por cuyo valor se ordenan las empresas)")
+    if isinstance(umbral, bool) or not isinstance(umbral, (int, float)):
+        raise ValueError("El umbral debe ser numérico")
+    miembro = [dimension] if dimension else []
+    miembro_a, miembro_e, miembro_p, miembro_s = [''.join([f'{alias}.{columna}, ' for columna in miembro]) for alias in ['A', 'E', 'P', 'S']]
+    particion = f"PARTITION BY {', '.join([f'V.{columna}' for columna in miembro])} " if miembro else ''
+    agrupacion_numero = f"GROUP BY {', '.join([f'E.{columna}' for columna in miembro])}" if miembro else ''
+
+    # 2. a 5. Consulta de empresas ordenadas, totales y número de empresas
+    tabla = consultas.tabla_exportaciones(session, COLUMNAS_EMPRESAS + miembro, TIPOS_EMPRESAS)
+    condiciones, parametros = consultas.construir_filtros_sql(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years,
+                                                                columna_departamento='DPTO_MAS_EXPORTA_ESTRELLA')
+    query = f"""
+    WITH EMPRESAS AS (
+        SELECT {miembro_a}A.NIT_EXPORTADOR,
+            A.RAZON_SOCIAL,
+            A.SECTOR_ESTRELLA,
+            A.YEAR,
+            SUM(A.VALOR_USD) AS VALOR_USD_TOTAL,
+            SUM(CASE WHEN A.TIPO_ESTRELLA = 'No Mineras' THEN A.VALOR_USD END) AS VALOR_USD,
+            SUM(CASE WHEN A.TIPO_ESTRELLA = 'No Mineras'
+                AND A.CADENA_ESTRELLA IN ('Agroalimentos', 'Industrias 4.0', 'Metalmecánica y Otras Industrias', 'Químicos y Ciencias de la Vida', 'Sistema Moda')
+                THEN A.VALOR_USD END) AS VALOR_USD_CADENAS
+        FROM {tabla} AS A
+        WHERE A.TIPO = 'No Mineras'
+        {condiciones}
+        GROUP BY {miembro_a}A.NIT_EXPORTADOR, A.RAZON_SOCIAL, A.SECTOR_ESTRELLA, A.YEAR
+    ),
+    VALORES AS (
+        SELECT E.*,
+            SUM(CASE WHEN E.YEAR = ? THEN E.VALOR_USD ELSE 0 END) OVER (PARTITION BY {miembro_e}E.NIT_EXPORTADOR, E.RAZON_SOCIAL, E.SECTOR_ESTRELLA) AS VALOR_RANKING
+        FROM EMPRESAS AS E
+        WHERE E.VALOR_USD IS NOT NULL
+            AND E.NIT_EXPORTADOR NOT IN ('-1')
+    ),
+    POSICIONES AS (
+        SELECT V.*,
+            LEAST(DENSE_RANK() OVER ({particion}ORDER BY V.VALOR_RANKING DESC, V.NIT_EXPORTADOR, V.RAZON_SOCIAL, V.SECTOR_ESTRELLA), ? + 1) AS POSICION
+        FROM VALORES AS V
+    ),
+    SELECCION AS (
+        SELECT {miembro_p}CASE WHEN P.POSICION <= ? THEN P.NIT_EXPORTADOR END AS NIT_EXPORTADOR,
+            CASE WHEN P.POSICION <= ? THEN P.RAZON_SOCIAL END AS RAZON_SOCIAL,
+            CASE WHEN P.POSICION <= ? THEN P.SECTOR_ESTRELLA END AS SECTOR_ESTRELLA,
+            P.YEAR,
+            P.POSICION,
+            P.VALOR_USD
+        FROM POSICIONES AS P
+    )
+    SELECT 'EMPRESA' AS FILA, {miembro_s}S.NIT_EXPORTADOR, S.RAZON_SOCIAL, S.SECTOR_ESTRELLA, S.YEAR, S.POSICION,
+        SUM(S.VALOR_USD) AS VALOR_USD, NULL AS NUMERO_EMPRESAS
+    FROM SELECCION AS S
+    GROUP BY {miembro_s}S.NIT_EXPORTADOR, S.RAZON_SOCIAL, S.SECTOR_ESTRELLA, S.YEAR, S.POSICION
+    UNION ALL
+    SELECT 'TOTAL', {miembro_e}NULL, NULL, NULL, E.YEAR, NULL, SUM(E.VALOR_USD_TOTAL), NULL
+    FROM EMPRESAS AS E
+    GROUP BY {miembro_e}E.YEAR
+    UNION ALL
+    SELECT 'NUMERO_EMPRESAS', {miembro_e}NULL, NULL, NULL, NULL, NULL, NULL,
+        COUNT(DISTINCT CASE WHEN E.VALOR_USD_CADENAS > ? AND E.NIT_EXPORTADOR NOT IN ('-1') THEN E.NIT_EXPORTADOR END)
+    FROM EMPRESAS AS E
+    {agrupacion_numero};
+    """
+
+    # 6. Ejecutar la consulta SQL y separar las filas de empresas, totales y número de empresas
+    data = conexion.ejecutar_consulta(session, query, params=parametros + [year_ranking] + [top_n] * 4 + [umbral])
+    if data.empty:
+        data = pd.DataFrame(columns=['FILA'] + miembro + ['NIT_EXPORTADOR', 'RAZON_SOCIAL', 'SECTOR_ESTRELLA', 'YEAR', 'POSICION', 'VALOR_USD', 'NUMERO_EMPRESAS'])
+    df_empresas = data.loc[data['FILA'] == 'EMPRESA', miembro + ['NIT_EXPORTADOR', 'RAZON_SOCIAL', 'SECTOR_ESTRELLA', 'YEAR', 'POSICION', 'VALOR_USD']]
+    df_empresas = df_empresas.astype({'POSICION': 'int64'}).reset_index(drop=True)
+    df_totales = data.loc[data['FILA'] == 'TOTAL', miembro + ['YEAR', 'VALOR_USD']].reset_index(drop=True)
+    df_numero_empresas = data.loc[data['FILA'] == 'NUMERO_EMPRESAS', miembro + ['NUMERO_EMPRESAS']].astype({'NUMERO_EMPRESAS': 'int64'}).reset_index(drop=True)
+
+    return compactar_tipos(df_empresas), compactar_tipos(df_totales), compactar_tipos(df_numero_empresas)
+
+# Columnas de dimensión de get_data_exportaciones que se pueden usar como categoría de las tablas resumen
+COLUMNAS_DIMENSION = ['TIPO', 'CADENA', 'SECTOR', 'SUBSECTOR', 'PAIS_DESTINO', 'HUB', 'CONTINENTE', 'ZONA_GEOGRAFICA', 'TLCS',
+                      'TIPO_ACUERDO', 'DEPARTAMENTO_ORIGEN', 'MEDIO_TRANSPORTE', 'CADENA_FRIO', 'TIPO_ESTRELLA', 'CADENA_ESTRELLA',
+                      'SECTOR_ESTRELLA', 'SUBSECTOR_ESTRELLA', 'DPTO_MAS_EXPORTA_ESTRELLA']
+
+# Columnas que necesita generar_tabla_subsectores
+AGRUPACION_SUBSECTORES = ['SUBSECTOR', 'PAIS_DESTINO']
+
+# Convertir los resultados a tipos compactos (categorías y NIT entero). Con False se conservan las columnas de texto originales
+TIPOS_COMPACTOS = True
+# Columnas de texto con pocos valores distintos frente al número de filas, que se guardan como categóricas
+COLUMNAS_CATEGORICAS = ['AGRUPACION', 'YEAR', 'RAZON_SOCIAL'] + COLUMNAS_DIMENSION
+
+# Función para convertir un DataFrame de resultados a tipos compactos
+def compactar_tipos(df):
+    """
+    Convierte las columnas de dimensión, YEAR y razón social en categóricas (cada valor distinto se guarda una sola vez)
+    y el NIT en entero cuando la conversión no altera ningún valor (sin ceros a la izquierda ni caracteres no numéricos).
+    YEAR se conserva como categoría de texto porque incluye periodos corridos (e.g., '2024(Ene-Abr)').
+
+    Parámetros:
+    df (DataFrame): Resultado de una consulta de exportaciones o empresas.
+
+    Retorna:
+    DataFrame: El mismo DataFrame con tipos compactos, o sin cambios si TIPOS_COMPACTOS es False.
+    """
+    if not TIPOS_COMPACTOS or df.empty:
+        return df
+
+    # 1. Columnas categóricas (las que ya son categóricas se conservan; concatenar_resultados une sus categorías)
+    for columna in COLUMNAS_CATEGORICAS:
+        if columna in df.columns and df[columna].dtype == object:
+            df[columna] = df[columna].astype('category')
+
+    # 2. NIT como entero, solo si el texto de cada NIT es exactamente el del entero
+    if 'NIT_EXPORTADOR' in df.columns and df['NIT_EXPORTADOR'].dtype == object and df['NIT_EXPORTADOR'].notna().all():
+        nits = pd.to_numeric(df['NIT_EXPORTADOR'], errors='coerce')
+        if nits.notna().all() and (nits.astype('int64').astype(str) == df['NIT_EXPORTADOR'].astype(str)).all():
+            df['NIT_EXPORTADOR'] = nits.astype('int64')
+    return df
+
+# Función para unir resultados compactos sin perder las columnas categóricas
+def concatenar_resultados(frames):
+    """
+    Concatena resultados de compactar_tipos. pd.concat solo conserva una columna categórica si todas las partes tienen
+    exactamente las mismas categorías; de lo contrario la convierte en texto. Por eso antes de concatenar se unen las
+    categorías de cada columna con union_categoricals y se asignan a todas las partes.
+
+    Parámetros:
+    frames (list): DataFrames con las mismas columnas.
+
+    Retorna:
+    DataFrame: Resultado unido, con tipos compactos.
+    """
+    # 1. Omitir las partes vacías (sus columnas son de texto y no aportan categorías)
+    frames = [df for df in frames if not df.empty] or frames[:1]
+
+    # 2. Asignar a todas las partes la unión ordenada de las categorías de cada columna
+    for columna in frames[0].columns:
+        if len(frames) > 1 and all(isinstance(df[columna].dtype, pd.CategoricalDtype) for df in frames):
+            categorias = union_categoricals([df[columna] for df in frames], sort_categories=True).categories
+            frames = [df.assign(**{columna: df[columna].cat.set_categories(categorias)}) for df in frames]
+
+    # 3. Concatenar y compactar las columnas que no eran categóricas en todas las partes
+    return compactar_tipos(pd.concat(frames, ignore_index=True))
+
+# Función para obtener solo las sumas por categoría y año que necesitan las tablas resumen
+@cache_consultas.cache_disco
+def get_data_exportaciones_agregado(session, continentes=None, zonas_geograficas=None, paises=None, departamentos=None, hubs=None, tlcs=None, tipo_tlcss=None, tipos=None, years=None, categorias=None,
+                                    dimension=None):
+    """
+    Extrae desde Snowflake, en una sola consulta con GROUPING SETS, las sumas de valor y peso por categoría, tipo y año,
+    en lugar de agrupar por las 19 columnas de dimensión como get_data_exportaciones.
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    continentes (list): Lista de continentes a filtrar.
+    zonas_geograficas (list): Lista de zonas geográficas a filtrar.
+    paises (list): Lista de países a filtrar.
+    departamentos (list): Lista de departamentos a filtrar.
+    hubs (list): Lista de hubs a filtrar.
+    tlcs (list): Lista de tratados de libre comercio a filtrar.
+    tipo_tlcss (list): Lista de tipos de acuerdos comerciales a filtrar.
+    tipos (list): Lista de tipos de posición arancelaria a filtrar.
+    years (list): Lista de años a filtrar.
+    categorias (list): Lista de variables categóricas de las tablas resumen (e.g., ['SECTOR', 'PAIS_DESTINO']).
+    dimension (str): Columna que se agrega a todos los conjuntos de agrupación (e.g., 'PAIS_DESTINO') para obtener en la misma
+        consulta los datos de cada miembro de la dimensión (ver generar_listas_tablas_por_dimension).
+
+    Pasos del proceso:
+    1. Verificar los parámetros y las categorías.
+    2. Definir un conjunto de agrupación por categoría, más el de subsector y país para la tabla de subsectores.
+    3. Construir la consulta SQL con GROUPING SETS; la columna AGRUPACION identifica el conjunto de cada fila.
+    4. Ejecutar la consulta SQL y convertir los resultados en un DataFrame de pandas.
+    5. Repetir las filas de los conjuntos que comparten varias agrupaciones (solo ocurre al agregar la dimensión).
+
+    Retorna:
+    DataFrame: Columnas AGRUPACION, TIPO, YEAR, las columnas de las categorías (y de la dimensión), VALOR_USD y PESO_KG_NETO.
+    Las filas de cada agrupación se obtienen con seleccionar_agrupacion.
+    """
+
+    # 1. Verificar los parámetros y las categorías
+    consultas.validar_filtros(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years, categorias)
+    categorias = categorias or []
+    for categoria in categorias + ([dimension] if dimension else []):
+        if categoria not in COLUMNAS_DIMENSION:
+            raise ValueError(f"La categoría {categoria} no es una columna de dimensión de BASE_EXPORTACIONES")
+
+    # 2. Definir los conjuntos de agrupación (TIPO y YEAR siempre se incluyen para poder separar alcances y periodos)
+    agrupaciones = {categoria: [categoria] for categoria in categorias}
+    agrupaciones['SUBSECTORES'] = AGRUPACION_SUBSECTORES
+    if dimension:
+        agrupaciones = {nombre: list(dict.fromkeys(columnas + [dimension])) for nombre, columnas in agrupaciones.items()}
+    dimensiones = [columna for columna in COLUMNAS_DIMENSION
+                   if columna != 'TIPO' and any(columna in columnas for columnas in agrupaciones.values())]
+
+    # 3. Construir la consulta SQL
+    conjuntos = []
+    casos = []
+    nombres = []
+    compartidos = {}
+    for nombre, columnas in agrupaciones.items():
+        conjunto = ', '.join(['A.TIPO', 'A.YEAR'] + [f'A.{columna}' for columna in dimensiones if columna in columnas])
+        if f'({conjunto})' in conjuntos:
+            compartidos[nombre] = nombres[conjuntos.index(f'({conjunto})')]
+            continue
+        conjuntos.append(f'({conjunto})')
+        nombres.append(nombre)
+        condicion = ' AND '.join([f'GROUPING(A.{columna}) = {0 if columna in columnas else 1}' for columna in dimensiones])
+        casos.append(f"WHEN {condicion} THEN '{nombre}'")
+
+    tabla = consultas.tabla_exportaciones(session, dimensiones + ['TIPO', 'YEAR', 'DEPARTAMENTO_ORIGEN', 'VALOR_USD', 'PESO_KG'])
+    query = f"""
+    SELECT CASE {' '.join(casos)} END AS AGRUPACION,
+        A.TIPO,
+        A.YEAR,
+        {''.join([f'A.{columna}, ' for columna in dimensiones])}SUM(A.VALOR_USD) AS VALOR_USD,
+        SUM(A.PESO_KG) AS PESO_KG_NETO
+    FROM {tabla} AS A
+    WHERE 1=1
+    """
+    condiciones, parametros = consultas.construir_filtros_sql(continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years)
+    query += condiciones
+    query += f"""
+    GROUP BY GROUPING SETS ({', '.join(conjuntos)});
+    """
+
+    # 4. Ejecutar la consulta SQL
+    data = conexion.ejecutar_consulta(session, query, params=parametros)
+    if data.empty:
+        data = pd.DataFrame(columns=['AGRUPACION', 'TIPO', 'YEAR'] + dimensiones + ['VALOR_USD', 'PESO_KG_NETO'])
+
+    # 5. Repetir las filas de los conjuntos compartidos (e.g., SUBSECTOR y SUBSECTORES al agregar PAIS_DESTINO como dimensión)
+    if compartidos:
+        data = pd.concat([data] + [data[data['AGRUPACION'] == original].assign(AGRUPACION=nombre) for nombre, original in compartidos.items()],
+                         ignore_index=True)
+    return compactar_tipos(data)
+
+# Función para seleccionar las filas de una agrupación de get_data_exportaciones_agregado
+def seleccionar_agrupacion(df, agrupacion):
+    """
+    Devuelve las filas de una agrupación (categoría o 'SUBSECTORES') de un DataFrame de get_data_exportaciones_agregado.
+    Si el DataFrame proviene de get_data_exportaciones (sin columna AGRUPACION) se devuelve sin cambios.
+
+    Parámetros:
+    df (DataFrame): DataFrame de get_data_exportaciones o de get_data_exportaciones_agregado.
+    agrupacion (str): Nombre de la agrupación.
+
+    Retorna:
+    DataFrame: Filas de la agrupación, con el mismo formato que esperan construir_cubo y generar_tabla_subsectores.
+    """
+    if 'AGRUPACION' not in df.columns:
+        return df
+    return df[df['AGRUPACION'] == agrupacion].drop(columns='AGRUPACION')
 
 # Función para transformar el año para nombres de columnas
 def transform_year_column_name(col_name):
@@ -430,332 +721,618 @@ def transform_year(col_name):
     # Si no contiene paréntesis, retornar el nombre original de la columna
     return f'{col_name}'
 
-# Función para obtener tabla resumen por categoría elegida
-def generar_tabla_resumen(df, categoria, valor, top_n = None):
+# Nombres de las columnas de categoría en las tablas de los informes
+NOMBRES_CATEGORIAS = {
+    'TIPO': 'Tipo de exportación',
+    'CADENA': 'Cadena',
+    'SECTOR': 'Sector',
+    'SUBSECTOR': 'Subsector',
+    'PAIS_DESTINO': 'País destino',
+    'HUB': 'HUB',
+    'CONTINENTE': 'Continente',
+    'ZONA_GEOGRAFICA': 'Zona geográfica',
+    'TLCS': 'Tratados de Libre Comercio',
+    'DEPARTAMENTO_ORIGEN': 'Departamento de origen',
+    'MEDIO_TRANSPORTE': 'Medio de transporte',
+    'YEAR': 'Año'}
+
+# Unidades de las columnas de valores por variable de valor
+UNIDADES_VALORES = {'VALOR_USD': 'USD FOB', 'PESO_KG_NETO': 'KG NETO'}
+
+# Posición de cada rol de fila en las tablas: las filas regulares primero, luego 'Otros' y al final 'Total'
+ORDEN_ROLES = {formato.ROL_REGULAR: 0, formato.ROL_OTROS: 1, formato.ROL_TOTAL: 2}
+
+# Función para armar el resultado numérico de una tabla resumen
+def resultado_tabla_resumen(etiquetas, columnas, categoria, valor, ordered_years):
+    """
+    Arma el resultado de una tabla resumen ya ordenada con los nombres de columnas de los informes, el rol de cada fila
+    y el formato de cada columna. No copia ni reordena los datos más de una vez y no convierte nada en texto.
+
+    Parámetros:
+    etiquetas (array-like): Etiquetas de las filas en orden (categorías, 'Otros' y 'Total').
+    columnas (dict o DataFrame): Valores de cada año, 'Variación (%)' y 'Participación {último año} (%)' en el orden de las etiquetas.
+    categoria (str): Variable categórica de la tabla (e.g., 'PAIS_DESTINO', 'SECTOR').
+    valor (str): Variable de valor de la tabla ('VALOR_USD' o 'PESO_KG_NETO').
+    ordered_years (list): Columnas de año en orden.
 
+    Pasos del proceso:
+    1. Nombrar la columna de categoría y las columnas de los dos primeros años con su unidad.
+    2. Nombrar la participación con el año del último periodo.
+    3. Asignar el rol de cada fila y el formato de cada columna.
+
+    Retorna:
+    formato.TablaResultado: Tabla resumen numérica.
     """
-    Genera una tabla resumen a partir de un DataFrame de exportaciones, agregando columnas de variación porcentual y participación.
-    
+    year_curr = ordered_years[-1]
+
+    # 1. Columna de categoría y años (solo los dos primeros años llevan la unidad, como en los informes)
+    unidad = UNIDADES_VALORES.get(valor)
+    nombres_years = [f'{transform_year_column_name(year)} ({unidad})' if unidad and posicion < 2 else year
+                     for posicion, year in enumerate(ordered_years)]
+    datos = {NOMBRES_CATEGORIAS.get(categoria, categoria): np.asarray(etiquetas)}
+    for nombre, year in zip(nombres_years, ordered_years):
+        datos[nombre] = np.asarray(columnas[year])
+
+    # 2. Variación y participación
+    nombre_participacion = f'Participación {transform_year(year_curr)} (%)'
+    datos['Variación (%)'] = np.asarray(columnas['Variación (%)'])
+    datos[nombre_participacion] = np.asarray(columnas[f'Participación {year_curr} (%)'])
+
+    # 3. Roles y formatos
+    formatos = {nombre: formato.FORMATO_VALOR for nombre in nombres_years}
+    formatos['Variación (%)'] = formato.FORMATO_PORCENTAJE
+    formatos[nombre_participacion] = formato.FORMATO_PORCENTAJE
+    return formato.TablaResultado(pd.DataFrame(datos), formato.roles_por_etiqueta(etiquetas), formatos)
+
+# Función para ordenar los años y periodos como las columnas de las tablas resumen
+def ordenar_years(years):
+    """
+    Ordena los años por su valor numérico; los periodos de un mismo año (e.g., '2023' y '2023(Ene-Abr)') quedan en orden alfabético.
+
     Parámetros:
-    df (DataFrame): DataFrame proveniente de la función get_data_exportaciones().
-    categoria (str): Variable categórica para la cual se generará la tabla de resumen (e.g., 'PAIS_DESTINO', 'SECTOR').
-    valor (str): Variable de valor a agregar ('VALOR_USD' o PESO_KG_NETO).
-    top_n: Número de categorías top a filtrar.Por defecto no se filtran.
+    years (iterable): Años o periodos.
+
+    Retorna:
+    list: Años ordenados.
+    """
+    return sorted(sorted(years), key=lambda x: (int(x.split('(')[0]) if '(' in x else int(x)))
+
+# Función para ordenar posiciones de mayor a menor valor igual que DataFrame.sort_values(ascending=False)
+def orden_descendente(valores):
+    """
+    Devuelve las posiciones de los valores de mayor a menor con el mismo algoritmo (quicksort) y el mismo orden de los empates
+    que pandas.DataFrame.sort_values(ascending=False), para que las tablas del cubo salgan idénticas a las de pandas.
+
+    Parámetros:
+    valores (ndarray): Valores sin nulos.
+
+    Retorna:
+    ndarray: Posiciones ordenadas.
+    """
+    posiciones = np.arange(len(valores))[::-1]
+    return posiciones[valores[::-1].argsort(kind='quicksort')][::-1]
+
+# Función para obtener las posiciones del top n igual que DataFrame.nlargest(n)
+def posiciones_top(valores, n):
+    """
+    Devuelve las posiciones de los n mayores valores en el orden de DataFrame.nlargest(n) (los empates conservan el orden original).
+
+    Parámetros:
+    valores (ndarray): Valores sin nulos.
+    n (int): Número de posiciones.
+
+    Retorna:
+    ndarray: Posiciones del top n.
+    """
+    if n >= len(valores):
+        return orden_descendente(valores)
+    return np.argsort(-valores, kind='mergesort')[:n]
+
+# Función para construir el cubo de sumas por categoría y año
+@trazas.medir
+def construir_cubo(df, categorias, valores):
+    """
+    Construye en una sola pasada por categoría un cubo en memoria: las etiquetas de cada categoría codificadas como enteros
+    y una matriz de sumas (años x etiquetas) por cada valor. Todas las tablas resumen se derivan del cubo con tabla_resumen_cubo.
+
+    Parámetros:
+    df (DataFrame): DataFrame proveniente de get_data_exportaciones() o get_data_exportaciones_agregado().
+    categorias (list): Variables categóricas de las tablas resumen.
+    valores (list): Variables de valor ('VALOR_USD' o 'PESO_KG_NETO').
 
     Pasos del proceso:
-    1. Crear una tabla pivote sumando el valor por categoría y año.
-    2. Ordenar las columnas de año para manejar períodos correctamente.
-    3. Filtrar el top 5 y agrupar los demás en 'Otros'.
-    4. Agregar una fila con los totales generales.
-    5. Calcular la variación entre el penúltimo y el último año.
-    6. Calcular la participación en el último año.
-    7. Reordenar las columnas para tener los años, la variación y la participación.
-    8. Ordenar categorías por valor del último año, excepto 'Otros' y 'Total'.
-    9. Formatear los valores y porcentajes.
-    10. Asegurar que los nombres de las columnas no tengan múltiples niveles.
-    11. Renombrar la columna de categoría.
-    12. Transformar los nombres de las columnas de año y agrega formatos decimales en español.
+    1. Sumar todos los valores por etiqueta y año con una sola agrupación por categoría (las mismas sumas que pivot_table).
+    2. Codificar las etiquetas y los años como enteros.
+    3. Llenar una matriz densa años x etiquetas por valor; las combinaciones sin datos quedan en 0.
+
+    Retorna:
+    dict: Por categoría, un diccionario con 'etiquetas' (ordenadas), 'years' (ordenados) y 'sumas' (matriz por valor).
+    """
+    cubo = {}
+    for categoria in categorias:
+        # 1. Sumar por etiqueta y año
+        sumas = seleccionar_agrupacion(df, categoria).groupby([categoria, 'YEAR'], observed=True)[valores].sum()
+
+        # 2. y 3. Codificar etiquetas y años y llenar las matrices
+        cubo[categoria] = categoria_cubo(sumas, valores)
+    return cubo
+
+# Función para codificar las sumas de una categoría como una entrada del cubo
+def categoria_cubo(sumas, valores):
+    """
+    Parámetros:
+    sumas (DataFrame): Sumas de los valores con índice (etiqueta, año) en sus dos últimos niveles.
+    valores (list): Variables de valor ('VALOR_USD' o 'PESO_KG_NETO').
 
     Retorna:
-    DataFrame: Tabla resumen con las categorías ordenadas, variación y participación calculadas y formateadas.
+    dict: 'etiquetas' (ordenadas), 'years' (ordenados) y 'sumas' (matriz años x etiquetas por valor, con 0 donde no hay datos).
     """
 
-    # 1. Crear tabla pivote sumando el valor por categoría y año
-    pivot_table = df.pivot_table(values=valor, index=categoria, columns='YEAR', aggfunc='sum', fill_value=0)
+    # 1. Codificar etiquetas y años
+    codigos_etiquetas, etiquetas = pd.factorize(sumas.index.get_level_values(-2), sort=True)
+    years_sumas = sumas.index.get_level_values(-1).astype(str)
+    years = ordenar_years(set(years_sumas))
+    codigos_years = pd.Index(years).get_indexer(years_sumas)
+
+    # 2. Matrices de sumas por valor
+    matrices = {}
+    for valor in valores:
+        matriz = np.zeros((len(years), len(etiquetas)), dtype=sumas[valor].dtype)
+        matriz[codigos_years, codigos_etiquetas] = sumas[valor].to_numpy()
+        matrices[valor] = matriz
+    return {'etiquetas': np.asarray(etiquetas, dtype=object), 'years': years, 'sumas': matrices}
+
+# Función para construir los cubos de todos los miembros de una dimensión con una sola agrupación por categoría
+@trazas.medir
+def construir_cubos_por_miembro(df, columna, categorias, valores):
+    """
+    Construye el cubo de construir_cubo de cada miembro de una dimensión (e.g., cada país) agrupando una sola vez por categoría
+    todo el DataFrame, en lugar de agrupar el DataFrame de cada miembro por separado.
+
+    Parámetros:
+    df (DataFrame): DataFrame con los datos de todos los miembros (ver generar_listas_tablas_por_dimension).
+    columna (str): Columna de la dimensión (e.g., 'PAIS_DESTINO').
+    categorias (list): Variables categóricas de las tablas resumen.
+    valores (list): Variables de valor ('VALOR_USD' o 'PESO_KG_NETO').
+
+    Pasos del proceso:
+    1. Sumar todos los valores por miembro, etiqueta y año con una sola agrupación por categoría.
+    2. Separar las sumas de cada miembro (filas contiguas, porque la agrupación ordena por miembro).
+    3. Codificar cada parte como en construir_cubo.
+
+    Retorna:
+    dict: Por miembro, un cubo con el mismo formato que construir_cubo. Los miembros sin filas en una categoría no la incluyen.
+    """
+    cubos = {}
+    for categoria in categorias:
+        # 1. Sumar por miembro, etiqueta y año (si la categoría es la misma dimensión, la etiqueta es el miembro)
+        llaves = list(dict.fromkeys([columna, categoria, 'YEAR']))
+        sumas = seleccionar_agrupacion(df, categoria).groupby(llaves, observed=True)[valores].sum()
+        if sumas.empty:
+            continue
+
+        # 2. Límites de las filas de cada miembro
+        codigos = sumas.index.codes[0]
+        limites = np.flatnonzero(np.diff(codigos)) + 1
+        inicios = np.concatenate([[0], limites])
+        finales = np.concatenate([limites, [len(codigos)]])
+
+        # 3. Cubo de la categoría para cada miembro
+        for inicio, final in zip(inicios, finales):
+            miembro = sumas.index.levels[0][codigos[inicio]]
+            cubos.setdefault(miembro, {})[categoria] = categoria_cubo(sumas.iloc[inicio:final], valores)
+    return cubos
+
+# Función para obtener una tabla resumen a partir del cubo
+@trazas.medir
+def tabla_resumen_cubo(cubo, categoria, valor, top_n=None):
+    """
+    Genera la tabla resumen de una categoría (top n, 'Otros', 'Total', variación y participación) con operaciones
+    de numpy sobre la matriz de sumas del cubo, sin pivotear de nuevo el DataFrame.
 
-    # Ordenar las columnas de año para manejar períodos correctamente
-    ordered_years = sorted(pivot_table.columns, key=lambda x: (int(x.split('(')[0]) if '(' in x else int(x)))
-    pivot_table = pivot_table[ordered_years]
+    Parámetros:
+    cubo (dict): Cubo de construir_cubo.
+    categoria (str): Variable categórica de la tabla (e.g., 'PAIS_DESTINO', 'SECTOR').
+    valor (str): Variable de valor ('VALOR_USD' o 'PESO_KG_NETO').
+    top_n: Número de categorías top a filtrar. Por defecto no se filtran.
 
-    # 2. Filtrar el top_n y agrupar los demás en 'Otros'
+    Pasos del proceso:
+    1. Seleccionar las etiquetas del top n y sumar las demás en 'Otros'.
+    2. Agregar la fila 'Total'.
+    3. Calcular la variación entre los dos últimos años y la participación en el último año.
+    4. Ordenar por el último año, dejando 'Otros' y 'Total' al final.
+    5. Armar el resultado numérico con resultado_tabla_resumen.
+
+    Retorna:
+    formato.TablaResultado: Tabla resumen numérica con las categorías ordenadas y el rol de cada fila.
+    """
+    dimension = cubo[categoria]
+    etiquetas = dimension['etiquetas']
+    years = dimension['years']
+    matriz = dimension['sumas'][valor]
+
+    # 1. Top n y 'Otros' (las sumas recorren cada año en posiciones contiguas, como DataFrame.sum)
     if top_n:
-        # Obtener las 5 categorías principales basadas en el valor del último año disponible
-        topn = pivot_table.nlargest(top_n, ordered_years[-1])
-        # Agrupar las demás categorías bajo 'Otros'
-        others = pivot_table.drop(topn.index)
-        others_sum = others.sum().to_frame().T
-        others_sum[categoria] = 'Otros'
-        pivot_table = pd.concat([topn, others_sum.set_index(categoria)])
+        top = posiciones_top(matriz[-1], top_n)
+        resto = np.setdiff1d(np.arange(len(etiquetas)), top)
+        matriz = np.column_stack([matriz[:, top], np.ascontiguousarray(matriz[:, resto]).sum(axis=1)])
+        etiquetas = np.append(etiquetas[top], 'Otros')
+
+    # 2. Fila 'Total'
+    matriz = np.column_stack([matriz, np.ascontiguousarray(matriz).sum(axis=1)])
+    etiquetas = np.append(etiquetas, 'Total')
+
+    # 3. Variación y participación
+    year_prev = matriz[-2]
+    year_curr = matriz[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variacion = (year_curr - year_prev) / year_prev * 100
+        participacion = year_curr / year_curr[-1] * 100
+
+    # 4. Ordenar por el último año y dejar 'Otros' y 'Total' al final
+    orden = orden_descendente(year_curr)
+    roles = formato.roles_por_etiqueta(etiquetas[orden])
+    orden = orden[np.argsort([ORDEN_ROLES[rol] for rol in roles], kind='stable')]
+    columnas = {year: matriz[posicion, orden] for posicion, year in enumerate(years)}
+    columnas['Variación (%)'] = variacion[orden]
+    columnas[f'Participación {years[-1]} (%)'] = participacion[orden]
+
+    # 5. Resultado numérico
+    return resultado_tabla_resumen(etiquetas[orden], columnas, categoria, valor, years)
+
+# Columnas que identifican a una empresa en la tabla de empresas
+LLAVES_EMPRESA = ['NIT_EXPORTADOR', 'RAZON_SOCIAL', 'SECTOR_ESTRELLA']
+
+# Función para obtener las posiciones de las empresas del top con el mismo desempate que Snowflake
+def posiciones_top_empresas(valores, llaves, k):
+    """
+    Devuelve las posiciones de los k mayores valores. Los empates se ordenan por el texto del NIT, la razón social y el sector,
+    como el ORDER BY de get_data_exportaciones_empresas_consolidado, de modo que el top no depende de si el NIT se compactó a entero.
 
-    
-    # 3. Agregar fila con los totales generales
-    totals = pivot_table.sum().to_frame().T
-    totals[categoria] = 'Total'
-    pivot_table = pd.concat([pivot_table, totals.set_index(categoria)])
+    Parámetros:
+    valores (ndarray): Valores sin nulos, uno por empresa.
+    llaves (list): Arreglos de NIT, razón social y sector, alineados con valores.
+    k (int): Número de posiciones.
 
-    # 4. Calcular la variación entre años
-    year_prev = ordered_years[-2]
-    year_curr = ordered_years[-1]
-    pivot_table['Variación (%)'] = (pivot_table[year_curr] - pivot_table[year_prev]) / pivot_table[year_prev] * 100
-
-    # 5. Calcular la participación en el último año
-    total_last_year = pivot_table.loc['Total', year_curr]
-    pivot_table[f'Participación {year_curr} (%)'] = (pivot_table[year_curr] / total_last_year) * 100
-
-    # 6. Reordenar las columnas para tener los años, la variación y la participación
-    ordered_columns = ordered_years + ['Variación (%)', f'Participación {year_curr} (%)']
-    pivot_table = pivot_table[ordered_columns]
-
-    # 7. Ordenar categorías por valor del último año, excepto 'Otros' y 'Total'
-    pivot_table = pivot_table.reset_index()
-    pivot_table = pivot_table.sort_values(by=year_curr, ascending=False)
-    if 'Otros' in pivot_table[categoria].values:
-        otros_row = pivot_table[pivot_table[categoria] == 'Otros']
-        pivot_table = pivot_table[pivot_table[categoria] != 'Otros']
-        pivot_table = pd.concat([pivot_table, otros_row])
-    total_row = pivot_table[pivot_table[categoria] == 'Total']
-    pivot_table = pivot_table[pivot_table[categoria] != 'Total']
-    pivot_table = pd.concat([pivot_table, total_row])
-    pivot_table = pivot_table.set_index(categoria)
-
-    # 8. Formatear los valores y porcentajes
-    pivot_table[ordered_years] = pivot_table[ordered_years].applymap('{:,.0f}'.format)
-    pivot_table[['Variación (%)', f'Participación {year_curr} (%)']] = pivot_table[['Variación (%)', f'Participación {year_curr} (%)']].applymap('{:.1f}%'.format)
-
-    # 9. Asegurar que los nombres de las columnas no tengan múltiples niveles
-    pivot_table.columns.name = None
-    pivot_table.reset_index(inplace=True)
-
-    # 10. Renombrar la columna de categoría
-    column_names_dict = {
-        'TIPO': 'Tipo de exportación',
-        'CADENA': 'Cadena',
-        'SECTOR': 'Sector',
-        'SUBSECTOR': 'Subsector',
-        'PAIS_DESTINO': 'País destino',
-        'HUB': 'HUB',
-        'CONTINENTE': 'Continente',
-        'ZONA_GEOGRAFICA': 'Zona geográfica',
-        'TLCS': 'Tratados de Libre Comercio',
-        'DEPARTAMENTO_ORIGEN': 'Departamento de origen',
-        'MEDIO_TRANSPORTE': 'Medio de transporte',
-        'YEAR': 'Año'}
-    if categoria in column_names_dict:
-        pivot_table.rename(columns={categoria: column_names_dict[categoria]}, inplace=True)
-
-    # 11. Transformar los nombres de las columnas de año
-    new_columns = {}
-    for col in pivot_table.columns:
-        if 'Participación' in col:
-            new_columns[col] = f'Participación {transform_year(year_curr)} (%)'
-        else:
-            new_columns[col] = col
-    pivot_table.rename(columns=new_columns, inplace=True)  
-
-    # 12. Agregar USD FOB a las columnas de años
-    if valor == 'VALOR_USD':
-        pivot_table.rename(columns={pivot_table.columns[1]: f'{transform_year_column_name(pivot_table.columns[1])} (USD FOB)'}, inplace=True)
-        pivot_table.rename(columns={pivot_table.columns[2]: f'{transform_year_column_name(pivot_table.columns[2])} (USD FOB)'}, inplace=True)
-    if valor == 'PESO_KG_NETO':
-        pivot_table.rename(columns={pivot_table.columns[1]: f'{transform_year_column_name(pivot_table.columns[1])} (KG NETO)'}, inplace=True)
-        pivot_table.rename(columns={pivot_table.columns[2]: f'{transform_year_column_name(pivot_table.columns[2])} (KG NETO)'}, inplace=True)
-
-    # Convertir separadores de decimales y miles
-    pivot_table = pivot_table.astype(str)
-    for col in pivot_table.columns[1:]:
-        pivot_table[col] = pivot_table[col].apply(lambda x: x.replace(',', 'X').replace('.', ',').replace('X', '.'))
-    
-    # 13. Resultado
-    return pivot_table
+    Retorna:
+    ndarray: Posiciones del top k.
+    """
+    if k <= 0 or not len(valores):
+        return np.array([], dtype=np.intp)
+
+    # 1. Candidatos: los valores mayores o iguales al k-ésimo mayor (selección parcial con np.partition)
+    umbral = np.partition(valores, len(valores) - k)[len(valores) - k] if k < len(valores) else valores.min()
+    candidatos = np.flatnonzero(valores >= umbral)
+
+    # 2. Ordenar los candidatos por valor descendente y luego por el texto de las llaves
+    textos = [np.asarray(llave, dtype=object)[candidatos].astype(str) for llave in llaves]
+    orden = np.lexsort(tuple(reversed(textos)) + (-valores[candidatos],))
+    return candidatos[orden[:k]]
+
+# Función para obtener las empresas del top n y la suma de todas las empresas
+def top_empresas(df_empresas, year1, year2, top_n=TOP_EMPRESAS):
+    """
+    Obtiene las top_n empresas por valor en year2 a partir de los datos de empresas, ya sea el resultado completo
+    (una fila por empresa y año, e.g., de la caché o de la consulta consolidada) o el resultado ya ordenado por
+    get_data_exportaciones_empresas_consolidado (columna POSICION).
+
+    Parámetros:
+    df_empresas (DataFrame): Datos de empresas.
+    year1 (str): Año inicial.
+    year2 (str): Año final (año del orden).
+    top_n (int): Número de empresas.
+
+    Pasos del proceso:
+    1. Con POSICION: sumar los valores de cada posición; las posiciones 1 a top_n son el top y la suma total incluye el resto.
+    2. Sin POSICION: sumar por empresa y año con una agrupación (las mismas sumas que pivot_table), ubicar los valores
+       de year1 y year2 por empresa y seleccionar el top con posiciones_top_empresas (mismo desempate que Snowflake).
+
+    Retorna:
+    dict: 'llaves' (dict de arreglos NIT, razón social y sector del top), 'year1' y 'year2' (valores del top)
+    y 'total_year2' (suma de year2 de todas las empresas).
+    """
+    # 1. Resultado ordenado en Snowflake: una suma por posición (la posición top_n + 1 es el resto de empresas)
+    if 'POSICION' in df_empresas.columns:
+        # La fila del resto no tiene NIT; si existe, el resultado no tiene empresas más allá del top consultado
+        posiciones_empresas = df_empresas.loc[df_empresas['NIT_EXPORTADOR'].notna(), 'POSICION']
+        top_consultado = int(posiciones_empresas.max()) if len(posiciones_empresas) else 0
+        if top_n > top_consultado and df_empresas['NIT_EXPORTADOR'].isna().any():
+            raise ValueError(f"Se pidieron {top_n} empresas, pero get_data_exportaciones_empresas_consolidado solo consultó {top_consultado}; "
+                             f"consultar con top_n={top_n} o usar los datos completos de empresas")
+        years = df_empresas['YEAR'].astype(str)
+        por_posicion = pd.DataFrame({'POSICION': df_empresas['POSICION'],
+                                     'year1': df_empresas['VALOR_USD'].where(years == str(year1), 0),
+                                     'year2': df_empresas['VALOR_USD'].where(years == str(year2), 0)}).groupby('POSICION').sum()
+        es_top = por_posicion.index <= top_n
+        llaves = df_empresas.drop_duplicates('POSICION').set_index('POSICION').loc[por_posicion.index[es_top]]
+        return {'llaves': {llave: llaves[llave].to_numpy(dtype=object) for llave in LLAVES_EMPRESA},
+                'year1': por_posicion['year1'].to_numpy(dtype=float)[es_top], 'year2': por_posicion['year2'].to_numpy(dtype=float)[es_top],
+                'total_year2': por_posicion['year2'].sum()}
+
+    # 2. Resultado completo: sumas por empresa y año, sin pivotear. Las sumas salen ordenadas por empresa, así que cada
+    #    empresa nueva empieza donde cambia alguno de los códigos de NIT, razón social o sector
+    sumas = df_empresas.groupby(LLAVES_EMPRESA + ['YEAR'], observed=True)['VALOR_USD'].sum()
+    codigos = np.vstack(sumas.index.codes[:len(LLAVES_EMPRESA)])
+    inicios = np.concatenate([[True], (np.diff(codigos, axis=1) != 0).any(axis=0)]) if len(sumas) else np.array([], dtype=bool)
+    codigos_empresas = np.cumsum(inicios) - 1
+    primeras = np.flatnonzero(inicios)
+    years_sumas = sumas.index.get_level_values('YEAR').astype(str)
+    valores = {}
+    for nombre, year in [('year1', year1), ('year2', year2)]:
+        en_year = years_sumas == str(year)
+        valores[nombre] = np.zeros(len(primeras), dtype=sumas.dtype)
+        valores[nombre][codigos_empresas[en_year]] = sumas.to_numpy()[en_year]
+    top = posiciones_top_empresas(valores['year2'], [sumas.index.get_level_values(llave)[primeras] for llave in LLAVES_EMPRESA], top_n)
+    return {'llaves': {llave: sumas.index.get_level_values(llave)[primeras[top]].to_numpy(dtype=object) for llave in LLAVES_EMPRESA},
+            'year1': valores['year1'][top], 'year2': valores['year2'][top], 'total_year2': pd.Series(valores['year2']).sum()}
 
 # Función para generar la tabla de empresas con NITs, razón social y sector estrella
-def generar_tabla_empresas(df_empresas, df_totales, year1, year2):
+@trazas.medir
+def generar_tabla_empresas(df_empresas, df_totales, year1, year2, top_n=TOP_EMPRESAS):
     """
     Genera un resumen completo de exportaciones por NIT, incluyendo los valores de exportación de los años especificados,
     la variación porcentual entre esos años y la participación en el último año. También agrega filas para 'Otros' 
     y 'Total' en la tabla final.
 
     Parámetros:
-    df_empresas (DataFrame): DataFrame con los datos de exportaciones por empresa.
+    df_empresas (DataFrame): DataFrame con los datos de exportaciones por empresa (completo o de get_data_exportaciones_empresas_consolidado).
     df_totales (DataFrame): DataFrame con los totales de exportación por año.
     year1 (int): Año inicial para el cálculo de variaciones.
     year2 (int): Año final para el cálculo de variaciones.
+    top_n (int): Número de empresas de la tabla. Con datos de get_data_exportaciones_empresas_consolidado no puede superar el top
+        consultado (top_empresas lanza ValueError).
 
     Pasos del proceso:
-    1. Crear una tabla pivote con los valores de exportación por empresa y año.
-    2. Asegurarse de que los años especificados existen en la tabla pivote.
-    3. Calcular la participación porcentual del último año.
-    4. Calcular la variación porcentual entre los años especificados.
-    5. Resetear el índice de la tabla pivote para facilitar su manejo.
-    6. Seleccionar las columnas deseadas para el resumen.
-    7. Filtrar el top 5 de empresas y agrupar las demás en 'Otros'.
-    8. Crear la fila de totales de exportación.
-    9. Calcular los valores de 'Otros' restando los del top 5 a los totales.
-    10. Combinar las filas de top 5, 'Otros' y 'Total' en el DataFrame final.
-    11. Renombrar las columnas y formatear los valores y porcentajes.
+    1. Obtener las top_n empresas según el último año con top_empresas.
+    2. Obtener los totales de exportación de ambos años.
+    3. Calcular los valores de 'Otros' restando los del top a los totales.
+    4. Calcular la variación porcentual y la participación de cada fila.
+    5. Armar el resultado con las filas del top, 'Otros' y 'Total'.
     
     Retorna:
-    DataFrame: DataFrame con el resumen completo de exportaciones.
+    formato.TablaResultado: Resumen numérico de exportaciones por empresa con el rol de cada fila.
     """
     
-    # 1. Crear la tabla pivote con los valores de exportación por empresa y año
-    df_pivot = df_empresas.pivot_table(values='VALOR_USD', index=['NIT_EXPORTADOR', 'RAZON_SOCIAL', 'SECTOR_ESTRELLA'], columns='YEAR', aggfunc='sum', fill_value=0)
-    
-    # 2. Asegurarse de que los años especificados existen en la tabla pivote
-    if year1 not in df_pivot.columns:
-        df_pivot[year1] = 0
-    if year2 not in df_pivot.columns:
-        df_pivot[year2] = 0
-    
-    # 3. Calcular la participación porcentual del último año
-    total_year2 = df_pivot[year2].sum()
-    df_pivot['Participación (%)'] = (df_pivot[year2] / total_year2) * 100
+    # 1. Top de empresas
+    top = top_empresas(df_empresas, year1, year2, top_n)
+
+    # 2. Totales de exportación de ambos años
+    total_year2 = df_totales[df_totales['YEAR'] == year2]['VALOR_USD'].values[0]
+    total_year1 = df_totales[df_totales['YEAR'] == year1]['VALOR_USD'].values[0] if year1 in df_totales['YEAR'].values else 0
+
+    # 3. Calcular los valores de 'Otros' restando los del top a los totales
+    otros_year1 = total_year1 - top['year1'].sum()
+    otros_year2 = total_year2 - top['year2'].sum()
+
+    # 4. Variación y participación (la fila 'Total' conserva 100% en ambas columnas)
+    columna_year1 = np.append(top['year1'], [otros_year1, total_year1]).astype(float)
+    columna_year2 = np.append(top['year2'], [otros_year2, total_year2]).astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variacion = (columna_year2 - columna_year1) / np.where(columna_year1 == 0, np.nan, columna_year1) * 100
+        participacion = np.append(top['year2'] / top['total_year2'] * 100, otros_year2 / total_year2 * 100)
+    variacion[-1] = 100.0
+    participacion = np.append(participacion, 100.0)
+
+    # 5. Armar el resultado con las etiquetas de cada empresa
+    etiquetas = {nombre: np.append(top['llaves'][llave], otros_total)
+                 for nombre, llave, otros_total in [('NIT', 'NIT_EXPORTADOR', ['Otros', 'Total']),
+                                                    ('Empresa', 'RAZON_SOCIAL', ['', '']),
+                                                    ('Sector', 'SECTOR_ESTRELLA', ['', ''])]}
+    nombre_year1 = f'{transform_year_column_name(year1)} (USD FOB)'
+    nombre_year2 = f'{transform_year_column_name(year2)} (USD FOB)'
+    nombre_participacion = f'Participación {transform_year(year2)} (%)'
+    datos = pd.DataFrame({**etiquetas, nombre_year1: columna_year1, nombre_year2: columna_year2,
+                          'Variación (%)': variacion, nombre_participacion: participacion})
+    roles = [formato.ROL_REGULAR] * len(top['year2']) + [formato.ROL_OTROS, formato.ROL_TOTAL]
+    formatos = {nombre_year1: formato.FORMATO_VALOR, nombre_year2: formato.FORMATO_VALOR,
+                'Variación (%)': formato.FORMATO_PORCENTAJE, nombre_participacion: formato.FORMATO_PORCENTAJE}
+    return formato.TablaResultado(datos, roles, formatos)
+
+# Criterios para ordenar el crecimiento: diferencia absoluta (USD) o variación porcentual
+CRITERIOS_CRECIMIENTO = ['diferencia', 'variacion']
+
+# Función para obtener las posiciones de los k mayores valores con selección parcial
+def posiciones_top_parcial(valores, k):
+    """
+    Devuelve las posiciones de los k mayores valores en el mismo orden que DataFrame.nlargest(k) (los empates conservan
+    el orden original), seleccionando primero los candidatos con np.partition (O(n)) y ordenando solo esos k.
 
-    # 4. Calcular la variación porcentual entre los años especificados
-    df_pivot['Variación (%)'] = ((df_pivot[year2] - df_pivot[year1]) / df_pivot[year1].replace(0, np.nan)) * 100
-    
-    # 5. Resetear el índice de la tabla pivote para facilitar su manejo
-    df_pivot.reset_index(inplace=True)
-    
-    # 6. Seleccionar las columnas deseadas para el resumen
-    df_pivot = df_pivot[['NIT_EXPORTADOR', 'RAZON_SOCIAL', 'SECTOR_ESTRELLA', year1, year2, 'Variación (%)', 'Participación (%)']]
-    
-    # 7. Filtrar el top 5 de empresas y agrupar las demás en 'Otros'
-    top5 = df_pivot.nlargest(5, year2)
-    
-    # 8. Crear la fila de totales de exportación
-    total_row = df_totales[df_totales['YEAR'] == year2].copy()
-    total_row['NIT_EXPORTADOR'] = 'Total'
-    total_row['RAZON_SOCIAL'] = ''
-    total_row['SECTOR_ESTRELLA'] = ''
-    total_row['Variación (%)'] = 100.0
-    total_row['Participación (%)'] = 100.0
-    
-    # Asegurarse de que los años existen en el DataFrame de totales
-    if year1 not in df_totales['YEAR'].values:
-        total_row[year1] = 0
+    Parámetros:
+    valores (ndarray): Valores sin nulos.
+    k (int): Número de posiciones.
+
+    Retorna:
+    ndarray: Posiciones del top k.
+    """
+    if k >= len(valores):
+        return posiciones_top(valores, k)
+    if k <= 0:
+        return np.array([], dtype=np.intp)
+
+    # 1. Umbral: el k-ésimo mayor valor; entran todos los mayores y, entre los iguales al umbral, los primeros
+    umbral = np.partition(valores, len(valores) - k)[len(valores) - k]
+    mayores = np.flatnonzero(valores > umbral)
+    iguales = np.flatnonzero(valores == umbral)[:k - len(mayores)]
+    candidatos = np.concatenate([mayores, iguales])
+
+    # 2. Ordenar los k candidatos de mayor a menor (por posición en los empates)
+    return candidatos[np.lexsort((candidatos, -valores[candidatos]))]
+
+# Función para calcular el ranking de crecimiento de una categoría entre dos años
+@trazas.medir
+def ranking_crecimiento(df, categoria, year1, year2, top_k=5, criterio='diferencia'):
+    """
+    Calcula los totales por etiqueta de la categoría en dos años con una sola agrupación y selecciona las k etiquetas
+    de mayor crecimiento, sin pivotear por otras columnas.
+
+    Parámetros:
+    df (DataFrame): DataFrame con las columnas de la categoría, YEAR y VALOR_USD.
+    categoria (str): Variable categórica a ordenar (e.g., 'SUBSECTOR').
+    year1 (str): Año inicial.
+    year2 (str): Año final.
+    top_k (int): Número de etiquetas a devolver.
+    criterio (str): 'diferencia' (crecimiento absoluto) o 'variacion' (crecimiento porcentual). Con 'variacion' se
+    excluyen las etiquetas sin exportaciones en year1, cuya variación no está definida.
+
+    Pasos del proceso:
+    1. Sumar VALOR_USD por etiqueta y año con una sola agrupación de las filas de ambos años.
+    2. Ubicar las sumas en una matriz etiquetas x (year1, year2); las combinaciones sin datos quedan en 0.
+    3. Calcular la diferencia y la variación porcentual.
+    4. Seleccionar el top k según el criterio.
+
+    Retorna:
+    dict: Arreglos 'etiquetas', 'year1', 'year2', 'diferencia' y 'variacion' de las k etiquetas, de mayor a menor crecimiento.
+    """
+    if criterio not in CRITERIOS_CRECIMIENTO:
+        raise ValueError(f"El criterio {criterio} no es válido. Use uno de {CRITERIOS_CRECIMIENTO}")
+
+    # 1. Sumas por etiqueta y año
+    filas = df[df['YEAR'].isin([year1, year2])]
+    sumas = filas.groupby([categoria, 'YEAR'], observed=True)['VALOR_USD'].sum()
+
+    # 2. Matriz etiquetas x años
+    codigos_etiquetas, etiquetas = pd.factorize(sumas.index.get_level_values(0), sort=True)
+    codigos_years = (sumas.index.get_level_values(1).astype(str) == str(year2)).astype(np.intp)
+    matriz = np.zeros((len(etiquetas), 2))
+    matriz[codigos_etiquetas, codigos_years] = sumas.to_numpy()
+    valores_year1, valores_year2 = matriz[:, 0], matriz[:, 1]
+
+    # 3. Diferencia y variación
+    diferencia = valores_year2 - valores_year1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variacion = diferencia / np.where(valores_year1 == 0, np.nan, valores_year1) * 100
+
+    # 4. Top k por el criterio elegido
+    if criterio == 'diferencia':
+        top = posiciones_top_parcial(diferencia, top_k)
     else:
-        total_row[year1] = df_totales[df_totales['YEAR'] == year1]['VALOR_USD'].values[0]
-    
-    total_row[year2] = df_totales[df_totales['YEAR'] == year2]['VALOR_USD'].values[0]
-    
-    total_row = total_row[['NIT_EXPORTADOR', 'RAZON_SOCIAL', 'SECTOR_ESTRELLA', year1, year2, 'Variación (%)', 'Participación (%)']]
-    
-    # Convertir total_row en DataFrame si es una serie
-    if isinstance(total_row, pd.Series):
-        total_row = total_row.to_frame().T
-    
-    # 9. Calcular los valores de 'Otros' restando los del top 5 a los totales
-    others_sum = total_row.copy()
-    others_sum.iloc[0, others_sum.columns.get_loc(year1)] -= top5[year1].sum()
-    others_sum.iloc[0, others_sum.columns.get_loc(year2)] -= top5[year2].sum()
-    others_sum['NIT_EXPORTADOR'] = 'Otros'
-    others_sum['RAZON_SOCIAL'] = ''
-    others_sum['SECTOR_ESTRELLA'] = ''
-    others_sum['Participación (%)'] = (others_sum[year2] / total_row[year2].values[0]) * 100
-    others_sum['Variación (%)'] = ((others_sum[year2] - others_sum[year1]) / others_sum[year1].replace(0, np.nan)) * 100
-    
-    # 10. Combinar las filas de top 5, 'Otros' y 'Total' en el DataFrame final
-    final_df = pd.concat([top5, others_sum, total_row], ignore_index=True)
-    
-    # 11. Renombrar las columnas y formatear los valores y porcentajes
-    column_names_dict = {
-        'NIT_EXPORTADOR': 'NIT',
-        'RAZON_SOCIAL': 'Empresa',
-        'SECTOR_ESTRELLA': 'Sector',
-        year1: f'{transform_year_column_name(year1)} (USD FOB)',
-        year2: f'{transform_year_column_name(year2)} (USD FOB)',
-        'Variación (%)': 'Variación (%)',
-        'Participación (%)': f'Participación {transform_year(year2)} (%)'
-    }
-    final_df.rename(columns=column_names_dict, inplace=True)
-    
-    # Formatear los valores y porcentajes
-    final_df[f'{transform_year_column_name(year1)} (USD FOB)'] = final_df[f'{transform_year_column_name(year1)} (USD FOB)'].map('{:,.0f}'.format)
-    final_df[f'{transform_year_column_name(year2)} (USD FOB)'] = final_df[f'{transform_year_column_name(year2)} (USD FOB)'].map('{:,.0f}'.format)
-    final_df['Variación (%)'] = final_df['Variación (%)'].map('{:.1f}%'.format)
-    final_df[f'Participación {transform_year(year2)} (%)'] = final_df[f'Participación {transform_year(year2)} (%)'].map('{:.1f}%'.format)
-
-    # Convertir separadores de decimales y miles
-    final_df = final_df.astype(str)
-    for col in final_df.columns[3:]:
-        final_df[col] = final_df[col].apply(lambda x: x.replace(',', 'X').replace('.', ',').replace('X', '.'))
-    
-    return final_df
+        definidas = np.flatnonzero(~np.isnan(variacion))
+        top = definidas[posiciones_top_parcial(variacion[definidas], top_k)]
+    return {'etiquetas': np.asarray(etiquetas, dtype=object)[top], 'year1': valores_year1[top], 'year2': valores_year2[top],
+            'diferencia': diferencia[top], 'variacion': variacion[top]}
 
 # Función para generar la tabla de subsectores con mayor crecimiento
-def generar_tabla_subsectores(df, year1, year2):
+@trazas.medir
+def generar_tabla_subsectores(df, year1, year2, top_k=5, criterio='diferencia'):
     """
     Genera una tabla de resumen de exportaciones por subsector para dos años específicos,
-    incluyendo la diferencia y variación porcentual entre esos años, y filtra el top 5 de subsectores 
-    con mayor diferencia.
+    incluyendo la diferencia y variación porcentual entre esos años, y filtra el top k de subsectores 
+    con mayor crecimiento.
 
     Parámetros:
     df (DataFrame): DataFrame con los datos de exportaciones.
     year1 (int): Año inicial para el cálculo de diferencias y variaciones.
     year2 (int): Año final para el cálculo de diferencias y variaciones.
+    top_k (int): Número de subsectores de la tabla.
+    criterio (str): 'diferencia' para ordenar por crecimiento absoluto o 'variacion' para ordenar por crecimiento porcentual.
 
     Pasos del proceso:
-    1. Filtrar los datos por los años especificados.
-    2. Pivotear los datos para tener los valores de exportación por año y subsector.
-    3. Asegurarse de que los años especificados existan en el DataFrame.
-    4. Unir las tablas de ambos años.
-    5. Calcular los totales por subsector y año.
-    6. Calcular la diferencia y la variación porcentual entre los años.
-    7. Seleccionar las columnas deseadas para el resumen.
-    8. Filtrar el top 5 de subsectores con mayor diferencia.
-    9. Renombrar las columnas y formatear los valores y porcentajes.
+    1. Calcular los totales por subsector y año y el top k con ranking_crecimiento.
+    2. Armar el resultado con los nombres de columnas de los informes.
 
     Retorna:
-    DataFrame: DataFrame con el resumen de exportaciones por subsector.
+    formato.TablaResultado: Resumen numérico de exportaciones por subsector.
     """
 
-    # 1. Filtrar los datos por los años especificados
-    df_year1 = df[df['YEAR'] == year1].copy()
-    df_year2 = df[df['YEAR'] == year2].copy()
+    # 1. Totales, diferencia, variación y top k de subsectores
+    ranking = ranking_crecimiento(df, 'SUBSECTOR', year1, year2, top_k, criterio)
 
-    # 2. Pivotear los datos para tener los valores de exportación por año y subsector
-    pivot_table_year1 = df_year1.pivot_table(values='VALOR_USD', index='SUBSECTOR', columns='PAIS_DESTINO', aggfunc='sum', fill_value=0)
-    pivot_table_year2 = df_year2.pivot_table(values='VALOR_USD', index='SUBSECTOR', columns='PAIS_DESTINO', aggfunc='sum', fill_value=0)
+    # 2. Armar el resultado
+    nombre_year1 = f'{transform_year_column_name(year1)} (USD FOB)'
+    nombre_year2 = f'{transform_year_column_name(year2)} (USD FOB)'
+    datos = pd.DataFrame({'Subsector': ranking['etiquetas'], nombre_year1: ranking['year1'], nombre_year2: ranking['year2'],
+                          'Diferencia (USD FOB)': ranking['diferencia'], 'Variación (%)': ranking['variacion']})
+    formatos = {nombre_year1: formato.FORMATO_VALOR, nombre_year2: formato.FORMATO_VALOR,
+                'Diferencia (USD FOB)': formato.FORMATO_VALOR, 'Variación (%)': formato.FORMATO_PORCENTAJE}
+    return formato.TablaResultado(datos, [formato.ROL_REGULAR] * len(datos), formatos)
 
-    # 3. Asegurarse de que los años especificados existan en el DataFrame
-    pivot_table_year1.columns = [f'{year1}({col})' for col in pivot_table_year1.columns]
-    pivot_table_year2.columns = [f'{year2}({col})' for col in pivot_table_year2.columns]
+# Función para ejecutar consultas independientes de forma concurrente
+def ejecutar_concurrente(tareas, max_concurrencia=1):
+    """
+    Ejecuta funciones independientes (normalmente consultas a Snowflake sobre la misma sesión) en un grupo acotado de hilos.
 
-    # 4. Unir las tablas de ambos años
-    pivot_table = pivot_table_year1.join(pivot_table_year2, how='outer').fillna(0)
-    pivot_table.reset_index(inplace=True)
+    Parámetros:
+    tareas (list): Lista de funciones sin argumentos (e.g., functools.partial) a ejecutar.
+    max_concurrencia (int): Número máximo de consultas simultáneas enviadas a Snowflake. Con 1 se ejecutan en serie.
 
-    # 5. Calcular los totales por subsector y año
-    pivot_table[year1] = pivot_table.filter(like=f'{year1}(').sum(axis=1)
-    pivot_table[year2] = pivot_table.filter(like=f'{year2}(').sum(axis=1)
+    Retorna:
+    list: Resultados de cada tarea, en el mismo orden de la lista de tareas.
+    """
 
-    # 6. Calcular la diferencia y la variación porcentual entre los años
-    pivot_table['Diferencia'] = pivot_table[year2] - pivot_table[year1]
-    pivot_table['Variación (%)'] = ((pivot_table[year2] - pivot_table[year1]) / pivot_table[year1].replace(0, np.nan)) * 100
+    # Ejecución en serie
+    if max_concurrencia is None or max_concurrencia <= 1 or len(tareas) <= 1:
+        return [tarea() for tarea in tareas]
 
-    # 7. Seleccionar las columnas deseadas para el resumen
-    pivot_table = pivot_table[['SUBSECTOR', year1, year2, 'Diferencia', 'Variación (%)']]
+    # Ejecución concurrente: los errores de cualquier consulta se propagan al llamar result()
+    # Cada tarea corre en una copia del contexto para que sus consultas se registren en la traza del informe en curso
+    with ThreadPoolExecutor(max_workers=min(max_concurrencia, len(tareas))) as executor:
+        futuros = [executor.submit(contextvars.copy_context().run, tarea) for tarea in tareas]
+        return [futuro.result() for futuro in futuros]
 
-    # 8. Filtrar el top 5 de subsectores con mayor diferencia
-    pivot_table = pivot_table.nlargest(5, 'Diferencia')
+# Función para consultar por separado los años cerrados y los años abiertos
+def consultar_por_periodos(funcion, session, *filtros, years=None, **kwargs):
+    """
+    Ejecuta una función de consulta por separado para los años cerrados y para los demás años y une los resultados.
+    Así la caché en disco guarda de forma permanente la parte de años cerrados y solo se vuelve a consultar la del año en curso.
 
-    # 9. Renombrar las columnas y formatear los valores y porcentajes
-    column_names_dict = {
-        'SUBSECTOR': 'Subsector',
-        year1: f'{transform_year_column_name(year1)} (USD FOB)',
-        year2: f'{transform_year_column_name(year2)} (USD FOB)',
-        'Diferencia': 'Diferencia (USD FOB)',
-        'Variación (%)': 'Variación (%)'
-    }
-    pivot_table.rename(columns=column_names_dict, inplace=True)
+    Parámetros:
+    funcion (callable): Función de consulta cuyo resultado tiene una fila por año (DataFrame o tupla de DataFrames).
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    filtros: Filtros posicionales de la función (continentes, ..., tipos).
+    years (list): Lista de años a filtrar.
+    kwargs: Demás argumentos de la función.
 
-    # Formatear los valores y porcentajes
-    pivot_table[f'{transform_year_column_name(year1)} (USD FOB)'] = pivot_table[f'{transform_year_column_name(year1)} (USD FOB)'].map('{:,.0f}'.format)
-    pivot_table[f'{transform_year_column_name(year2)} (USD FOB)'] = pivot_table[f'{transform_year_column_name(year2)} (USD FOB)'].map('{:,.0f}'.format)
-    pivot_table['Diferencia (USD FOB)'] = pivot_table['Diferencia (USD FOB)'].map('{:,.0f}'.format)
-    pivot_table['Variación (%)'] = pivot_table['Variación (%)'].map('{:.1f}%'.format)
+    Retorna:
+    DataFrame o tuple: Resultado de la función para todos los años.
+    """
 
-    # Convertir separadores de decimales y miles
-    pivot_table = pivot_table.astype(str)
-    for col in pivot_table.columns[1:]:
-        pivot_table[col] = pivot_table[col].apply(lambda x: x.replace(',', 'X').replace('.', ',').replace('X', '.'))
+    # 1. Separar los años cerrados de los abiertos
+    cerrados = [year for year in years or [] if cache_consultas.es_year_cerrado(year)]
+    abiertos = [year for year in years or [] if year not in cerrados]
 
-    return pivot_table
+    # 2. Sin caché o sin mezcla de años, una sola consulta
+    if not cache_consultas.CACHE_ACTIVA or not cerrados or not abiertos:
+        return funcion(session, *filtros, years=years, **kwargs)
+
+    # 3. Consultar cada parte y unir los resultados conservando las columnas categóricas
+    partes = [funcion(session, *filtros, years=cerrados, **kwargs), funcion(session, *filtros, years=abiertos, **kwargs)]
+    if isinstance(partes[0], tuple):
+        return tuple(concatenar_resultados(list(frames)) for frames in zip(*partes))
+    return concatenar_resultados(partes)
+
+# Función para obtener los tipos con que se consultan las empresas
+def tipos_consulta_empresas(tipos):
+    """
+    Las consultas de empresas ya se limitan a A.TIPO = 'No Mineras', de modo que cualquier lista de tipos que incluya 'No Mineras'
+    da el mismo resultado que no filtrar por tipo. Se normaliza a None para que los alcances total y NME envíen la misma consulta.
+
+    Parámetros:
+    tipos (list): Tipos de posición arancelaria del informe.
+
+    Retorna:
+    list: None si el filtro de tipos no cambia el resultado de las consultas de empresas, o los mismos tipos.
+    """
+    return None if not tipos or 'No Mineras' in tipos else tipos
+
+# Función para filtrar localmente las exportaciones de todos los tipos
+def filtrar_tipos(df_exportaciones, tipos):
+    """
+    Parámetros:
+    df_exportaciones (DataFrame): Exportaciones de todos los tipos (con la columna TIPO).
+    tipos (list): Tipos de posición arancelaria a conservar. Con None se conservan todos.
+
+    Retorna:
+    DataFrame: Filas de los tipos indicados, las mismas que devuelve la consulta con el filtro de tipos.
+    """
+    if not tipos:
+        return df_exportaciones
+    return df_exportaciones[df_exportaciones['TIPO'].isin(tipos)].reset_index(drop=True)
 
 # Función para obtener datos agregados, empresas y subsectores por año cerrado y año corrido
-def obtener_datos_exportaciones(session, continentes=None, zonas_geograficas=None, paises=None, departamentos=None, 
-                                hubs=None, tlcs=None, tipo_tlcss=None, tipos=None, years_cerrado=None, years_corrido=None, umbral=10000):
+@trazas.medir
+def obtener_datos_exportaciones(session, continentes=None, zonas_geograficas=None, paises=None, departamentos=None,
+                                hubs=None, tlcs=None, tipo_tlcss=None, tipos=None, years_cerrado=None, years_corrido=None, umbral=10000,
+                                consolidado=False, max_concurrencia=1, agregado=False, categorias=None):
     """
     Obtiene los datos de exportaciones totales, número de empresas y datos de empresas para años cerrados y corridos.
 
@@ -772,80 +1349,244 @@ def obtener_datos_exportaciones(session, continentes=None, zonas_geograficas=Non
     years_cerrado (list): Lista de años cerrados a filtrar.
     years_corrido (list): Lista de años corridos a filtrar.
     umbral (int): Umbral mínimo de exportación en USD para considerar una empresa.
+    consolidado (bool): Si es True, obtiene los datos de todos los alcances con tres consultas (ver obtener_datos_exportaciones_consolidado)
+        en lugar de cuatro por alcance.
+    max_concurrencia (int): Número máximo de consultas simultáneas. Por defecto las consultas se ejecutan en serie.
+    agregado (bool): Si es True, las exportaciones se obtienen con get_data_exportaciones_agregado (solo las sumas por categoría y año).
+    categorias (list): Categorías de las tablas resumen; solo se usan con agregado=True.
 
     Retorna:
     tuple: Ocho DataFrames con los datos de exportaciones y empresas para años cerrados y corridos.
     """
-    
-    # 1. Obtener datos para año cerrado
-    # Exportaciones totales
-    df_exportaciones_cerrado = get_data_exportaciones(session, continentes, zonas_geograficas, paises, departamentos, 
-                                                      hubs, tlcs, tipo_tlcss, tipos, years_cerrado)
-    # Número de empresas
-    df_numero_empresas_cerrado = get_data_exportaciones_numero_empresas(session, continentes, zonas_geograficas, paises, departamentos, 
-                                                                        hubs, tlcs, tipo_tlcss, tipos, years_cerrado, umbral)
-    # Datos de empresas
-    df_empresas_cerrado, df_totales_cerrado = get_data_exportaciones_empresas(session, continentes, zonas_geograficas, paises, 
-                                                                              departamentos, hubs, tlcs, tipo_tlcss, tipos, years_cerrado)
-    
-    # 2. Obtener datos para año corrido
-    # Exportaciones totales
-    df_exportaciones_corrido = get_data_exportaciones(session, continentes, zonas_geograficas, paises, departamentos, 
-                                                      hubs, tlcs, tipo_tlcss, tipos, years_corrido)
-    # Número de empresas
-    df_numero_empresas_corrido = get_data_exportaciones_numero_empresas(session, continentes, zonas_geograficas, paises, departamentos, 
-                                                                        hubs, tlcs, tipo_tlcss, tipos, years_corrido, umbral)
-    # Datos de empresas
-    df_empresas_corrido, df_totales_corrido = get_data_exportaciones_empresas(session, continentes, zonas_geograficas, paises, 
-                                                                              departamentos, hubs, tlcs, tipo_tlcss, tipos, years_corrido)
+
+    # 0. Modo consolidado: tres consultas para todos los años
+    if consolidado:
+        return obtener_datos_exportaciones_consolidado(session, continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss,
+                                                       [tipos], years_cerrado, years_corrido, umbral, max_concurrencia,
+                                                       agregado=agregado, categorias=categorias)[0]
+
+    # 1. Definir las consultas para año cerrado y año corrido (ninguna depende de otra)
+    # Las exportaciones se consultan para todos los tipos y las empresas sin el filtro de tipos que no cambia su resultado, de modo que
+    # los informes con los mismos filtros y distintos tipos (total y NME) envían las mismas consultas y el segundo las toma de la caché
+    tareas = []
+    for years in [years_cerrado, years_corrido]:
+        tareas += [
+            # Exportaciones totales
+            partial(consultar_por_periodos, get_data_exportaciones_agregado, session, continentes, zonas_geograficas, paises, departamentos,
+                    hubs, tlcs, tipo_tlcss, None, years=years, categorias=categorias) if agregado else
+            partial(consultar_por_periodos, get_data_exportaciones, session, continentes, zonas_geograficas, paises, departamentos,
+                    hubs, tlcs, tipo_tlcss, None, years=years),
+            # Top de empresas y resto ordenados en Snowflake, totales y número de empresas (con todos los años del periodo juntos,
+            # porque el orden depende del último año)
+            partial(get_data_exportaciones_empresas_consolidado, session, continentes, zonas_geograficas, paises,
+                    departamentos, hubs, tlcs, tipo_tlcss, tipos_consulta_empresas(tipos), years, year_ranking=years[-1], umbral=umbral),
+        ]
+
+    # 2. Ejecutar las consultas
+    (df_exportaciones_cerrado, (df_empresas_cerrado, df_totales_cerrado, df_numero_empresas_cerrado),
+     df_exportaciones_corrido, (df_empresas_corrido, df_totales_corrido, df_numero_empresas_corrido)) = ejecutar_concurrente(tareas, max_concurrencia)
+    df_numero_empresas_cerrado = int(df_numero_empresas_cerrado['NUMERO_EMPRESAS'].sum())
+    df_numero_empresas_corrido = int(df_numero_empresas_corrido['NUMERO_EMPRESAS'].sum())
+
+    # 3. Conservar localmente los tipos del informe
+    df_exportaciones_cerrado = filtrar_tipos(df_exportaciones_cerrado, tipos)
+    df_exportaciones_corrido = filtrar_tipos(df_exportaciones_corrido, tipos)
 
     # Devolver los DataFrames generados
     return (df_exportaciones_cerrado, df_numero_empresas_cerrado, df_empresas_cerrado, df_totales_cerrado,
             df_exportaciones_corrido, df_numero_empresas_corrido, df_empresas_corrido, df_totales_corrido)
 
-# Función para generar todas las tablas resumen por categorias
-def generar_todas_tablas_resumen(df, categorias, valores, top_n=None):
+# Función para obtener con tres consultas los datos de todos los años y de varios alcances de tipo
+@trazas.medir
+def obtener_datos_exportaciones_consolidado(session, continentes=None, zonas_geograficas=None, paises=None, departamentos=None,
+                                            hubs=None, tlcs=None, tipo_tlcss=None, alcances_tipos=None, years_cerrado=None, years_corrido=None, umbral=10000,
+                                            max_concurrencia=1, agregado=False, categorias=None):
     """
-    Genera todas las tablas resumen para cada combinación de categorías y valores y asigna nombres descriptivos.
+    Obtiene los mismos datos que obtener_datos_exportaciones, pero para varios alcances de tipo (por ejemplo total y NME)
+    y para años cerrados y corridos con solo tres consultas a Snowflake, separando los resultados localmente.
 
     Parámetros:
-    df (DataFrame): DataFrame proveniente de la función get_data_exportaciones().
-    categorias (list): Lista de variables categóricas para las cuales se generarán las tablas de resumen.
-    valores (list): Lista de variables de valor a agregar ('VALOR_USD' o 'PESO_KG_NETO').
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    continentes (list): Lista de continentes a filtrar.
+    zonas_geograficas (list): Lista de zonas geográficas a filtrar.
+    paises (list): Lista de países a filtrar.
+    departamentos (list): Lista de departamentos a filtrar.
+    hubs (list): Lista de hubs a filtrar.
+    tlcs (list): Lista de tratados de libre comercio a filtrar.
+    tipo_tlcss (list): Lista de tipos de acuerdos comerciales a filtrar.
+    alcances_tipos (list): Lista de listas de tipos de posición arancelaria (e.g., [['No Mineras', 'Mineras'], ['No Mineras']]).
+    years_cerrado (list): Lista de años cerrados a filtrar.
+    years_corrido (list): Lista de años corridos a filtrar.
+    umbral (int): Umbral mínimo de exportación en USD para considerar una empresa.
+    max_concurrencia (int): Número máximo de consultas simultáneas. Con 2 o más, ambas consultas se ejecutan a la vez.
+    agregado (bool): Si es True, las exportaciones se obtienen con get_data_exportaciones_agregado (solo las sumas por categoría y año).
+    categorias (list): Unión de las categorías de las tablas resumen de todos los alcances; solo se usan con agregado=True.
+
+    Pasos del proceso:
+    1. Calcular la unión de tipos y de años a consultar.
+    2. Consultar las exportaciones agrupadas de todos los años y tipos.
+    3. Consultar por periodo (años cerrados y corridos) el top de empresas ordenado en Snowflake, los totales y el número de empresas.
+    4. Separar localmente los resultados por alcance de tipo y por año cerrado o corrido.
 
     Retorna:
-    tuple: Dos listas de tuplas, cada tupla contiene el nombre de la tabla y el DataFrame con la tabla resumen.
+    list: Una tupla de ocho elementos por alcance, en el mismo orden y formato que obtener_datos_exportaciones.
     """
 
-    # Inicializar las listas para almacenar las tablas resumen
-    tablas_resumen_usd = []
-    tablas_resumen_kg = []
+    # 1. Calcular la unión de tipos y de años
+    alcances_tipos = alcances_tipos if alcances_tipos else [None]
+    if any(not tipos for tipos in alcances_tipos):
+        tipos_union = None
+    else:
+        tipos_union = sorted({tipo for tipos in alcances_tipos for tipo in tipos})
+    years = list(years_cerrado) + list(years_corrido)
+
+    # 2. y 3. Exportaciones agrupadas de todos los años y tipos, y empresas de cada periodo
+    # Las exportaciones se consultan para todos los tipos y los alcances se separan localmente (ver obtener_datos_exportaciones).
+    # Las empresas se consultan por periodo porque su orden depende del último año del periodo; la consulta de los años cerrados
+    # se guarda de forma permanente en la caché
+    df_exportaciones, *empresas_periodos = ejecutar_concurrente([
+        partial(consultar_por_periodos, get_data_exportaciones_agregado, session, continentes, zonas_geograficas, paises, departamentos,
+                hubs, tlcs, tipo_tlcss, None, years=years, categorias=categorias) if agregado else
+        partial(consultar_por_periodos, get_data_exportaciones, session, continentes, zonas_geograficas, paises, departamentos,
+                hubs, tlcs, tipo_tlcss, None, years=years),
+    ] + [
+        partial(get_data_exportaciones_empresas_consolidado, session, continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss,
+                tipos_consulta_empresas(tipos_union), years_periodo, year_ranking=years_periodo[-1], umbral=umbral)
+        for years_periodo in [years_cerrado, years_corrido]
+    ], max_concurrencia)
+
+    # 4. Separar por alcance y periodo
+    return separar_alcances(df_exportaciones, empresas_periodos, alcances_tipos, years_cerrado, years_corrido)
+
+# Función para filtrar las exportaciones de un alcance de tipo y un periodo
+def filtro_alcance(df_exportaciones, tipos, years_periodo):
+    """
+    Parámetros:
+    df_exportaciones (DataFrame): Exportaciones de todos los tipos y años.
+    tipos (list): Tipos de posición arancelaria del alcance (None para todos).
+    years_periodo (list): Años del periodo (cerrados o corridos).
 
-    # Iterar sobre cada categoría y valor
-    for categoria in categorias:
-        for valor in valores:
-            # Generar la tabla resumen
-            tabla_resumen = generar_tabla_resumen(df, categoria, valor, top_n)
+    Retorna:
+    Series: Máscara booleana de las filas del alcance y el periodo.
+    """
+    filtro = df_exportaciones['YEAR'].isin(years_periodo)
+    if tipos:
+        filtro &= df_exportaciones['TIPO'].isin(tipos)
+    return filtro
+
+# Función para separar localmente los datos de todos los tipos y años por alcance de tipo y por periodo
+def separar_alcances(df_exportaciones, empresas_periodos, alcances_tipos, years_cerrado, years_corrido):
+    """
+    Parámetros:
+    df_exportaciones (DataFrame): Exportaciones de todos los tipos y años.
+    empresas_periodos (list): Para los años cerrados y para los corridos, la tupla de empresas, totales y número de empresas
+        de get_data_exportaciones_empresas_consolidado.
+    alcances_tipos (list): Lista de listas de tipos de posición arancelaria.
+    years_cerrado (list): Lista de años cerrados.
+    years_corrido (list): Lista de años corridos.
+
+    Retorna:
+    list: Una tupla de ocho elementos por alcance, en el mismo orden y formato que obtener_datos_exportaciones.
+    """
+    resultados = []
+    for tipos in alcances_tipos:
+        datos_alcance = []
+        # Las consultas de empresas solo contemplan exportaciones no mineras
+        incluye_empresas = not tipos or 'No Mineras' in tipos
+        for years_periodo, (df_empresas, df_totales, df_numero_empresas) in zip([years_cerrado, years_corrido], empresas_periodos):
+            df_exportaciones_periodo = df_exportaciones[filtro_alcance(df_exportaciones, tipos, years_periodo)].reset_index(drop=True)
+
+            df_empresas_periodo = df_empresas if incluye_empresas else df_empresas.iloc[:0]
+            df_totales_periodo = df_totales if incluye_empresas else df_totales.iloc[:0]
+            numero_empresas = int(df_numero_empresas['NUMERO_EMPRESAS'].sum()) if incluye_empresas else 0
+
+            datos_alcance += [df_exportaciones_periodo, numero_empresas, df_empresas_periodo, df_totales_periodo]
+        resultados.append(tuple(datos_alcance))
+
+    return resultados
+
+# Lista de tablas que se calculan la primera vez que se usan
+class ListaTablas(Sequence):
+    """
+    Lista de tuplas (nombre, tabla) en la que cada tabla se calcula la primera vez que se accede a ella y se guarda para los
+    siguientes accesos. Se usa igual que la lista de tuplas original (e.g., resultados['Resumen USD Cerrado'][2][1]), de modo
+    que un documento solo paga por las tablas que realmente incluye.
+
+    Parámetros:
+    constructores (list): Lista de tuplas (nombre, función sin argumentos que devuelve la tabla).
+    """
+
+    def __init__(self, constructores):
+        self._nombres = [nombre for nombre, _ in constructores]
+        self._constructores = [constructor for _, constructor in constructores]
+        self._tablas = {}
+
+    def __len__(self):
+        return len(self._nombres)
+
+    @property
+    def nombres(self):
+        return list(self._nombres)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[posicion] for posicion in range(len(self))[indice]]
+        posicion = range(len(self))[indice]
+        if posicion not in self._tablas:
+            self._tablas[posicion] = self._constructores[posicion]()
+        return self._nombres[posicion], self._tablas[posicion]
+
+    def __repr__(self):
+        return f"ListaTablas({self._nombres}, calculadas={sorted(self._tablas)})"
+
+# Función para obtener una tabla resumen del cubo, construyendo antes la categoría si aún no está en el cubo
+def tabla_resumen_cubo_perezosa(df, cubo, categoria, valor, valores, top_n=None):
+    """
+    Parámetros:
+    df (DataFrame): DataFrame proveniente de get_data_exportaciones() o get_data_exportaciones_agregado().
+    cubo (dict): Cubo compartido por las tablas de un mismo DataFrame; se completa con la categoría si no la contiene.
+    categoria (str): Variable categórica de la tabla.
+    valor (str): Variable de valor de la tabla.
+    valores (list): Variables de valor que se suman en el cubo (todas las del informe, en una sola agrupación).
+    top_n: Número de categorías top a filtrar.
 
-            # Crear un nombre descriptivo para la tabla
-            nombre_tabla = f"RESUMEN_{categoria}_{valor}"
+    Retorna:
+    formato.TablaResultado: Tabla resumen numérica (ver tabla_resumen_cubo).
+    """
+    if categoria not in cubo:
+        cubo.update(construir_cubo(df, [categoria], valores))
+    return tabla_resumen_cubo(cubo, categoria, valor, top_n)
 
-            # Clasificar la tabla en la lista correspondiente
-            if valor == 'VALOR_USD':
-                tablas_resumen_usd.append((nombre_tabla, tabla_resumen))
-            elif valor == 'PESO_KG_NETO':
-                tablas_resumen_kg.append((nombre_tabla, tabla_resumen))
+# Función para definir todas las tablas resumen sin calcularlas
+def generar_tablas_resumen_perezosas(df, categorias, valores, top_n=None, cubo=None):
+    """
+    Define las tablas resumen de cada combinación de categorías y valores, con nombres descriptivos (RESUMEN_<categoria>_<valor>).
+    Cada tabla se calcula solo cuando se accede a ella (ver ListaTablas).
+    Las tablas de un mismo DataFrame comparten el cubo, que se construye por categoría en el primer acceso.
 
-    # Retornar las listas de tablas resumen
-    return tablas_resumen_usd, tablas_resumen_kg
+    Parámetros:
+    df (DataFrame): DataFrame proveniente de get_data_exportaciones() o get_data_exportaciones_agregado().
+    categorias (list): Lista de variables categóricas para las cuales se generarán las tablas de resumen.
+    valores (list): Lista de variables de valor a agregar ('VALOR_USD' o 'PESO_KG_NETO').
+    top_n: Número de categorías top a filtrar. Por defecto no se filtran.
+    cubo (dict): Cubo ya construido para df (e.g., por construir_cubos_por_miembro). Las categorías que no contiene se construyen en su primer acceso.
+
+    Retorna:
+    tuple: Dos ListaTablas (USD y KG) de tuplas (nombre de la tabla, formato.TablaResultado).
+    """
+    cubo = {} if cubo is None else cubo
+    constructores = {valor: [(f"RESUMEN_{categoria}_{valor}", partial(tabla_resumen_cubo_perezosa, df, cubo, categoria, valor, valores, top_n))
+                             for categoria in categorias] for valor in valores}
+    return ListaTablas(constructores.get('VALOR_USD', [])), ListaTablas(constructores.get('PESO_KG_NETO', []))
 
 # Función para generar la lista completa de tablas de exportaciones
 def generar_listas_tablas_definitivas_exportaciones(session, continentes=None, zonas_geograficas=None, paises=None, departamentos=None, 
                                       hubs=None, tlcs=None, tipo_tlcss=None, tipos=None, years_cerrado=None, 
-                                      years_corrido=None, umbral=10000, categorias=None, valores=None, top_n = None):
+                                      years_corrido=None, umbral=10000, categorias=None, valores=None, top_n = None, datos=None,
+                                      max_concurrencia=1, agregado=False, top_subsectores=5, criterio_subsectores='diferencia', cubos=None):
     """
     Genera las listas de tablas definitivas de exportaciones, tanto en USD como en KG, a partir de las funciones
-    obtener_datos_exportaciones, generar_todas_tablas_resumen, generar_tabla_empresas y generar_tabla_subsectores.
+    obtener_datos_exportaciones, generar_tablas_resumen_perezosas, generar_tabla_empresas y generar_tabla_subsectores.
 
     Parámetros:
     session (snowflake.snowpark.Session): Sesión activa en Snowflake.
@@ -863,8 +1604,14 @@ def generar_listas_tablas_definitivas_exportaciones(session, continentes=None, z
     categorias (list): Lista de variables categóricas para las cuales se generarán las tablas de resumen.
     valores (list): Lista de variables de valor a agregar ('VALOR_USD' o 'PESO_KG_NETO').
     top_n: Número de categorías top a filtrar. Por defecto no se filtran.
+    datos (tuple): Datos ya obtenidos en el formato de obtener_datos_exportaciones. Si se entregan, no se consulta Snowflake.
+    max_concurrencia (int): Número máximo de consultas simultáneas a Snowflake.
+    agregado (bool): Si es True, Snowflake devuelve solo las sumas por categoría y año que necesitan las tablas.
+    top_subsectores (int): Número de subsectores de las tablas de subsectores.
+    criterio_subsectores (str): 'diferencia' o 'variacion', criterio de crecimiento de las tablas de subsectores.
+    cubos (tuple): Cubos ya construidos de las exportaciones de años cerrados y corridos (ver construir_cubos_por_miembro).
     Retorna:
-    dict: Diccionario con las listas de tablas definitivas.
+    dict: Diccionario con las listas de tablas definitivas. Las tablas se calculan la primera vez que se accede a ellas (ver ListaTablas).
     """
 
     # Transformar lista de parámetros de elección en streamlit 
@@ -875,39 +1622,34 @@ def generar_listas_tablas_definitivas_exportaciones(session, continentes=None, z
 
 
     # Obtener los datos de exportaciones para años cerrados y corridos
+    if datos is None:
+        datos = obtener_datos_exportaciones(
+            session, continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years_cerrado, years_corrido, umbral,
+            max_concurrencia=max_concurrencia, agregado=agregado, categorias=categorias
+        )
     (df_exportaciones_cerrado, df_numero_empresas_cerrado, df_empresas_cerrado, df_totales_cerrado,
-     df_exportaciones_corrido, df_numero_empresas_corrido, df_empresas_corrido, df_totales_corrido) = obtener_datos_exportaciones(
-        session, continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss, tipos, years_cerrado, years_corrido, umbral
-    )
-    
-    # Generar todas las tablas resumen para años cerrados
-    tablas_resumen_usd_cerrado, tablas_resumen_kg_cerrado = generar_todas_tablas_resumen(df_exportaciones_cerrado, categorias, valores, top_n)
-
-    # Generar todas las tablas resumen para años corridos
-    tablas_resumen_usd_corrido, tablas_resumen_kg_corrido = generar_todas_tablas_resumen(df_exportaciones_corrido, categorias, valores, top_n)
+     df_exportaciones_corrido, df_numero_empresas_corrido, df_empresas_corrido, df_totales_corrido) = datos
     
-    # Generar las tablas de empresas para años cerrados y corridos
-    tabla_empresas_cerrado = generar_tabla_empresas(df_empresas_cerrado, df_totales_cerrado, years_cerrado[0], years_cerrado[-1])
-    tabla_empresas_corrido = generar_tabla_empresas(df_empresas_corrido, df_totales_corrido, years_corrido[0], years_corrido[-1])
-
-    # Generar las tablas de subsectores para años cerrados y corridos
-    tabla_subsectores_cerrado = generar_tabla_subsectores(df_exportaciones_cerrado, years_cerrado[0], years_cerrado[-1])
-    tabla_subsectores_corrido = generar_tabla_subsectores(df_exportaciones_corrido, years_corrido[0], years_corrido[-1])
-
-    # Crear las listas de resultados
-    resumen_usd_cerrado = [(nombre, tabla) for nombre, tabla in tablas_resumen_usd_cerrado]
-    resumen_usd_corrido = [(nombre, tabla) for nombre, tabla in tablas_resumen_usd_corrido]
-    resumen_kg_cerrado = [(nombre, tabla) for nombre, tabla in tablas_resumen_kg_cerrado]
-    resumen_kg_corrido = [(nombre, tabla) for nombre, tabla in tablas_resumen_kg_corrido]
+    # Definir todas las tablas resumen para años cerrados y corridos (cada tabla se calcula en su primer acceso)
+    cubo_cerrado, cubo_corrido = cubos if cubos is not None else (None, None)
+    resumen_usd_cerrado, resumen_kg_cerrado = generar_tablas_resumen_perezosas(df_exportaciones_cerrado, categorias, valores, top_n, cubo_cerrado)
+    resumen_usd_corrido, resumen_kg_corrido = generar_tablas_resumen_perezosas(df_exportaciones_corrido, categorias, valores, top_n, cubo_corrido)
 
     numero_empresas_cerrado = [("Numero de Empresas Año Cerrado", df_numero_empresas_cerrado)]
     numero_empresas_corrido = [("Numero de Empresas Año Corrido", df_numero_empresas_corrido)]
 
-    tablas_empresas_cerrado = [("Tabla Empresas Año Cerrado", tabla_empresas_cerrado)]
-    tablas_empresas_corrido = [("Tabla Empresas Año Corrido", tabla_empresas_corrido)]
+    # Definir las tablas de empresas y de subsectores para años cerrados y corridos
+    tablas_empresas_cerrado = ListaTablas([("Tabla Empresas Año Cerrado",
+                                            partial(generar_tabla_empresas, df_empresas_cerrado, df_totales_cerrado, years_cerrado[0], years_cerrado[-1]))])
+    tablas_empresas_corrido = ListaTablas([("Tabla Empresas Año Corrido",
+                                            partial(generar_tabla_empresas, df_empresas_corrido, df_totales_corrido, years_corrido[0], years_corrido[-1]))])
 
-    tablas_subsectores_cerrado = [("Tabla Subsectores Año Cerrado", tabla_subsectores_cerrado)]
-    tablas_subsectores_corrido = [("Tabla Subsectores Año Corrido", tabla_subsectores_corrido)]
+    tablas_subsectores_cerrado = ListaTablas([("Tabla Subsectores Año Cerrado",
+                                               partial(generar_tabla_subsectores, seleccionar_agrupacion(df_exportaciones_cerrado, 'SUBSECTORES'), years_cerrado[0], years_cerrado[-1],
+                                                       top_subsectores, criterio_subsectores))])
+    tablas_subsectores_corrido = ListaTablas([("Tabla Subsectores Año Corrido",
+                                               partial(generar_tabla_subsectores, seleccionar_agrupacion(df_exportaciones_corrido, 'SUBSECTORES'), years_corrido[0], years_corrido[-1],
+                                                       top_subsectores, criterio_subsectores))])
 
     # Crear un diccionario para organizar los resultados
     resultados = {
@@ -924,4 +1666,230 @@ def generar_listas_tablas_definitivas_exportaciones(session, continentes=None, z
     }
 
     # Retornar el diccionario con los resultados
-    return resultados
\ No newline at end of file
+    return resultados
+
+# Función para generar las listas de tablas de varios alcances con una sola descarga de datos
+def generar_listas_tablas_definitivas_exportaciones_consolidado(session, continentes=None, zonas_geograficas=None, paises=None, departamentos=None,
+                                                                hubs=None, tlcs=None, tipo_tlcss=None, alcances=None, years_cerrado=None,
+                                                                years_corrido=None, umbral=10000, valores=None, max_concurrencia=1, agregado=False,
+                                                                top_subsectores=5, criterio_subsectores='diferencia'):
+    """
+    Genera las listas de tablas definitivas para varios alcances (por ejemplo la base total y la base NME) consultando
+    Snowflake una sola vez con obtener_datos_exportaciones_consolidado.
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    continentes (str): Continente elegido en streamlit.
+    zonas_geograficas (list): Lista de zonas geográficas a filtrar.
+    paises (str): País elegido en streamlit.
+    departamentos (str): Departamento elegido en streamlit.
+    hubs (str): HUB elegido en streamlit.
+    tlcs (list): Lista de tratados de libre comercio a filtrar.
+    tipo_tlcss (list): Lista de tipos de acuerdos comerciales a filtrar.
+    alcances (list): Lista de diccionarios con las llaves 'tipos', 'categorias' y 'top_n', uno por alcance.
+    years_cerrado (list): Lista de años cerrados a filtrar.
+    years_corrido (list): Lista de años corridos a filtrar.
+    umbral (int): Umbral mínimo de exportación en USD para considerar una empresa.
+    valores (list): Lista de variables de valor a agregar ('VALOR_USD' o 'PESO_KG_NETO').
+    max_concurrencia (int): Número máximo de consultas simultáneas a Snowflake.
+    agregado (bool): Si es True, Snowflake devuelve solo las sumas por categoría y año que necesitan las tablas.
+    top_subsectores (int): Número de subsectores de las tablas de subsectores.
+    criterio_subsectores (str): 'diferencia' o 'variacion', criterio de crecimiento de las tablas de subsectores.
+
+    Retorna:
+    list: Un diccionario de resultados por alcance, en el mismo orden y formato que generar_listas_tablas_definitivas_exportaciones.
+    """
+
+    # Obtener los datos de todos los alcances con una sola descarga
+    datos_alcances = obtener_datos_exportaciones_consolidado(
+        session, [continentes] if continentes else [], zonas_geograficas, [paises] if paises else [],
+        [departamentos] if departamentos else [], [hubs] if hubs else [], tlcs, tipo_tlcss,
+        [alcance['tipos'] for alcance in alcances], years_cerrado, years_corrido, umbral, max_concurrencia,
+        agregado=agregado, categorias=list(dict.fromkeys(categoria for alcance in alcances for categoria in alcance['categorias']))
+    )
+
+    # Generar las tablas de cada alcance a partir de sus datos
+    return [generar_listas_tablas_definitivas_exportaciones(session, continentes, zonas_geograficas, paises, departamentos, hubs, tlcs, tipo_tlcss,
+                                                            alcance['tipos'], years_cerrado, years_corrido, umbral, alcance['categorias'],
+                                                            valores, alcance['top_n'], datos=datos,
+                                                            top_subsectores=top_subsectores, criterio_subsectores=criterio_subsectores)
+            for alcance, datos in zip(alcances, datos_alcances)]
+
+######################################################
+# GENERACIÓN MASIVA: TODOS LOS MIEMBROS DE UNA DIMENSIÓN
+######################################################
+
+# Dimensiones de los informes: filtro -> (columna en las exportaciones, columna en las consultas de empresas)
+DIMENSIONES_INFORME = {
+    'continentes': ('CONTINENTE', 'CONTINENTE'),
+    'hubs': ('HUB', 'HUB'),
+    'paises': ('PAIS_DESTINO', 'PAIS_DESTINO'),
+    'departamentos': ('DEPARTAMENTO_ORIGEN', 'DPTO_MAS_EXPORTA_ESTRELLA'),
+}
+
+# Función para separar un DataFrame por miembro de una dimensión
+def dividir_por_miembro(df, columna):
+    """
+    Separa las filas de cada miembro con una sola agrupación (sin filtrar el DataFrame una vez por miembro).
+
+    Parámetros:
+    df (DataFrame): DataFrame con la columna de la dimensión.
+    columna (str): Columna de la dimensión.
+
+    Retorna:
+    dict: Por miembro, el DataFrame con sus filas (en el orden original).
+    """
+    return {miembro: df.take(posiciones).reset_index(drop=True)
+            for miembro, posiciones in df.groupby(columna, observed=True, sort=False).indices.items()}
+
+# Función para generar las listas de tablas de todos los miembros de una dimensión con una sola descarga de datos
+@trazas.medir
+def generar_listas_tablas_por_dimension(session, dimension, miembros=None, zonas_geograficas=None, tlcs=None, tipo_tlcss=None, alcances=None,
+                                        years_cerrado=None, years_corrido=None, umbral=10000, valores=None, max_concurrencia=1, agregado=False,
+                                        top_subsectores=5, criterio_subsectores='diferencia'):
+    """
+    Genera las listas de tablas de generar_listas_tablas_definitivas_exportaciones_consolidado para todos los miembros de una
+    dimensión (e.g., todos los países) con las mismas tres consultas a Snowflake que un solo informe: cada consulta agrega la
+    columna de la dimensión a su agrupación (y a la partición del orden de las empresas), y los datos y los cubos de las tablas
+    resumen se separan por miembro localmente.
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    dimension (str): Dimensión de los informes: 'continentes', 'hubs', 'paises' o 'departamentos'.
+    miembros (list): Miembros de la dimensión a generar. Por defecto todos los que tienen exportaciones.
+    zonas_geograficas (list): Lista de zonas geográficas a filtrar.
+    tlcs (list): Lista de tratados de libre comercio a filtrar.
+    tipo_tlcss (list): Lista de tipos de acuerdos comerciales a filtrar.
+    alcances (list): Lista de diccionarios con las llaves 'tipos', 'categorias' y 'top_n', uno por alcance.
+    years_cerrado (list): Lista de años cerrados a filtrar.
+    years_corrido (list): Lista de años corridos a filtrar.
+    umbral (int): Umbral mínimo de exportación en USD para considerar una empresa.
+    valores (list): Lista de variables de valor a agregar ('VALOR_USD' o 'PESO_KG_NETO').
+    max_concurrencia (int): Número máximo de consultas simultáneas a Snowflake.
+    agregado (bool): Si es True, Snowflake devuelve solo las sumas por categoría, miembro y año que necesitan las tablas.
+    top_subsectores (int): Número de subsectores de las tablas de subsectores.
+    criterio_subsectores (str): 'diferencia' o 'variacion', criterio de crecimiento de las tablas de subsectores.
+
+    Pasos del proceso:
+    1. Consultar exportaciones de todos los miembros, tipos y años y el top de empresas, totales y número de empresas de cada
+       miembro por periodo (tres consultas).
+    2. Separar las filas de cada miembro con una sola agrupación por DataFrame.
+    3. Construir los cubos de las tablas resumen de todos los miembros con una agrupación por alcance, periodo y categoría.
+    4. Separar los datos de cada miembro por alcance y periodo y definir sus tablas.
+
+    Retorna:
+    dict: Por miembro, una lista con un diccionario de resultados por alcance, en el mismo orden y formato que
+    generar_listas_tablas_definitivas_exportaciones_consolidado (ver generar_resultados_dimension).
+    """
+    if dimension not in DIMENSIONES_INFORME:
+        raise ValueError(f"La dimensión {dimension} no es una de {list(DIMENSIONES_INFORME)}")
+    columna, columna_empresas = DIMENSIONES_INFORME[dimension]
+    consultas.validar_filtros(miembros)
+
+    # 1. Exportaciones, empresas y totales de todos los miembros (la lista de miembros, si se entrega, es el filtro de la dimensión)
+    alcances_tipos = [alcance['tipos'] for alcance in alcances]
+    tipos_union = None if any(not tipos for tipos in alcances_tipos) else sorted({tipo for tipos in alcances_tipos for tipo in tipos})
+    categorias = list(dict.fromkeys(categoria for alcance in alcances for categoria in alcance['categorias']))
+    years = list(years_cerrado) + list(years_corrido)
+    filtros = {'continentes': None, 'zonas_geograficas': zonas_geograficas, 'paises': None, 'departamentos': None, 'hubs': None,
+               'tlcs': tlcs, 'tipo_tlcss': tipo_tlcss}
+    filtros[dimension] = miembros
+    df_exportaciones, *empresas_periodos = ejecutar_concurrente([
+        partial(consultar_por_periodos, get_data_exportaciones_agregado, session, tipos=None, years=years, categorias=categorias, dimension=columna, **filtros) if agregado else
+        partial(consultar_por_periodos, get_data_exportaciones, session, tipos=None, years=years, **filtros),
+    ] + [
+        partial(get_data_exportaciones_empresas_consolidado, session, tipos=tipos_consulta_empresas(tipos_union), years=years_periodo,
+                dimension=columna_empresas, year_ranking=years_periodo[-1], umbral=umbral, **filtros)
+        for years_periodo in [years_cerrado, years_corrido]
+    ], max_concurrencia)
+
+    # 2. Filas de cada miembro
+    exportaciones = dividir_por_miembro(df_exportaciones, columna)
+    empresas = [[dividir_por_miembro(df, columna_empresas) for df in datos_periodo] for datos_periodo in empresas_periodos]
+    miembros = miembros if miembros else sorted(exportaciones, key=str)
+
+    # 3. Cubos de todos los miembros por alcance y periodo
+    cubos = {}
+    for posicion, alcance in enumerate(alcances):
+        for periodo, years_periodo in enumerate([years_cerrado, years_corrido]):
+            df_periodo = df_exportaciones[filtro_alcance(df_exportaciones, alcance['tipos'], years_periodo)]
+            for miembro, cubo in construir_cubos_por_miembro(df_periodo, columna, alcance['categorias'], valores).items():
+                cubos.setdefault((miembro, posicion), [{}, {}])[periodo] = cubo
+
+    # 4. Tablas de cada miembro (se calculan en su primer acceso)
+    resultados = {}
+    for miembro in miembros:
+        empresas_miembro = [tuple(por_miembro.get(miembro, df.iloc[:0]) for por_miembro, df in zip(divididos, datos_periodo))
+                            for divididos, datos_periodo in zip(empresas, empresas_periodos)]
+        datos_alcances = separar_alcances(exportaciones.get(miembro, df_exportaciones.iloc[:0]), empresas_miembro, alcances_tipos,
+                                          years_cerrado, years_corrido)
+        resultados[miembro] = [
+            generar_listas_tablas_definitivas_exportaciones(session, tipos=alcance['tipos'], years_cerrado=years_cerrado, years_corrido=years_corrido,
+                                                            umbral=umbral, categorias=alcance['categorias'], valores=valores, top_n=alcance['top_n'],
+                                                            datos=datos, top_subsectores=top_subsectores, criterio_subsectores=criterio_subsectores,
+                                                            cubos=cubos.get((miembro, posicion), [{}, {}]))
+            for posicion, (alcance, datos) in enumerate(zip(alcances, datos_alcances))]
+    return resultados
+
+######################################################
+# INFORMES PLANEADOS A PARTIR DE SU ESPECIFICACIÓN
+######################################################
+
+# Función para obtener las tablas de un informe según su especificación (ver informes.INFORMES)
+@trazas.medir
+def generar_resultados_informe(session, tipo, entidad=None, zonas_geograficas=None, tlcs=None, tipo_tlcss=None, years_cerrado=None, years_corrido=None,
+                               umbral=10000, max_concurrencia=1, agregado=False, top_subsectores=5, criterio_subsectores='diferencia'):
+    """
+    Consulta y define solo las tablas que presenta un tipo de informe: los alcances, categorías y valores se derivan de su
+    especificación con informes.planear_informe, en lugar de calcular todas las combinaciones posibles.
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    tipo (str): Tipo de informe: 'continente', 'hub', 'pais', 'departamento' o 'colombia'.
+    entidad (str): Miembro elegido en streamlit (e.g., el país del informe). No aplica para 'colombia'.
+    zonas_geograficas (list): Lista de zonas geográficas a filtrar.
+    tlcs (list): Lista de tratados de libre comercio a filtrar.
+    tipo_tlcss (list): Lista de tipos de acuerdos comerciales a filtrar.
+    years_cerrado (list): Lista de años cerrados a filtrar.
+    years_corrido (list): Lista de años corridos a filtrar.
+    umbral (int): Umbral mínimo de exportación en USD para considerar una empresa.
+    max_concurrencia (int): Número máximo de consultas simultáneas a Snowflake.
+    agregado (bool): Si es True, Snowflake devuelve solo las sumas por categoría y año que necesitan las tablas.
+    top_subsectores (int): Número de subsectores de las tablas de subsectores.
+    criterio_subsectores (str): 'diferencia' o 'variacion', criterio de crecimiento de las tablas de subsectores.
+
+    Retorna:
+    dict: Por nombre de alcance (e.g., 'total' y 'nme'), el diccionario de resultados de generar_listas_tablas_definitivas_exportaciones
+    (listo para documentos.create_document).
+    """
+    plan = informes.planear_informe(tipo)
+    filtros = {'continentes': None, 'paises': None, 'departamentos': None, 'hubs': None}
+    dimension = informes.especificacion(tipo)['dimension']
+    if dimension:
+        filtros[dimension] = entidad
+    resultados = generar_listas_tablas_definitivas_exportaciones_consolidado(
+        session, zonas_geograficas=zonas_geograficas, tlcs=tlcs, tipo_tlcss=tipo_tlcss, alcances=plan['alcances'], years_cerrado=years_cerrado,
+        years_corrido=years_corrido, umbral=umbral, valores=plan['valores'], max_concurrencia=max_concurrencia, agregado=agregado,
+        top_subsectores=top_subsectores, criterio_subsectores=criterio_subsectores, **filtros)
+    return {alcance['nombre']: resultado for alcance, resultado in zip(plan['alcances'], resultados)}
+
+# Función para obtener las tablas de los informes de todos los miembros de una dimensión según su especificación
+def generar_resultados_dimension(session, dimension, miembros=None, zonas_geograficas=None, tlcs=None, tipo_tlcss=None, years_cerrado=None,
+                                 years_corrido=None, umbral=10000, max_concurrencia=1, agregado=False, top_subsectores=5, criterio_subsectores='diferencia'):
+    """
+    Igual que generar_resultados_informe, pero para todos los miembros de una dimensión con generar_listas_tablas_por_dimension.
+
+    Parámetros:
+    dimension (str): Dimensión de los informes: 'continentes', 'hubs', 'paises' o 'departamentos'.
+    miembros (list): Miembros de la dimensión a generar. Por defecto todos los que tienen exportaciones.
+    Los demás parámetros son los de generar_resultados_informe.
+
+    Retorna:
+    dict: Por miembro, el diccionario de resultados por nombre de alcance de generar_resultados_informe.
+    """
+    plan = informes.planear_informe(informes.tipo_dimension(dimension))
+    por_miembro = generar_listas_tablas_por_dimension(session, dimension, miembros, zonas_geograficas, tlcs, tipo_tlcss, plan['alcances'],
+                                                      years_cerrado, years_corrido, umbral, plan['valores'], max_concurrencia, agregado,
+                                                      top_subsectores, criterio_subsectores)
+    return {miembro: {alcance['nombre']: resultado for alcance, resultado in zip(plan['alcances'], resultados)}
+            for miembro, resultados in por_miembro.items()}
\ No newline at end of file
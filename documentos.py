@@ -21,15 +21,23 @@
 #from docx.oxml import parse_xml, OxmlElement
 #from docx.oxml.ns import nsdecls, qn
 
+import io
+import os
+import copy
+import re
 import pandas as pd
+from xml.sax.saxutils import escape
 from docx import Document
-from docx.shared import Pt, RGBColor, Inches
+from docx.shared import Pt, RGBColor, Inches, Emu
 from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml import parse_xml, OxmlElement
 from docx.oxml.ns import nsdecls, qn
 from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
+import trazas
+import formato
+import informes
 
 ################################################
 # FUNCIONES PARA DEFINIR ESTILOS Y CREAR OBJETOS
@@ -145,17 +153,104 @@ def set_cell_border(cell, **kwargs):
                 if key in edge_data:
                     element.set(qn("w:{}".format(key)), str(edge_data[key]))
 
+# Construir las filas de las tablas como XML en una sola pasada (con False se usan los objetos de python-docx celda por celda)
+TABLAS_XML = True
+
+# Bordes de todas las celdas de las tablas
+BORDES_CELDA = '<w:tcBorders>' + ''.join(f'<w:{borde} w:sz="1" w:val="single" w:color="000000"/>' for borde in ['top', 'left', 'bottom', 'right']) + '</w:tcBorders>'
+
+# Sombreado de la celda y formato del texto de cada tipo de fila (los mismos que aplica add_table celda por celda)
+FORMATO_FILAS = {
+    'encabezado': ('<w:shd w:fill="#215E99"/>', '<w:b/><w:color w:val="FFFFFF"/>'),
+    'regular': ('', ''),
+    'resaltada': ('<w:shd w:fill="#DAE9F7"/>', '<w:b/><w:color w:val="000000"/>'),
+}
+
+# Caracteres que python-docx escribe como elementos propios (w:tab y w:br) en lugar de texto
+CARACTERES_ESPECIALES = re.compile(r'([\t\n\r])')
+
+# Función para escribir el texto de una celda como XML, igual que python-docx al asignar cell.text
+def xml_texto(texto):
+    """
+    Args:
+    texto (str): Texto de la celda.
+
+    Returns:
+    str: Elementos w:t (con xml:space="preserve" si el texto empieza o termina en espacios), w:tab y w:br del texto.
+    """
+    partes = CARACTERES_ESPECIALES.split(texto) if CARACTERES_ESPECIALES.search(texto) else [texto]
+    xml = ''
+    for parte in partes:
+        if parte == '\t':
+            xml += '<w:tab/>'
+        elif parte in ('\n', '\r'):
+            xml += '<w:br/>'
+        elif parte:
+            espacio = ' xml:space="preserve"' if len(parte.strip()) < len(parte) else ''
+            xml += f'<w:t{espacio}>{escape(parte)}</w:t>'
+    return xml
+
+# Función para crear tablas construyendo el XML de todas sus filas en una sola pasada
+def add_table_xml(doc: Document, dataframe: pd.DataFrame, style: str, filas_resaltadas=()):
+    """
+    Agrega al documento la misma tabla que add_table celda por celda (mismo XML), pero las filas se escriben como texto XML a partir
+    de una plantilla de celda por tipo de fila y se convierten en elementos de una sola vez, sin pasar por los objetos de python-docx.
+
+    Args:
+    doc (Document): El documento al que se añadirá la tabla.
+    dataframe (DataFrame): La tabla ya formateada.
+    style (str): El estilo de la tabla.
+    filas_resaltadas (set): Etiquetas del índice de las filas que se resaltan (e.g., 'Total').
+    """
+    # 1. Crear la tabla sin filas con python-docx (estilo, alineación y cuadrícula de columnas)
+    table = doc.add_table(rows=0, cols=len(dataframe.columns))
+    table.style = doc.styles[style]
+    table.alignment = WD_TABLE_ALIGNMENT.CENTER
+    table.autofit = True
+
+    # 2. Plantillas de celda: todas las celdas ocupan el ancho entre las márgenes del documento
+    ancho = Emu(doc.sections[0].page_width - doc.sections[0].left_margin - doc.sections[0].right_margin).twips
+    plantillas = {
+        tipo: (f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{ancho}"/><w:vAlign w:val="center"/>{sombreado}{BORDES_CELDA}</w:tcPr>'
+               f'<w:p><w:pPr><w:jc w:val="center"/></w:pPr><w:r><w:rPr>{formato_texto}<w:sz w:val="20"/></w:rPr>', '</w:r></w:p></w:tc>')
+        for tipo, (sombreado, formato_texto) in FORMATO_FILAS.items()
+    }
+
+    # 3. Escribir el encabezado y las filas (los valores se convierten a texto como en DataFrame.iterrows)
+    def xml_fila(valores, tipo):
+        inicio, fin = plantillas[tipo]
+        return '<w:tr>' + ''.join(inicio + xml_texto(str(valor)) + fin for valor in valores) + '</w:tr>'
+
+    filas = [xml_fila(dataframe.columns, 'encabezado')]
+    filas += [xml_fila(valores, 'resaltada' if index in filas_resaltadas else 'regular')
+              for index, valores in zip(dataframe.index, dataframe.to_numpy())]
+
+    # 4. Convertir todas las filas en elementos de una sola vez y moverlas a la tabla
+    contenedor = parse_xml(f'<w:tbl {nsdecls("w")}>' + ''.join(filas) + '</w:tbl>')
+    table._tbl.extend(list(contenedor))
+    return table
+
 # Función para crear tablas
+@trazas.medir
 def add_table(doc: Document, dataframe: pd.DataFrame, style: str):
     """
-    Agrega una tabla al documento a partir de un DataFrame.
+    Agrega una tabla al documento a partir de un DataFrame o de un resultado numérico (formato.TablaResultado),
+    que se formatea en este momento; en ese caso se resaltan las filas con rol 'Total'.
+    Con TABLAS_XML la tabla se construye con add_table_xml; si no, celda por celda con python-docx.
 
     Args:
     doc (Document): El documento al que se añadirá la tabla.
-    dataframe (DataFrame): El DataFrame que se convertirá en tabla.
+    dataframe (DataFrame o formato.TablaResultado): La tabla que se agregará al documento.
     style (str): El estilo de la tabla.
     """
-    if isinstance(dataframe, pd.DataFrame):
+    if isinstance(dataframe, formato.TablaResultado):
+        filas_resaltadas = set(dataframe.posiciones(formato.ROL_TOTAL))
+        dataframe = dataframe.formatear()
+    elif isinstance(dataframe, pd.DataFrame):
+        filas_resaltadas = {len(dataframe) - 1}  # Última fila
+    if isinstance(dataframe, pd.DataFrame) and TABLAS_XML:
+        add_table_xml(doc, dataframe, style, filas_resaltadas)
+    elif isinstance(dataframe, pd.DataFrame):
         table = doc.add_table(rows=1, cols=len(dataframe.columns))
         table.style = doc.styles[style]
         table.alignment = WD_TABLE_ALIGNMENT.CENTER
@@ -187,7 +282,7 @@ def add_table(doc: Document, dataframe: pd.DataFrame, style: str):
                 row_cells[i].paragraphs[0].alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
                 row_cells[i].vertical_alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
                 row_cells[i].paragraphs[0].runs[0].font.size = Pt(10)
-                if index == len(dataframe) - 1:  # Última fila
+                if index in filas_resaltadas:
                     row_cells[i].paragraphs[0].runs[0].bold = True
                     shading_elm = OxmlElement("w:shd")
                     shading_elm.set(qn("w:fill"), "#DAE9F7")
@@ -330,650 +425,276 @@ def add_header_footer(doc: Document, header_image_left: str, header_image_right:
     footer_run_right.add_picture(footer_image, width=Inches(2.0))
 
 
-#############
-# CONTINENTES
-#############
-def create_document_continentes(df_total, df_nme, file_path, titulo, fecha, header_image_left, header_image_right, footer_image, year_cerrado, year_corrido):
+# Texto del pie de página de todos los informes
+FOOTER_TEXT = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
+
+# Partir de un documento base construido una sola vez (con False cada informe construye estilos, encabezado y pie de página)
+PLANTILLA_BASE = True
+
+# Documentos base ya leídos, por imágenes del encabezado y del pie de página (ver documento_base)
+_documentos_base = {}
+
+# Función para obtener una copia del documento base de los informes
+def documento_base(header_image_left, header_image_right, footer_image):
     """
-    Crea un documento Word con los resultados proporcionados.
+    Construye una sola vez por proceso (y por imágenes) el documento con los estilos, el encabezado y el pie de página con
+    los logos y la tabla de contenido entre dos saltos de página, lo guarda en memoria ya leído y devuelve una copia profunda.
+    Si cambia alguna de las imágenes en disco, el documento base se vuelve a construir.
 
     Args:
-    resultados (dict): Diccionario con los resultados que se incluirán en el informe.
-    file_path (str): Ruta donde se guardará el documento de salida.
-    titulo (str): El título principal del informe.
+    header_image_left (str): Ruta de la imagen para el encabezado (izquierda).
+    header_image_right (str): Ruta de la imagen para el encabezado (derecha).
+    footer_image (str): Ruta de la imagen para el pie de página.
+
+    Returns:
+    Document: Documento nuevo, independiente de los demás informes.
+    """
+    imagenes = (header_image_left, header_image_right, footer_image)
+    clave = tuple((imagen, os.path.getmtime(imagen)) for imagen in imagenes)
+    if clave not in _documentos_base:
+        doc = Document()
+        estilos(doc)
+        add_header_footer(doc, *imagenes, FOOTER_TEXT)
+        doc.add_page_break()
+        agregar_tabla_contenidos(doc)
+        doc.add_page_break()
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        _documentos_base[clave] = Document(buffer)
+    return copy.deepcopy(_documentos_base[clave])
+
+# Función para crear el documento de un informe hasta la tabla de contenido
+@trazas.medir
+def crear_documento_base(titulo, fecha, header_image_left, header_image_right, footer_image):
+    """
+    Crea el inicio común de todos los informes: estilos, encabezado y pie de página, título, fecha de actualización y tabla de contenido.
+    Con PLANTILLA_BASE se parte de una copia de documento_base y solo se insertan el título y la fecha antes de la tabla de contenido.
+
+    Args:
+    titulo (str): Título principal del informe (e.g., 'TRES EJES PAÍSES: PERÚ').
     fecha (str): La fecha de actualización del informe.
     header_image_left (str): Ruta de la imagen para el encabezado (izquierda).
     header_image_right (str): Ruta de la imagen para el encabezado (derecha).
     footer_image (str): Ruta de la imagen para el pie de página.
-    footer_text (str): Texto para el pie de página.
+
+    Returns:
+    Document: Documento listo para agregar las secciones del informe.
+    """
+    if not PLANTILLA_BASE:
+        doc = Document()
+        estilos(doc)
+        add_header_footer(doc, header_image_left, header_image_right, footer_image, FOOTER_TEXT)
+        title_paragraph = doc.add_paragraph(titulo, style='Title')
+        title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
+        date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        doc.add_page_break()
+        agregar_tabla_contenidos(doc)
+        doc.add_page_break()
+        return doc
+
+    # El primer párrafo del documento base es el salto de página anterior a la tabla de contenido
+    doc = documento_base(header_image_left, header_image_right, footer_image)
+    salto_pagina = doc.paragraphs[0]
+    title_paragraph = salto_pagina.insert_paragraph_before(titulo, style='Title')
+    title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    date_paragraph = salto_pagina.insert_paragraph_before(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
+    date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    return doc
+
+#####################################
+# DOCUMENTO A PARTIR DE SU ESPECIFICACIÓN
+#####################################
+
+# Función para agregar un bloque de contenido de una subsección para el año cerrado y el año corrido
+def agregar_bloque(doc, bloque, resultados, year_cerrado, year_corrido):
+    """
+    Args:
+    doc (Document): Documento del informe.
+    bloque (tuple): Bloque de contenido (ver informes.SUBSECCIONES).
+    resultados (dict): Resultados del alcance de la sección.
     year_cerrado (str): Texto con el año cerrado del informe.
     year_corrido (str): Texto con el año corrido del informe.
     """
-    doc = Document()
-    estilos(doc)
+    # Número de empresas: un párrafo por periodo con el número en negrita
+    if bloque[0] == 'numero_empresas':
+        for texto, periodo in [(f'Número de empresas exportadoras en {str(year_cerrado)}: ', 'Cerrado'),
+                               (f'Número de empresas exportadoras a {str(year_corrido)}: ', 'Corrido')]:
+            paragraph = doc.add_paragraph(texto, style='Normal')
+            run = paragraph.add_run(f'{str(informes.tabla_bloque(resultados, bloque, periodo))} empresas')
+            run.bold = True
+        return
+    # Tablas: año cerrado y año corrido, cada una seguida de un párrafo vacío
+    for periodo in informes.PERIODOS:
+        add_table(doc, informes.tabla_bloque(resultados, bloque, periodo), 'Table Grid')
+        doc.add_paragraph()
+
+# Función para crear el documento Word de un tipo de informe a partir de su especificación
+def create_document(tipo, resultados, file_path, titulo, fecha, header_image_left, header_image_right, footer_image, year_cerrado, year_corrido):
+    """
+    Presenta las secciones, encabezados y tablas de la especificación del informe (ver informes.INFORMES).
 
-    # Agregar encabezado y pie de página
-    footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
+    Args:
+    tipo (str): Tipo de informe: 'continente', 'hub', 'pais', 'departamento' o 'colombia'.
+    resultados (dict): Por nombre de alcance ('total' y 'nme'), los resultados de datos_exportaciones (ver generar_resultados_informe).
+    file_path (str o flujo binario): Ruta o flujo escribible (e.g., io.BytesIO) donde se guardará el documento. Si es None, se devuelven sus bytes.
+    titulo (str): El título principal del informe (None para los informes sin entidad).
+    fecha (str): La fecha de actualización del informe.
+    header_image_left (str): Ruta de la imagen para el encabezado (izquierda).
+    header_image_right (str): Ruta de la imagen para el encabezado (derecha).
+    footer_image (str): Ruta de la imagen para el pie de página.
+    year_cerrado (str): Texto con el año cerrado del informe.
+    year_corrido (str): Texto con el año corrido del informe.
 
-    add_header_footer(doc, header_image_left, header_image_right, footer_image, footer_text)
-        
-    # Agregar el título principal del informe
-    title_paragraph = doc.add_paragraph(f'TRES EJES CONTINENTES: {str(titulo).upper()}', style='Title')
-    title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    Returns:
+    bytes: El documento en formato .docx si file_path es None; de lo contrario None.
+    """
+    especificacion = informes.especificacion(tipo)
+
+    # Partir del documento base (estilos, encabezado, pie de página y tabla de contenido) con el título y la fecha del informe
+    doc = crear_documento_base(especificacion['titulo'].format(entidad=str(titulo).upper()), fecha, header_image_left, header_image_right, footer_image)
+
+    # Secciones (nivel 1), subsecciones (nivel 2) y sus bloques de contenido
+    for titulo_seccion, alcance, subsecciones in especificacion['secciones']:
+        add_heading(doc, titulo_seccion, level=2, style='Heading 1')
+        for subseccion in subsecciones:
+            titulo_subseccion, bloques = informes.SUBSECCIONES[subseccion]
+            add_heading(doc, titulo_subseccion, level=3, style='Heading 2')
+            for bloque in bloques:
+                agregar_bloque(doc, bloque, resultados[alcance], year_cerrado, year_corrido)
+
+    # Guardar el documento en la ruta o el flujo indicado, o devolver sus bytes sin pasar por disco
+    if file_path is None:
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue()
+    doc.save(file_path)
 
-    # Agregar la fecha
-    date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
-    date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-    
-    
-    # Agregar la tabla de contenido
-    doc.add_page_break()
-    agregar_tabla_contenidos(doc)   
-    doc.add_page_break()
-        
+#############
+# CONTINENTES
+#############
+@trazas.medir
+def create_document_continentes(df_total, df_nme, file_path, titulo, fecha, header_image_left, header_image_right, footer_image, year_cerrado, year_corrido):
+    """
+    Crea un documento Word con la especificación del informe 'continente' (ver informes.INFORMES).
 
-    ###############
-    # Exportaciones
-    ###############
-    add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
-    
-    #####################
-    # Tipo de exportación
-    #####################
-    add_heading(doc, 'Tipo de exportación', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_total["Resumen USD Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_total["Resumen USD Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    #####################################
-    # Exportaciones no minero-energéticas
-    #####################################
-    add_heading(doc, 'Exportaciones no minero-energéticas', level=2, style='Heading 1')
-
-    ###########
-    #  Destinos
-    ###########
-    add_heading(doc, 'Destinos', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][2][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][2][1]), 'Table Grid')
-    doc.add_paragraph()
-    
-    ########################
-    # Departamento de origen
-    ########################
-    add_heading(doc, 'Departamento de origen', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][3][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][3][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    ########
-    # Sector
-    ########
-    add_heading(doc, 'Sector', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    #############
-    # SubSectores
-    #############
-    add_heading(doc, 'Subsector', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Tablas Subsectores Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Tablas Subsectores Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    ####################
-    # Conteo de Empresas
-    ####################
-    add_heading(doc, 'Empresas', level=3, style='Heading 2')
-    # Año cerrado
-    paragraph_cerrado = doc.add_paragraph(f'Número de empresas exportadoras en {str(year_cerrado)}: ', style='Normal')
-    run_cerrado = paragraph_cerrado.add_run(f'{str(df_nme["Numero de Empresas Cerrado"][0][1])} empresas')
-    run_cerrado.bold = True
-    # Año corrido
-    paragraph_corrdo = doc.add_paragraph(f'Número de empresas exportadoras a {str(year_corrido)}: ', style='Normal')
-    run_corrido = paragraph_corrdo.add_run(f'{str(df_nme["Numero de Empresas Corrido"][0][1])} empresas')
-    run_corrido.bold = True
-
-    ################
-    # Datos empresas
-    ################
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Tablas Empresas Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Tablas Empresas Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    # Guardar el documento
-    doc.save(file_path)
+    Args:
+    df_total (dict): Resultados de la base total (ver datos_exportaciones.generar_listas_tablas_definitivas_exportaciones).
+    df_nme (dict): Resultados de la base NME.
+    file_path (str o flujo binario): Ruta o flujo escribible (e.g., io.BytesIO) donde se guardará el documento. Si es None, se devuelven sus bytes.
+    titulo (str): El título principal del informe.
+    fecha (str): La fecha de actualización del informe.
+    header_image_left (str): Ruta de la imagen para el encabezado (izquierda).
+    header_image_right (str): Ruta de la imagen para el encabezado (derecha).
+    footer_image (str): Ruta de la imagen para el pie de página.
+    year_cerrado (str): Texto con el año cerrado del informe.
+    year_corrido (str): Texto con el año corrido del informe.
 
+    Returns:
+    bytes: El documento en formato .docx si file_path es None; de lo contrario None.
+    """
+    return create_document('continente', {'total': df_total, 'nme': df_nme}, file_path, titulo, fecha, header_image_left, header_image_right, footer_image,
+                           year_cerrado, year_corrido)
 
 ######
 # HUBS
 ######
+@trazas.medir
 def create_document_hub(df_total, df_nme, file_path, titulo, fecha, header_image_left, header_image_right, footer_image, year_cerrado, year_corrido):
     """
-    Crea un documento Word con los resultados proporcionados.
+    Crea un documento Word con la especificación del informe 'hub' (ver informes.INFORMES).
 
     Args:
-    resultados (dict): Diccionario con los resultados que se incluirán en el informe.
-    file_path (str): Ruta donde se guardará el documento de salida.
+    df_total (dict): Resultados de la base total (ver datos_exportaciones.generar_listas_tablas_definitivas_exportaciones).
+    df_nme (dict): Resultados de la base NME.
+    file_path (str o flujo binario): Ruta o flujo escribible (e.g., io.BytesIO) donde se guardará el documento. Si es None, se devuelven sus bytes.
     titulo (str): El título principal del informe.
     fecha (str): La fecha de actualización del informe.
     header_image_left (str): Ruta de la imagen para el encabezado (izquierda).
     header_image_right (str): Ruta de la imagen para el encabezado (derecha).
     footer_image (str): Ruta de la imagen para el pie de página.
-    footer_text (str): Texto para el pie de página.
     year_cerrado (str): Texto con el año cerrado del informe.
     year_corrido (str): Texto con el año corrido del informe.
-    """
-    doc = Document()
-    estilos(doc)
-
-    # Agregar encabezado y pie de página
-    footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
-
-    add_header_footer(doc, header_image_left, header_image_right, footer_image, footer_text)
-        
-    # Agregar el título principal del informe
-    title_paragraph = doc.add_paragraph(f'TRES EJES HUBs: {str(titulo).upper()}', style='Title')
-    title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-    # Agregar la fecha
-    date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
-    date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-    
-    # Agregar la tabla de contenido
-    doc.add_page_break()
-    agregar_tabla_contenidos(doc)   
-    doc.add_page_break()
-
-    ###############
-    # Exportaciones
-    ###############
-    add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
-    
-    #####################
-    # Tipo de exportación
-    #####################
-    add_heading(doc, 'Tipo de exportación', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_total["Resumen USD Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_total["Resumen USD Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    #####################################
-    # Exportaciones no minero-energéticas
-    #####################################
-    add_heading(doc, 'Exportaciones no minero-energéticas', level=2, style='Heading 1')
-
-    ###########
-    #  Destinos
-    ###########
-    add_heading(doc, 'Destinos', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][2][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][2][1]), 'Table Grid')
-    doc.add_paragraph()
-    
-    ########################
-    # Departamento de origen
-    ########################
-    add_heading(doc, 'Departamento de origen', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][3][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][3][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    ########
-    # Sector
-    ########
-    add_heading(doc, 'Sector', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    #############
-    # SubSectores
-    #############
-    add_heading(doc, 'Subsector', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Tablas Subsectores Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Tablas Subsectores Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    ####################
-    # Conteo de Empresas
-    ####################
-    add_heading(doc, 'Empresas', level=3, style='Heading 2')
-    # Año cerrado
-    paragraph_cerrado = doc.add_paragraph(f'Número de empresas exportadoras en {str(year_cerrado)}: ', style='Normal')
-    run_cerrado = paragraph_cerrado.add_run(f'{str(df_nme["Numero de Empresas Cerrado"][0][1])} empresas')
-    run_cerrado.bold = True
-    # Año corrido
-    paragraph_corrdo = doc.add_paragraph(f'Número de empresas exportadoras a {str(year_corrido)}: ', style='Normal')
-    run_corrido = paragraph_corrdo.add_run(f'{str(df_nme["Numero de Empresas Corrido"][0][1])} empresas')
-    run_corrido.bold = True
-
-    ################
-    # Datos empresas
-    ################
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Tablas Empresas Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Tablas Empresas Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    # Guardar el documento
-    doc.save(file_path)
 
+    Returns:
+    bytes: El documento en formato .docx si file_path es None; de lo contrario None.
+    """
+    return create_document('hub', {'total': df_total, 'nme': df_nme}, file_path, titulo, fecha, header_image_left, header_image_right, footer_image,
+                           year_cerrado, year_corrido)
 
 ########
 # PAÍSES
 ########
+@trazas.medir
 def create_document_pais(df_total, df_nme, file_path, titulo, fecha, header_image_left, header_image_right, footer_image, year_cerrado, year_corrido):
     """
-    Crea un documento Word con los resultados proporcionados.
+    Crea un documento Word con la especificación del informe 'pais' (ver informes.INFORMES).
 
     Args:
-    resultados (dict): Diccionario con los resultados que se incluirán en el informe.
-    file_path (str): Ruta donde se guardará el documento de salida.
+    df_total (dict): Resultados de la base total (ver datos_exportaciones.generar_listas_tablas_definitivas_exportaciones).
+    df_nme (dict): Resultados de la base NME.
+    file_path (str o flujo binario): Ruta o flujo escribible (e.g., io.BytesIO) donde se guardará el documento. Si es None, se devuelven sus bytes.
     titulo (str): El título principal del informe.
     fecha (str): La fecha de actualización del informe.
     header_image_left (str): Ruta de la imagen para el encabezado (izquierda).
     header_image_right (str): Ruta de la imagen para el encabezado (derecha).
     footer_image (str): Ruta de la imagen para el pie de página.
-    footer_text (str): Texto para el pie de página.
     year_cerrado (str): Texto con el año cerrado del informe.
     year_corrido (str): Texto con el año corrido del informe.
-    """
-    doc = Document()
-    estilos(doc)
-
-    # Agregar encabezado y pie de página
-    footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
-
-    add_header_footer(doc, header_image_left, header_image_right, footer_image, footer_text)
-        
-    # Agregar el título principal del informe
-    title_paragraph = doc.add_paragraph(f'TRES EJES PAÍSES: {str(titulo).upper()}', style='Title')
-    title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-    # Agregar la fecha
-    date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
-    date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        
-    # Agregar la tabla de contenido
-    doc.add_page_break()
-    agregar_tabla_contenidos(doc)   
-    doc.add_page_break()
-
-    ###############
-    # Exportaciones
-    ###############
-    add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
-    
-    #####################
-    # Tipo de exportación
-    #####################
-    add_heading(doc, 'Tipo de exportación', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_total["Resumen USD Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_total["Resumen USD Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    #####################################
-    # Exportaciones no minero-energéticas
-    #####################################
-    add_heading(doc, 'Exportaciones no minero-energéticas', level=2, style='Heading 1')
-  
-    ########################
-    # Departamento de origen
-    ########################
-    add_heading(doc, 'Departamento de origen', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][3][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][3][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    ########
-    # Sector
-    ########
-    add_heading(doc, 'Sector', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    #############
-    # SubSectores
-    #############
-    add_heading(doc, 'Subsector', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Tablas Subsectores Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Tablas Subsectores Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    ####################
-    # Conteo de Empresas
-    ####################
-    add_heading(doc, 'Empresas', level=3, style='Heading 2')
-    # Año cerrado
-    paragraph_cerrado = doc.add_paragraph(f'Número de empresas exportadoras en {str(year_cerrado)}: ', style='Normal')
-    run_cerrado = paragraph_cerrado.add_run(f'{str(df_nme["Numero de Empresas Cerrado"][0][1])} empresas')
-    run_cerrado.bold = True
-    # Año corrido
-    paragraph_corrdo = doc.add_paragraph(f'Número de empresas exportadoras a {str(year_corrido)}: ', style='Normal')
-    run_corrido = paragraph_corrdo.add_run(f'{str(df_nme["Numero de Empresas Corrido"][0][1])} empresas')
-    run_corrido.bold = True
-
-    ################
-    # Datos empresas
-    ################
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Tablas Empresas Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Tablas Empresas Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    # Guardar el documento
-    doc.save(file_path)
 
+    Returns:
+    bytes: El documento en formato .docx si file_path es None; de lo contrario None.
+    """
+    return create_document('pais', {'total': df_total, 'nme': df_nme}, file_path, titulo, fecha, header_image_left, header_image_right, footer_image,
+                           year_cerrado, year_corrido)
 
 ###############
 # DEPARTAMENTOS
 ###############
+@trazas.medir
 def create_document_departamento(df_total, df_nme, file_path, titulo, fecha, header_image_left, header_image_right, footer_image, year_cerrado, year_corrido):
     """
-    Crea un documento Word con los resultados proporcionados.
+    Crea un documento Word con la especificación del informe 'departamento' (ver informes.INFORMES).
 
     Args:
-    resultados (dict): Diccionario con los resultados que se incluirán en el informe.
-    file_path (str): Ruta donde se guardará el documento de salida.
+    df_total (dict): Resultados de la base total (ver datos_exportaciones.generar_listas_tablas_definitivas_exportaciones).
+    df_nme (dict): Resultados de la base NME.
+    file_path (str o flujo binario): Ruta o flujo escribible (e.g., io.BytesIO) donde se guardará el documento. Si es None, se devuelven sus bytes.
     titulo (str): El título principal del informe.
     fecha (str): La fecha de actualización del informe.
     header_image_left (str): Ruta de la imagen para el encabezado (izquierda).
     header_image_right (str): Ruta de la imagen para el encabezado (derecha).
     footer_image (str): Ruta de la imagen para el pie de página.
-    footer_text (str): Texto para el pie de página.
     year_cerrado (str): Texto con el año cerrado del informe.
     year_corrido (str): Texto con el año corrido del informe.
-    """
-    doc = Document()
-    estilos(doc)
-
-    # Agregar encabezado y pie de página
-    footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
 
-    add_header_footer(doc, header_image_left, header_image_right, footer_image, footer_text)
-        
-    # Agregar el título principal del informe
-    title_paragraph = doc.add_paragraph(f'TRES EJES DEPARTAMENTOS: {str(titulo).upper()}', style='Title')
-    title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-    # Agregar la fecha
-    date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
-    date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        
-    # Agregar la tabla de contenido
-    doc.add_page_break()
-    agregar_tabla_contenidos(doc)   
-    doc.add_page_break()
-
-    ###############
-    # Exportaciones
-    ###############
-    add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
-    
-    #####################
-    # Tipo de exportación
-    #####################
-    add_heading(doc, 'Tipo de exportación', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_total["Resumen USD Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_total["Resumen USD Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    #####################################
-    # Exportaciones no minero-energéticas
-    #####################################
-    add_heading(doc, 'Exportaciones no minero-energéticas', level=2, style='Heading 1')
-
-    ###########
-    #  Destinos
-    ###########
-    add_heading(doc, 'Destinos', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][2][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][2][1]), 'Table Grid')
-    doc.add_paragraph()
-    
-    ########
-    # Sector
-    ########
-    add_heading(doc, 'Sector', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    #############
-    # SubSectores
-    #############
-    add_heading(doc, 'Subsector', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Tablas Subsectores Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Tablas Subsectores Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    ######
-    # TLCS
-    ######
-    add_heading(doc, 'Tratados de libre comercio', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][6][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][6][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    ####################
-    # Conteo de Empresas
-    ####################
-    add_heading(doc, 'Empresas', level=3, style='Heading 2')
-    # Año cerrado
-    paragraph_cerrado = doc.add_paragraph(f'Número de empresas exportadoras en {str(year_cerrado)}: ', style='Normal')
-    run_cerrado = paragraph_cerrado.add_run(f'{str(df_nme["Numero de Empresas Cerrado"][0][1])} empresas')
-    run_cerrado.bold = True
-    # Año corrido
-    paragraph_corrdo = doc.add_paragraph(f'Número de empresas exportadoras a {str(year_corrido)}: ', style='Normal')
-    run_corrido = paragraph_corrdo.add_run(f'{str(df_nme["Numero de Empresas Corrido"][0][1])} empresas')
-    run_corrido.bold = True
-
-    ################
-    # Datos empresas
-    ################
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Tablas Empresas Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Tablas Empresas Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    # Guardar el documento
-    doc.save(file_path)
+    Returns:
+    bytes: El documento en formato .docx si file_path es None; de lo contrario None.
+    """
+    return create_document('departamento', {'total': df_total, 'nme': df_nme}, file_path, titulo, fecha, header_image_left, header_image_right, footer_image,
+                           year_cerrado, year_corrido)
 
 ##########
 # COLOMBIA
 ##########
+@trazas.medir
 def create_document_colombia(df_total, df_nme, file_path, fecha, header_image_left, header_image_right, footer_image, year_cerrado, year_corrido):
     """
-    Crea un documento Word con los resultados proporcionados.
+    Crea un documento Word con la especificación del informe 'colombia' (ver informes.INFORMES).
 
     Args:
-    resultados (dict): Diccionario con los resultados que se incluirán en el informe.
-    file_path (str): Ruta donde se guardará el documento de salida.
+    df_total (dict): Resultados de la base total (ver datos_exportaciones.generar_listas_tablas_definitivas_exportaciones).
+    df_nme (dict): Resultados de la base NME.
+    file_path (str o flujo binario): Ruta o flujo escribible (e.g., io.BytesIO) donde se guardará el documento. Si es None, se devuelven sus bytes.
     fecha (str): La fecha de actualización del informe.
     header_image_left (str): Ruta de la imagen para el encabezado (izquierda).
     header_image_right (str): Ruta de la imagen para el encabezado (derecha).
     footer_image (str): Ruta de la imagen para el pie de página.
-    footer_text (str): Texto para el pie de página.
     year_cerrado (str): Texto con el año cerrado del informe.
     year_corrido (str): Texto con el año corrido del informe.
-    """
-    doc = Document()
-    estilos(doc)
 
-    # Agregar encabezado y pie de página
-    footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
-
-    add_header_footer(doc, header_image_left, header_image_right, footer_image, footer_text)
-        
-    # Agregar el título principal del informe
-    title_paragraph = doc.add_paragraph(f'TRES EJES COLOMBIA', style='Title')
-    title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-
-    # Agregar la fecha
-    date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
-    date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-    
-    # Agregar la tabla de contenido
-    doc.add_page_break()
-    agregar_tabla_contenidos(doc)   
-    doc.add_page_break()
-
-    ###############
-    # Exportaciones
-    ###############
-    add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
-    
-    #####################
-    # Tipo de exportación
-    #####################
-    add_heading(doc, 'Tipo de exportación', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_total["Resumen USD Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_total["Resumen USD Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    #####################################
-    # Exportaciones no minero-energéticas
-    #####################################
-    add_heading(doc, 'Exportaciones no minero-energéticas', level=2, style='Heading 1')
-
-    ###########
-    #  Destinos
-    ###########
-    add_heading(doc, 'Destinos', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][2][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][2][1]), 'Table Grid')
-    doc.add_paragraph()
-    
-    ########################
-    # Departamento de origen
-    ########################
-    add_heading(doc, 'Departamento de origen', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][3][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][3][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    ########
-    # Sector
-    ########
-    add_heading(doc, 'Sector', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Resumen USD Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    #############
-    # SubSectores
-    #############
-    add_heading(doc, 'Subsector', level=3, style='Heading 2')
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Tablas Subsectores Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Tablas Subsectores Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    ####################
-    # Conteo de Empresas
-    ####################
-    add_heading(doc, 'Empresas', level=3, style='Heading 2')
-    # Año cerrado
-    paragraph_cerrado = doc.add_paragraph(f'Número de empresas exportadoras en {str(year_cerrado)}: ', style='Normal')
-    run_cerrado = paragraph_cerrado.add_run(f'{str(df_nme["Numero de Empresas Cerrado"][0][1])} empresas')
-    run_cerrado.bold = True
-    # Año corrido
-    paragraph_corrdo = doc.add_paragraph(f'Número de empresas exportadoras a {str(year_corrido)}: ', style='Normal')
-    run_corrido = paragraph_corrdo.add_run(f'{str(df_nme["Numero de Empresas Corrido"][0][1])} empresas')
-    run_corrido.bold = True
-
-    ################
-    # Datos empresas
-    ################
-    # Año cerrado
-    add_table(doc, pd.DataFrame(df_nme["Tablas Empresas Cerrado"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-    # Año corrido
-    add_table(doc, pd.DataFrame(df_nme["Tablas Empresas Corrido"][0][1]), 'Table Grid')
-    doc.add_paragraph()
-
-    # Guardar el documento
-    doc.save(file_path)
\ No newline at end of file
+    Returns:
+    bytes: El documento en formato .docx si file_path es None; de lo contrario None.
+    """
+    return create_document('colombia', {'total': df_total, 'nme': df_nme}, file_path, None, fecha, header_image_left, header_image_right, footer_image,
+                           year_cerrado, year_corrido)
\ No newline at end of file
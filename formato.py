@@ -0,0 +1,266 @@
+# Librerias
+import numpy as np
+import pandas as pd
+
+###################################################################
+# FUNCIONES PARA FORMATEAR NÚMEROS EN ESPAÑOL (es-CO) DE FORMA VECTORIAL
+###################################################################
+
+# Separadores de los informes: miles con punto y decimales con coma (e.g., 1.234.567,8)
+SEPARADOR_MILES = '.'
+SEPARADOR_DECIMAL = ','
+
+# Por encima de este valor absoluto los números se formatean con format() (la aritmética de enteros en float deja de ser exacta)
+LIMITE_EXACTO = 2.0 ** 52
+# Potencias de 10 para contar los dígitos de enteros int64
+POTENCIAS_10 = 10 ** np.arange(19, dtype=np.int64)
+
+# Función para dividir un float en dos partes de 26 bits (producto exacto de Dekker)
+def _dividir(valores):
+    """
+    Parámetros:
+    valores (ndarray): Valores float64.
+
+    Retorna:
+    tuple: Parte alta y parte baja, cuya suma es exactamente el valor original.
+    """
+    c = 134217729.0 * valores
+    alto = c - (c - valores)
+    return alto, valores - alto
+
+# Función para redondear valores * 10**decimales al entero más cercano igual que format()
+def _redondear_escalado(valores, decimales):
+    """
+    Redondea valores * 10**decimales al entero más cercano (empates al par) sobre el valor binario exacto, como lo hace
+    format(x, '.Nf'). El producto por 10**decimales no es exacto en float, por lo que en los empates aparentes (.5)
+    se calcula el error exacto del producto para decidir hacia dónde redondear.
+
+    Parámetros:
+    valores (ndarray): Valores float64 finitos.
+    decimales (int): Número de decimales.
+
+    Retorna:
+    ndarray: Enteros (en float64) del valor escalado.
+    """
+    if decimales == 0:
+        return np.rint(valores)
+
+    # 1. Producto y su error exacto (valores * escala = producto + error)
+    escala = 10.0 ** decimales
+    producto = valores * escala
+    a_alto, a_bajo = _dividir(valores)
+    b_alto, b_bajo = _dividir(np.float64(escala))
+    error = ((a_alto * b_alto - producto) + a_alto * b_bajo + a_bajo * b_alto) + a_bajo * b_bajo
+
+    # 2. Redondear y corregir los empates aparentes según el signo del error
+    redondeado = np.rint(producto)
+    ajuste = (np.abs(producto - redondeado) == 0.5) & (error != 0)
+    redondeado[ajuste] = np.floor(producto[ajuste]) + (error[ajuste] > 0)
+    return redondeado
+
+# Función para escribir los dígitos de enteros no negativos en una matriz de caracteres
+def _escribir_digitos(caracteres, enteros, ultimas, miles):
+    """
+    Escribe de derecha a izquierda los dígitos de cada entero en su fila de la matriz, terminando en la columna
+    indicada y con un separador cada tres dígitos. Las posiciones que no existen en un número (e.g., el dígito de
+    las centenas de 25) se escriben en la última columna de la matriz, que se descarta al final.
+
+    Parámetros:
+    caracteres (ndarray): Matriz uint32 de códigos de caracteres (filas x ancho), modificada en el lugar.
+    enteros (ndarray): Enteros int64 no negativos, uno por fila.
+    ultimas (ndarray): Columna del último dígito (unidades) de cada fila.
+    miles (bool): Si es True, agrega SEPARADOR_MILES cada tres dígitos.
+    """
+    # Índices sobre la matriz aplanada (más rápidos que la indexación por fila y columna)
+    planos = caracteres.reshape(-1)
+    inicio_filas = np.arange(len(enteros)) * caracteres.shape[1]
+    ultimas = inicio_filas + ultimas
+    descartes = inicio_filas + caracteres.shape[1] - 1
+    numero_digitos = np.maximum(np.searchsorted(POTENCIAS_10, enteros, side='right'), 1)
+    restante = enteros
+    for posicion in range(int(numero_digitos.max())):
+        presentes = posicion < numero_digitos
+        indices = ultimas - (posicion + (posicion // 3 if miles else 0))
+        if miles and posicion and posicion % 3 == 0:
+            planos[np.where(presentes, indices + 1, descartes)] = ord(SEPARADOR_MILES)
+        restante, digito = np.divmod(restante, 10)
+        planos[np.where(presentes, indices, descartes)] = digito + ord('0')
+
+# Función para contar los caracteres de la parte entera (dígitos y separadores)
+def _longitudes(enteros, miles):
+    """
+    Parámetros:
+    enteros (ndarray): Enteros int64 no negativos.
+    miles (bool): Si es True, cuenta un SEPARADOR_MILES cada tres dígitos.
+
+    Retorna:
+    ndarray: Número de caracteres de cada entero.
+    """
+    numero_digitos = np.maximum(np.searchsorted(POTENCIAS_10, enteros, side='right'), 1)
+    return numero_digitos + ((numero_digitos - 1) // 3 if miles else 0)
+
+# Función para formatear un arreglo de números en español
+def formatear_numeros(valores, decimales=0, miles=True, sufijo=''):
+    """
+    Formatea números como texto en español en un solo paso vectorial. El resultado es idéntico a aplicar
+    '{:,.Nf}'.format (o '{:.Nf}' sin miles) a cada valor y luego intercambiar los separadores de miles y decimales.
+
+    Parámetros:
+    valores (array-like): Números a formatear (enteros o float, con o sin nulos).
+    decimales (int): Número de decimales.
+    miles (bool): Si es True, agrupa los miles con SEPARADOR_MILES.
+    sufijo (str): Texto agregado al final de cada valor (e.g., '%').
+
+    Pasos del proceso:
+    1. Escribir los valores no finitos ('nan', 'inf', '-inf') y formatear con format() los que superan LIMITE_EXACTO.
+    2. Redondear los demás al entero escalado más cercano y separar parte entera y decimal.
+    3. Escribir en una matriz de caracteres el signo, los dígitos, los separadores, los decimales y el sufijo de todos los valores.
+
+    Retorna:
+    ndarray: Arreglo de objetos str.
+    """
+    serie = pd.Series(valores)
+    enteros_exactos = pd.api.types.is_integer_dtype(serie.dtype) and not serie.isna().any()
+    if enteros_exactos:
+        numeros = serie.to_numpy(dtype=np.int64)
+    else:
+        numeros = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+    resultado = np.empty(len(numeros), dtype=object)
+    patron = f"{{:{',' if miles else ''}.{decimales}f}}"
+
+    # 1. Valores no finitos y valores que se formatean uno a uno
+    if enteros_exactos:
+        no_finitos = np.zeros(len(numeros), dtype=bool)
+        especiales = np.abs(numeros) >= LIMITE_EXACTO
+        negativos = numeros < 0
+    else:
+        no_finitos = ~np.isfinite(numeros)
+        especiales = ~no_finitos & (np.abs(numeros) >= LIMITE_EXACTO / 10 ** decimales)
+        negativos = np.signbit(numeros)
+        resultado[np.isnan(numeros)] = 'nan' + sufijo
+        resultado[numeros == np.inf] = 'inf' + sufijo
+        resultado[numeros == -np.inf] = '-inf' + sufijo
+    for posicion in np.flatnonzero(especiales):
+        texto = patron.format(serie.iloc[posicion] if enteros_exactos else numeros[posicion])
+        resultado[posicion] = texto.replace(',', 'X').replace('.', SEPARADOR_DECIMAL).replace('X', SEPARADOR_MILES) + sufijo
+    normales = ~(especiales | no_finitos)
+    if not normales.any():
+        return resultado
+
+    # 2. Parte entera y parte decimal
+    if enteros_exactos:
+        escalados = np.abs(numeros[normales]) * 10 ** decimales
+    else:
+        escalados = np.abs(_redondear_escalado(numeros[normales], decimales)).astype(np.int64)
+    parte_entera, parte_decimal = np.divmod(escalados, 10 ** decimales)
+
+    # 3. Matriz de caracteres alineada a la izquierda: [signo][dígitos con miles][separador decimal y decimales][sufijo]
+    signo = negativos[normales].astype(np.int64)
+    longitudes = _longitudes(parte_entera, miles)
+    cola = ([ord(SEPARADOR_DECIMAL)] if decimales else []) + [0] * decimales + [ord(caracter) for caracter in sufijo]
+    ancho = int((signo + longitudes).max()) + len(cola)
+    # Una columna extra al final recibe las escrituras descartadas
+    caracteres = np.zeros((len(escalados), ancho + 1), dtype=np.uint32)
+    filas = np.arange(len(escalados))
+    caracteres[filas[signo == 1], 0] = ord('-')
+    _escribir_digitos(caracteres, parte_entera, signo + longitudes - 1, miles)
+    inicio_cola = signo + longitudes
+    for posicion, codigo in enumerate(cola):
+        if codigo:
+            caracteres[filas, inicio_cola + posicion] = codigo
+    restante = parte_decimal
+    for posicion in range(decimales):
+        restante, digito = np.divmod(restante, 10)
+        caracteres[filas, inicio_cola + decimales - posicion] = ord('0') + digito
+    textos = np.ascontiguousarray(caracteres[:, :ancho]).view(f'<U{ancho}').ravel().astype(object)
+    if normales.all():
+        return textos
+    resultado[normales] = textos
+    return resultado
+
+# Función para formatear columnas de un DataFrame en español
+def formatear_columnas(df, columnas, decimales=0, miles=True, sufijo=''):
+    """
+    Reemplaza columnas numéricas de un DataFrame por su texto en español (ver formatear_numeros).
+
+    Parámetros:
+    df (DataFrame): DataFrame a modificar.
+    columnas (list): Columnas a formatear.
+    decimales (int): Número de decimales.
+    miles (bool): Si es True, agrupa los miles.
+    sufijo (str): Texto agregado al final de cada valor (e.g., '%').
+
+    Retorna:
+    DataFrame: El mismo DataFrame con las columnas formateadas.
+    """
+    for columna in columnas:
+        df[columna] = formatear_numeros(df[columna], decimales, miles, sufijo)
+    return df
+
+###################################################################
+# RESULTADOS NUMÉRICOS DE LAS TABLAS Y SU FORMATO AL PRESENTARLAS
+###################################################################
+
+# Roles de las filas de una tabla
+ROL_REGULAR = 'regular'
+ROL_OTROS = 'otros'
+ROL_TOTAL = 'total'
+
+# Formatos de las columnas numéricas de los informes (argumentos de formatear_numeros)
+FORMATO_VALOR = {}
+FORMATO_PORCENTAJE = {'decimales': 1, 'miles': False, 'sufijo': '%'}
+
+# Función para asignar el rol de cada fila según su etiqueta
+def roles_por_etiqueta(etiquetas):
+    """
+    Parámetros:
+    etiquetas (array-like): Etiquetas de las filas de una tabla.
+
+    Retorna:
+    ndarray: ROL_OTROS para las filas 'Otros', ROL_TOTAL para las filas 'Total' y ROL_REGULAR para las demás.
+    """
+    etiquetas = np.asarray(etiquetas, dtype=object)
+    return np.select([etiquetas == 'Otros', etiquetas == 'Total'], [ROL_OTROS, ROL_TOTAL], ROL_REGULAR).astype(object)
+
+# Resultado numérico de una tabla de los informes
+class TablaResultado:
+    """
+    Tabla de un informe con sus valores numéricos, el rol de cada fila (regular, 'Otros' o 'Total') y el formato de cada
+    columna numérica. Los números se conservan para reutilizarlos (otras salidas, comparaciones) y el texto en español
+    solo se genera al presentar la tabla con formatear().
+
+    Parámetros:
+    datos (DataFrame): Columnas de etiquetas y columnas numéricas, con los nombres finales de la tabla.
+    roles (array-like): Rol de cada fila (ROL_REGULAR, ROL_OTROS o ROL_TOTAL).
+    formatos (dict): Por columna numérica, los argumentos de formatear_numeros. Las demás columnas son etiquetas.
+    """
+
+    def __init__(self, datos, roles, formatos):
+        self.datos = datos
+        self.roles = np.asarray(roles, dtype=object)
+        self.formatos = formatos
+
+    def __len__(self):
+        return len(self.datos)
+
+    def __repr__(self):
+        return f"TablaResultado(columnas={list(self.datos.columns)}, roles={list(self.roles)})"
+
+    def posiciones(self, rol):
+        """
+        Parámetros:
+        rol (str): Rol de fila (ROL_REGULAR, ROL_OTROS o ROL_TOTAL).
+
+        Retorna:
+        list: Posiciones de las filas con ese rol.
+        """
+        return np.flatnonzero(self.roles == rol).tolist()
+
+    def formatear(self):
+        """
+        Retorna:
+        DataFrame: Tabla de texto lista para el documento: columnas numéricas con formatear_numeros y etiquetas como texto.
+        """
+        return pd.DataFrame({columna: formatear_numeros(self.datos[columna], **self.formatos[columna]) if columna in self.formatos
+                             else self.datos[columna].astype(str).to_numpy(dtype=object)
+                             for columna in self.datos.columns})
\ No newline at end of file
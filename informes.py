@@ -0,0 +1,164 @@
+#####################################################################
+# ESPECIFICACIÓN DE LOS INFORMES: SECCIONES, ENCABEZADOS Y TABLAS
+#
+# Cada tipo de informe se describe una sola vez. documentos.create_document
+# presenta la especificación y datos_exportaciones.generar_resultados_informe
+# consulta y calcula solo las tablas que la especificación menciona.
+#####################################################################
+
+# Alcances de tipo de las tablas: tipos de posición arancelaria y número de categorías top de las tablas resumen
+ALCANCES = {
+    'total': {'tipos': ['No Mineras', 'Mineras'], 'top_n': None},
+    'nme': {'tipos': ['No Mineras'], 'top_n': 5},
+}
+
+# Bloques de contenido de las subsecciones; cada bloque se presenta para el año cerrado y luego para el año corrido
+#   ('resumen', categoria, valor): tabla resumen de la categoría (e.g., RESUMEN_SECTOR_VALOR_USD)
+#   ('subsectores',): tabla de subsectores con mayor crecimiento
+#   ('numero_empresas',): párrafo con el número de empresas exportadoras
+#   ('empresas',): tabla de empresas
+BLOQUES = ['resumen', 'subsectores', 'numero_empresas', 'empresas']
+
+# Subsecciones (encabezado de nivel 2): título y bloques de contenido
+SUBSECCIONES = {
+    'tipo': ('Tipo de exportación', [('resumen', 'TIPO', 'VALOR_USD')]),
+    'destinos': ('Destinos', [('resumen', 'PAIS_DESTINO', 'VALOR_USD')]),
+    'departamentos': ('Departamento de origen', [('resumen', 'DEPARTAMENTO_ORIGEN', 'VALOR_USD')]),
+    'sectores': ('Sector', [('resumen', 'SECTOR', 'VALOR_USD')]),
+    'subsectores': ('Subsector', [('subsectores',)]),
+    'tlcs': ('Tratados de libre comercio', [('resumen', 'TLCS', 'VALOR_USD')]),
+    'empresas': ('Empresas', [('numero_empresas',), ('empresas',)]),
+}
+
+# Secciones (encabezado de nivel 1): título, alcance de sus tablas y subsecciones
+SECCION_EXPORTACIONES = ('Exportaciones', 'total', ['tipo'])
+SECCION_NME = 'Exportaciones no minero-energéticas'
+
+# Tipos de informe (los mismos de las trazas): título, prefijo del archivo, filtro de la entidad y secciones
+INFORMES = {
+    'continente': {
+        'titulo': 'TRES EJES CONTINENTES: {entidad}',
+        'archivo': 'Tres Ejes Continentes',
+        'dimension': 'continentes',
+        'secciones': [SECCION_EXPORTACIONES, (SECCION_NME, 'nme', ['destinos', 'departamentos', 'sectores', 'subsectores', 'empresas'])],
+    },
+    'hub': {
+        'titulo': 'TRES EJES HUBs: {entidad}',
+        'archivo': 'Tres Ejes HUBs',
+        'dimension': 'hubs',
+        'secciones': [SECCION_EXPORTACIONES, (SECCION_NME, 'nme', ['destinos', 'departamentos', 'sectores', 'subsectores', 'empresas'])],
+    },
+    'pais': {
+        'titulo': 'TRES EJES PAÍSES: {entidad}',
+        'archivo': 'Tres Ejes Países',
+        'dimension': 'paises',
+        'secciones': [SECCION_EXPORTACIONES, (SECCION_NME, 'nme', ['departamentos', 'sectores', 'subsectores', 'empresas'])],
+    },
+    'departamento': {
+        'titulo': 'TRES EJES DEPARTAMENTOS: {entidad}',
+        'archivo': 'Tres Ejes Departamentos',
+        'dimension': 'departamentos',
+        'secciones': [SECCION_EXPORTACIONES, (SECCION_NME, 'nme', ['destinos', 'sectores', 'subsectores', 'tlcs', 'empresas'])],
+    },
+    'colombia': {
+        'titulo': 'TRES EJES COLOMBIA',
+        'archivo': 'Tres Ejes Colombia',
+        'dimension': None,
+        'secciones': [SECCION_EXPORTACIONES, (SECCION_NME, 'nme', ['destinos', 'departamentos', 'sectores', 'subsectores', 'empresas'])],
+    },
+}
+
+# Unidad de cada variable de valor en las llaves de los resultados (e.g., "Resumen USD Cerrado")
+UNIDADES_RESULTADOS = {'VALOR_USD': 'USD', 'PESO_KG_NETO': 'KG'}
+
+# Periodos de los resultados, en el orden en que se presentan
+PERIODOS = ['Cerrado', 'Corrido']
+
+# Función para obtener la especificación de un tipo de informe
+def especificacion(tipo):
+    """
+    Parámetros:
+    tipo (str): Tipo de informe: 'continente', 'hub', 'pais', 'departamento' o 'colombia'.
+
+    Retorna:
+    dict: Especificación del informe (ver INFORMES).
+    """
+    if tipo not in INFORMES:
+        raise ValueError(f"El tipo de informe {tipo} no es uno de {list(INFORMES)}")
+    return INFORMES[tipo]
+
+# Función para obtener el tipo de informe de una dimensión de la generación masiva
+def tipo_dimension(dimension):
+    """
+    Parámetros:
+    dimension (str): 'continentes', 'hubs', 'paises' o 'departamentos'.
+
+    Retorna:
+    str: Tipo de informe cuya entidad se filtra por la dimensión.
+    """
+    for tipo, informe in INFORMES.items():
+        if informe['dimension'] == dimension:
+            return tipo
+    raise ValueError(f"La dimensión {dimension} no corresponde a ningún tipo de informe")
+
+# Función para recorrer los bloques de un informe con el alcance de sus tablas
+def bloques_informe(tipo):
+    """
+    Parámetros:
+    tipo (str): Tipo de informe.
+
+    Retorna:
+    list: Tuplas (alcance, bloque) en el orden en que se presentan.
+    """
+    return [(alcance, bloque)
+            for _, alcance, subsecciones in especificacion(tipo)['secciones']
+            for subseccion in subsecciones
+            for bloque in SUBSECCIONES[subseccion][1]]
+
+# Función para planear las consultas y tablas de un informe a partir de su especificación
+def planear_informe(tipo):
+    """
+    Lee la especificación del informe y deriva los alcances, las categorías y los valores que necesitan sus tablas, de modo que
+    no se consulten ni se calculen categorías o valores que el documento no presenta.
+
+    Parámetros:
+    tipo (str): Tipo de informe.
+
+    Retorna:
+    dict: Con las llaves 'alcances' (lista de diccionarios 'nombre', 'tipos', 'categorias' y 'top_n', en el formato de
+    datos_exportaciones.generar_listas_tablas_definitivas_exportaciones_consolidado) y 'valores'.
+    """
+    categorias = {}
+    valores = []
+    for alcance, bloque in bloques_informe(tipo):
+        if bloque[0] not in BLOQUES:
+            raise ValueError(f"El bloque {bloque[0]} no es uno de {BLOQUES}")
+        categorias.setdefault(alcance, [])
+        if bloque[0] == 'resumen':
+            _, categoria, valor = bloque
+            if categoria not in categorias[alcance]:
+                categorias[alcance].append(categoria)
+            if valor not in valores:
+                valores.append(valor)
+    alcances = [{'nombre': nombre, 'tipos': ALCANCES[nombre]['tipos'], 'categorias': categorias_alcance, 'top_n': ALCANCES[nombre]['top_n']}
+                for nombre, categorias_alcance in categorias.items()]
+    return {'alcances': alcances, 'valores': valores}
+
+# Función para obtener la tabla (o el número de empresas) de un bloque y un periodo
+def tabla_bloque(resultados, bloque, periodo):
+    """
+    Parámetros:
+    resultados (dict): Resultados de un alcance (ver datos_exportaciones.generar_listas_tablas_definitivas_exportaciones).
+    bloque (tuple): Bloque de contenido (ver SUBSECCIONES).
+    periodo (str): 'Cerrado' o 'Corrido'.
+
+    Retorna:
+    La tabla del bloque, o el número de empresas para el bloque 'numero_empresas'.
+    """
+    if bloque[0] == 'resumen':
+        _, categoria, valor = bloque
+        lista = resultados[f"Resumen {UNIDADES_RESULTADOS[valor]} {periodo}"]
+        # Las tablas resumen se buscan por nombre: su posición depende de las categorías planeadas para el informe
+        return lista[lista.nombres.index(f"RESUMEN_{categoria}_{valor}")][1]
+    llaves = {'subsectores': "Tablas Subsectores", 'numero_empresas': "Numero de Empresas", 'empresas': "Tablas Empresas"}
+    return resultados[f"{llaves[bloque[0]]} {periodo}"][0][1]
\ No newline at end of file
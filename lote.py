@@ -0,0 +1,281 @@
+######################################################################
+# GENERACIÓN DE INFORMES POR LOTES (SIN STREAMLIT)
+#
+# Uso (desde cualquier carpeta):
+#   python lote.py --dimensiones paises departamentos colombia --directorio salida_informes --trabajadores 4 \
+#       --fecha "ABRIL 2024" --year-cerrado 2023 --year-corrido "enero - abril 2024" \
+#       --years-cerrado 2022 2023 --years-corrido "2023(Ene-Abr)" "2024(Ene-Abr)"
+#
+# Si la ejecución se interrumpe, volver a lanzar el mismo comando continúa desde el manifiesto
+# del directorio sin repetir los documentos terminados.
+######################################################################
+
+# Librerias
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import conexion
+import datos_exportaciones as exportaciones
+import documentos
+import informes
+import trazas
+
+# Carpeta del repositorio (las imágenes de los documentos se buscan aquí)
+DIRECTORIO_BASE = os.path.dirname(os.path.abspath(__file__))
+# Imágenes de encabezado y pie de página de los documentos (las mismas de main.py)
+IMAGENES = {
+    'header_image_left': os.path.join(DIRECTORIO_BASE, 'PRO_PRINCIPAL_HORZ_PNG.png'),
+    'header_image_right': os.path.join(DIRECTORIO_BASE, 'Logo MinCit_Mesa de trabajo 1.png'),
+    'footer_image': os.path.join(DIRECTORIO_BASE, 'Logo_MP_EPDLB2.png'),
+}
+# Dimensiones que se pueden generar: las de la generación masiva más el informe de Colombia
+DIMENSIONES_LOTE = list(exportaciones.DIMENSIONES_INFORME) + ['colombia']
+# Archivo del manifiesto de avance dentro del directorio de salida
+ARCHIVO_MANIFIESTO = 'manifiesto.json'
+# Caracteres que no pueden ir en un nombre de archivo (separadores de ruta, reservados en Windows y de control)
+CARACTERES_RESERVADOS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+# Función para obtener el tipo de informe de una dimensión del lote
+def tipo_lote(dimension):
+    """
+    Parámetros:
+    dimension (str): Dimensión del lote (ver DIMENSIONES_LOTE).
+
+    Retorna:
+    str: Tipo de informe (ver informes.INFORMES).
+    """
+    return 'colombia' if dimension == 'colombia' else informes.tipo_dimension(dimension)
+
+# Función para obtener el nombre del archivo de un documento (el mismo que descarga main.py)
+def nombre_archivo(tipo, miembro):
+    """
+    Los caracteres reservados del nombre del miembro se reemplazan por '_' y se quitan los puntos y espacios finales, que
+    Windows no admite, de modo que el documento siempre queda dentro del directorio de salida. El manifiesto guarda este
+    nombre, así que una ejecución retomada encuentra el mismo archivo.
+
+    Parámetros:
+    tipo (str): Tipo de informe.
+    miembro (str): Miembro de la dimensión del informe.
+
+    Retorna:
+    str: Nombre del archivo .docx.
+    """
+    especificacion = informes.especificacion(tipo)
+    if not especificacion['dimension']:
+        return f"{especificacion['archivo']}.docx"
+    miembro = CARACTERES_RESERVADOS.sub('_', str(miembro)).rstrip('. ') or '_'
+    return f"{especificacion['archivo']} - {miembro}.docx"
+
+# Función para leer el manifiesto de una ejecución anterior con los mismos parámetros
+def cargar_manifiesto(ruta, parametros):
+    """
+    Parámetros:
+    ruta (str): Ruta del manifiesto.
+    parametros (dict): Parámetros de los documentos de esta ejecución.
+
+    Retorna:
+    dict: Manifiesto con las llaves 'parametros', 'miembros' (por dimensión) y 'documentos' (por 'dimension|miembro').
+    Si no existe o se generó con otros parámetros, se empieza uno nuevo.
+    """
+    if os.path.exists(ruta):
+        with open(ruta, 'r', encoding='utf-8') as file:
+            manifiesto = json.load(file)
+        if manifiesto.get('parametros') == parametros:
+            return manifiesto
+        print(f"El manifiesto {ruta} corresponde a otros parámetros; se generan todos los documentos de nuevo.", flush=True)
+    return {'parametros': parametros, 'miembros': {}, 'documentos': {}}
+
+# Función para guardar el manifiesto sin dejarlo incompleto si la ejecución se interrumpe
+def guardar_manifiesto(ruta, manifiesto):
+    """
+    Parámetros:
+    ruta (str): Ruta del manifiesto.
+    manifiesto (dict): Manifiesto (ver cargar_manifiesto).
+    """
+    ruta_temporal = f'{ruta}.tmp'
+    with open(ruta_temporal, 'w', encoding='utf-8') as file:
+        json.dump(manifiesto, file, ensure_ascii=False, indent=2)
+    os.replace(ruta_temporal, ruta)
+
+# Función para saber si el documento de un miembro ya se generó
+def terminado(manifiesto, directorio, dimension, miembro):
+    """
+    Parámetros:
+    manifiesto (dict): Manifiesto (ver cargar_manifiesto).
+    directorio (str): Carpeta de los documentos.
+    dimension (str): Dimensión del lote.
+    miembro (str): Miembro de la dimensión.
+
+    Retorna:
+    bool: True si el manifiesto registra el documento y el archivo existe.
+    """
+    documento = manifiesto['documentos'].get(f'{dimension}|{miembro}')
+    return documento is not None and os.path.exists(os.path.join(directorio, documento['archivo']))
+
+# Función que ejecuta cada proceso: presentar un documento y escribirlo en disco
+def renderizar_informe(tipo, miembro, resultados, ruta, parametros_documento):
+    """
+    Parámetros:
+    tipo (str): Tipo de informe.
+    miembro (str): Miembro de la dimensión del informe.
+    resultados (dict): Resultados por nombre de alcance (ver datos_exportaciones.generar_resultados_informe). Sus tablas
+        se calculan en este proceso la primera vez que el documento las usa.
+    ruta (str): Ruta del documento.
+    parametros_documento (dict): fecha, year_cerrado, year_corrido e imágenes de documentos.create_document.
+
+    Retorna:
+    float: Segundos que tomó el documento.
+    """
+    inicio = time.perf_counter()
+    entidad = miembro if informes.especificacion(tipo)['dimension'] else None
+    with trazas.traza(tipo, entidad):
+        contenido = documentos.create_document(tipo, resultados, None, entidad, **parametros_documento)
+        # Escribir primero en un archivo temporal: un documento a medio escribir nunca queda con su nombre final
+        ruta_temporal = f'{ruta}.tmp'
+        with open(ruta_temporal, 'wb') as file:
+            file.write(contenido)
+        os.replace(ruta_temporal, ruta)
+    return time.perf_counter() - inicio
+
+# Función para generar los documentos de una o varias dimensiones en paralelo, retomando una ejecución anterior
+def generar_lote(session, dimensiones, directorio, fecha, year_cerrado, year_corrido, years_cerrado, years_corrido, umbral=10000,
+                 trabajadores=None, max_concurrencia=1, agregado=True, imagenes=None):
+    """
+    Genera los documentos de todos los miembros de las dimensiones indicadas. Los datos de cada dimensión se consultan en el
+    proceso principal con las mismas tres consultas que un solo informe (ver datos_exportaciones.generar_resultados_dimension)
+    y los documentos se presentan en paralelo en un grupo de procesos, mientras se consulta la dimensión siguiente.
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake.
+    dimensiones (list): Dimensiones a generar (ver DIMENSIONES_LOTE).
+    directorio (str): Carpeta de los documentos y del manifiesto.
+    fecha (str): La fecha de actualización de los informes.
+    year_cerrado (str): Texto con el año cerrado de los informes.
+    year_corrido (str): Texto con el año corrido de los informes.
+    years_cerrado (list): Lista de años cerrados a filtrar.
+    years_corrido (list): Lista de años corridos a filtrar.
+    umbral (int): Umbral mínimo de exportación en USD para considerar una empresa.
+    trabajadores (int): Número de procesos que presentan documentos. Por defecto el número de CPU.
+    max_concurrencia (int): Número máximo de consultas simultáneas a Snowflake.
+    agregado (bool): Si es True, Snowflake devuelve solo las sumas por categoría, miembro y año que necesitan las tablas.
+    imagenes (dict): Imágenes de encabezado y pie de página. Por defecto IMAGENES.
+
+    Pasos del proceso:
+    1. Leer el manifiesto de una ejecución anterior con los mismos parámetros.
+    2. Por dimensión, omitir los miembros terminados y consultar los datos de los pendientes.
+    3. Enviar cada documento al grupo de procesos y registrarlo en el manifiesto cuando termina.
+
+    Retorna:
+    dict: Número de documentos 'generados' y 'omitidos' (ya terminados) y lista de 'errores' (dimensión, miembro, mensaje).
+    """
+    for dimension in dimensiones:
+        if dimension not in DIMENSIONES_LOTE:
+            raise ValueError(f"La dimensión {dimension} no es una de {DIMENSIONES_LOTE}")
+
+    # 1. Manifiesto de avance
+    os.makedirs(directorio, exist_ok=True)
+    ruta_manifiesto = os.path.join(directorio, ARCHIVO_MANIFIESTO)
+    parametros = {'fecha': fecha, 'year_cerrado': year_cerrado, 'year_corrido': year_corrido, 'years_cerrado': list(years_cerrado),
+                  'years_corrido': list(years_corrido), 'umbral': umbral, 'agregado': agregado}
+    manifiesto = cargar_manifiesto(ruta_manifiesto, parametros)
+    parametros_documento = dict(fecha=fecha, year_cerrado=year_cerrado, year_corrido=year_corrido, **(imagenes or IMAGENES))
+    parametros_datos = dict(years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, max_concurrencia=max_concurrencia, agregado=agregado)
+
+    resumen = {'generados': 0, 'omitidos': 0, 'errores': []}
+    avance = {'enviados': 0, 'terminados': 0}
+    candado = threading.Lock()
+
+    # Registrar un documento terminado (se ejecuta en el hilo del grupo de procesos)
+    def registrar(dimension, miembro, archivo, futuro):
+        with candado:
+            avance['terminados'] += 1
+            prefijo = f"[{avance['terminados']}/{avance['enviados']}] {dimension}: {miembro}"
+            if futuro.cancelled():
+                return
+            if futuro.exception() is not None:
+                resumen['errores'].append((dimension, miembro, repr(futuro.exception())))
+                print(f"{prefijo} ERROR {futuro.exception()!r}", flush=True)
+                return
+            manifiesto['documentos'][f'{dimension}|{miembro}'] = {'archivo': archivo, 'segundos': round(futuro.result(), 3),
+                                                                   'terminado': time.strftime('%Y-%m-%d %H:%M:%S')}
+            guardar_manifiesto(ruta_manifiesto, manifiesto)
+            resumen['generados'] += 1
+            print(f"{prefijo} ({futuro.result():.1f} s)", flush=True)
+
+    # Los procesos se inician con 'spawn': no heredan la sesión ni los hilos de Snowflake del proceso principal
+    grupo = ProcessPoolExecutor(max_workers=trabajadores, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        for dimension in dimensiones:
+            tipo = tipo_lote(dimension)
+
+            # 2. Miembros pendientes (si una ejecución anterior ya consultó la lista de miembros de la dimensión)
+            miembros = manifiesto['miembros'].get(dimension)
+            pendientes = None if miembros is None else [miembro for miembro in miembros if not terminado(manifiesto, directorio, dimension, miembro)]
+            if pendientes is not None:
+                resumen['omitidos'] += len(miembros) - len(pendientes)
+                if not pendientes:
+                    print(f"{dimension}: los {len(miembros)} documentos ya están terminados.", flush=True)
+                    continue
+
+            inicio = time.perf_counter()
+            with trazas.traza('lote', dimension, session=session):
+                if dimension == 'colombia':
+                    resultados = {'Colombia': exportaciones.generar_resultados_informe(session, 'colombia', **parametros_datos)}
+                else:
+                    resultados = exportaciones.generar_resultados_dimension(session, dimension, miembros=pendientes, **parametros_datos)
+            if miembros is None:
+                with candado:
+                    manifiesto['miembros'][dimension] = list(resultados)
+                    guardar_manifiesto(ruta_manifiesto, manifiesto)
+            print(f"{dimension}: datos de {len(resultados)} documentos en {time.perf_counter() - inicio:.1f} s", flush=True)
+
+            # 3. Documentos en paralelo
+            for miembro, resultados_miembro in resultados.items():
+                if terminado(manifiesto, directorio, dimension, miembro):
+                    resumen['omitidos'] += 1
+                    continue
+                archivo = nombre_archivo(tipo, miembro)
+                with candado:
+                    avance['enviados'] += 1
+                futuro = grupo.submit(renderizar_informe, tipo, miembro, resultados_miembro, os.path.join(directorio, archivo), parametros_documento)
+                futuro.add_done_callback(partial(registrar, dimension, miembro, archivo))
+        grupo.shutdown(wait=True)
+    except BaseException:
+        # Ante una interrupción, los documentos terminados ya están en el manifiesto; los pendientes se cancelan
+        grupo.shutdown(wait=False, cancel_futures=True)
+        raise
+
+    return resumen
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera en paralelo los documentos Tres Ejes de una o varias dimensiones, retomando ejecuciones interrumpidas.")
+    parser.add_argument('--dimensiones', nargs='+', choices=DIMENSIONES_LOTE, default=DIMENSIONES_LOTE)
+    parser.add_argument('--directorio', default='salida_informes')
+    parser.add_argument('--trabajadores', type=int, default=os.cpu_count())
+    parser.add_argument('--credenciales', default=None, help="Archivo JSON de credenciales (ver conexion.crear_sesion).")
+    parser.add_argument('--fecha', required=True, help="Fecha de actualización (e.g., 'ABRIL 2024').")
+    parser.add_argument('--year-cerrado', required=True, help="Texto del año cerrado (e.g., '2023').")
+    parser.add_argument('--year-corrido', required=True, help="Texto del año corrido (e.g., 'enero - abril 2024').")
+    parser.add_argument('--years-cerrado', nargs=2, required=True)
+    parser.add_argument('--years-corrido', nargs=2, required=True)
+    parser.add_argument('--umbral', type=int, default=10000)
+    parser.add_argument('--max-concurrencia', type=int, default=2)
+    parser.add_argument('--sin-agregado', action='store_true', help="Descargar las exportaciones sin agregar en Snowflake.")
+    args = parser.parse_args()
+
+    sesion = conexion.crear_sesion(args.credenciales)
+    try:
+        resumen = generar_lote(sesion, args.dimensiones, args.directorio, args.fecha, args.year_cerrado, args.year_corrido,
+                               args.years_cerrado, args.years_corrido, umbral=args.umbral, trabajadores=args.trabajadores,
+                               max_concurrencia=args.max_concurrencia, agregado=not args.sin_agregado)
+    finally:
+        sesion.close()
+    print(f"Generados: {resumen['generados']} | ya terminados: {resumen['omitidos']} | errores: {len(resumen['errores'])}", flush=True)
+    sys.exit(1 if resumen['errores'] else 0)
\ No newline at end of file
@@ -10,6 +10,9 @@ import datos_exportaciones as exportaciones
 # Documentos
 import documentos as doc
 
+# Trazas
+import trazas
+
 # Liberias
 import streamlit as st
 import pandas as pd
@@ -89,24 +92,13 @@ years_cerrado = ['2022', '2023']
 zonas_geograficas = None
 tlcs = None
 tipo_tlcss = None
-# Tipos
-tipos_total = ['No Mineras', 'Mineras']
-tipos_nme = ['No Mineras']
 # Umbral de 10000 USD para cuenta de empresa
 umbral = 10000
-# Categorías para tener en cuenta
-categorias_total = ['TIPO']
-categorias_nme = ['SECTOR', 'SUBSECTOR', 'PAIS_DESTINO', 'DEPARTAMENTO_ORIGEN', 'CADENA', 'ZONA_GEOGRAFICA', 'TLCS']
-# Valores a generar tablas
-valores = ['VALOR_USD', 'PESO_KG_NETO']
-# Número de categorías para top x
-top_n_total = None
-top_n_nme = 5
-# Básicos
-continentes_base = None
-paises_base = None
-departamentos_base = None
-hubs_base = None
+# Los tipos, categorías, valores y número de categorías top de cada informe se derivan de su especificación (ver informes.py)
+# Número máximo de consultas simultáneas a Snowflake por informe
+max_concurrencia = 2
+# Pedir a Snowflake solo las sumas por categoría y año que necesitan las tablas
+agregado = True
 
 # Función para volver a pdf con entorno web
 # def convert_to_pdf(docx_path, pdf_path):
@@ -161,34 +153,26 @@ def documentos():
         continente_elegido = st.selectbox('Seleccione un continente:', selectores.selector_continentes(sesion_activa), index=None, placeholder='Elija una opción', help = 'Aquí puede elegir el continente para descargar el informe de interés. Seleccione un único continente para refinar su búsqueda.', key = 'widget_continentes')
         # Después de que el usuario haya elegido un continente se inicia el proceso de carga de datos y generación del informe automáticamente
         if continente_elegido:
-            # Importar bases de datos para el informe
-            # Base total
-            df_total = exportaciones.generar_listas_tablas_definitivas_exportaciones(session=sesion_activa, continentes=continente_elegido, zonas_geograficas=zonas_geograficas,
-                                                                                 paises=paises_base, departamentos=departamentos_base, hubs= hubs_base, 
-                                                                                 tlcs=tlcs, tipo_tlcss=tipo_tlcss, tipos=tipos_total, 
-                                                                                 years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, 
-                                                                                 categorias=categorias_total, valores=valores, top_n=top_n_total)
-            # Base NME
-            df_nme = exportaciones.generar_listas_tablas_definitivas_exportaciones(session=sesion_activa, continentes=continente_elegido, zonas_geograficas=zonas_geograficas,
-                                                                                 paises=paises_base, departamentos=departamentos_base, hubs= hubs_base, 
-                                                                                 tlcs=tlcs, tipo_tlcss=tipo_tlcss, tipos=tipos_nme, 
-                                                                                 years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, 
-                                                                                 categorias=categorias_nme, valores=valores, top_n=top_n_nme)
-            # Generar documento
-            file_path = f"Tres Ejes Continentes - {continente_elegido}.docx"
-            doc.create_document_continentes(df_total=df_total, df_nme=df_nme, file_path=file_path, titulo=continente_elegido, 
-                                               fecha=fecha_actualizacion, 
-                                               header_image_left=r'PRO_PRINCIPAL_HORZ_PNG.png', 
-                                               header_image_right=r'Logo MinCit_Mesa de trabajo 1.png', 
-                                               footer_image=r'Logo_MP_EPDLB2.png', 
-                                               year_cerrado=year_cerrado, year_corrido=year_corrido)
-            with open(file_path, 'rb') as f:
-                doc_bytes = io.BytesIO(f.read())
-            st.download_button(
-                label="Descargar Documento en Microsoft Word",
-                data=doc_bytes,
-                file_name=file_path,
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+            # Medir el informe (tiempos de consultas, del servidor y de etapas, QUERY_TAG de Snowflake); la traza se guarda aunque el informe falle
+            with trazas.traza('continente', continente_elegido, session=sesion_activa):
+                # Importar las tablas que presenta el informe según su especificación (base total y base NME en una sola consulta)
+                resultados = exportaciones.generar_resultados_informe(session=sesion_activa, tipo='continente', entidad=continente_elegido, zonas_geograficas=zonas_geograficas,
+                                                                      tlcs=tlcs, tipo_tlcss=tipo_tlcss, years_cerrado=years_cerrado, years_corrido=years_corrido,
+                                                                      umbral=umbral, max_concurrencia=max_concurrencia, agregado=agregado)
+                # Generar el documento en memoria (sin escribirlo en disco) y ofrecer sus bytes para descarga
+                file_name = f"Tres Ejes Continentes - {continente_elegido}.docx"
+                doc_bytes = io.BytesIO()
+                doc.create_document_continentes(df_total=resultados['total'], df_nme=resultados['nme'], file_path=doc_bytes, titulo=continente_elegido, 
+                                                   fecha=fecha_actualizacion, 
+                                                   header_image_left=r'PRO_PRINCIPAL_HORZ_PNG.png', 
+                                                   header_image_right=r'Logo MinCit_Mesa de trabajo 1.png', 
+                                                   footer_image=r'Logo_MP_EPDLB2.png', 
+                                                   year_cerrado=year_cerrado, year_corrido=year_corrido)
+                st.download_button(
+                    label="Descargar Documento en Microsoft Word",
+                    data=doc_bytes.getvalue(),
+                    file_name=file_name,
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
             # Generar el pdf
             # pdf_file_path = file_path.replace('.docx', '.pdf')
             # convert_to_pdf(file_path, pdf_file_path)
@@ -208,34 +192,26 @@ def documentos():
         hub_elegido = st.selectbox('Seleccione un HUB:', selectores.selector_hubs(sesion_activa), index=None, placeholder='Elija una opción', help = 'Aquí puede elegir el HUB para descargar el informe de interés. Seleccione un único HUB para refinar su búsqueda.', key = 'widget_hubs')
         # Después de que el usuario haya elegido un hub se inicia el proceso de carga de datos y generación del informe automáticamente
         if hub_elegido:
-            # Importar bases de datos para el informe
-            # Base total
-            df_total = exportaciones.generar_listas_tablas_definitivas_exportaciones(session=sesion_activa, continentes=continentes_base, zonas_geograficas=zonas_geograficas,
-                                                                                 paises=paises_base, departamentos=departamentos_base, hubs= hub_elegido, 
-                                                                                 tlcs=tlcs, tipo_tlcss=tipo_tlcss, tipos=tipos_total, 
-                                                                                 years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, 
-                                                                                 categorias=categorias_total, valores=valores, top_n=top_n_total)
-            # Base NME
-            df_nme = exportaciones.generar_listas_tablas_definitivas_exportaciones(session=sesion_activa, continentes=continentes_base, zonas_geograficas=zonas_geograficas,
-                                                                                 paises=paises_base, departamentos=departamentos_base, hubs= hub_elegido, 
-                                                                                 tlcs=tlcs, tipo_tlcss=tipo_tlcss, tipos=tipos_nme, 
-                                                                                 years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, 
-                                                                                 categorias=categorias_nme, valores=valores, top_n=top_n_nme)
-            # Generar documento
-            file_path = f"Tres Ejes HUBs - {hub_elegido}.docx"
-            doc.create_document_hub(df_total=df_total, df_nme=df_nme, file_path=file_path, titulo=hub_elegido, 
-                                               fecha=fecha_actualizacion, 
-                                               header_image_left=r'PRO_PRINCIPAL_HORZ_PNG.png', 
-                                               header_image_right=r'Logo MinCit_Mesa de trabajo 1.png', 
-                                               footer_image=r'Logo_MP_EPDLB2.png', 
-                                               year_cerrado=year_cerrado, year_corrido=year_corrido)
-            with open(file_path, 'rb') as f:
-                doc_bytes = io.BytesIO(f.read())
-            st.download_button(
-                label="Descargar Documento en Microsoft Word",
-                data=doc_bytes,
-                file_name=file_path,
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+            # Medir el informe (tiempos de consultas, del servidor y de etapas, QUERY_TAG de Snowflake); la traza se guarda aunque el informe falle
+            with trazas.traza('hub', hub_elegido, session=sesion_activa):
+                # Importar las tablas que presenta el informe según su especificación (base total y base NME en una sola consulta)
+                resultados = exportaciones.generar_resultados_informe(session=sesion_activa, tipo='hub', entidad=hub_elegido, zonas_geograficas=zonas_geograficas,
+                                                                      tlcs=tlcs, tipo_tlcss=tipo_tlcss, years_cerrado=years_cerrado, years_corrido=years_corrido,
+                                                                      umbral=umbral, max_concurrencia=max_concurrencia, agregado=agregado)
+                # Generar el documento en memoria (sin escribirlo en disco) y ofrecer sus bytes para descarga
+                file_name = f"Tres Ejes HUBs - {hub_elegido}.docx"
+                doc_bytes = io.BytesIO()
+                doc.create_document_hub(df_total=resultados['total'], df_nme=resultados['nme'], file_path=doc_bytes, titulo=hub_elegido, 
+                                                   fecha=fecha_actualizacion, 
+                                                   header_image_left=r'PRO_PRINCIPAL_HORZ_PNG.png', 
+                                                   header_image_right=r'Logo MinCit_Mesa de trabajo 1.png', 
+                                                   footer_image=r'Logo_MP_EPDLB2.png', 
+                                                   year_cerrado=year_cerrado, year_corrido=year_corrido)
+                st.download_button(
+                    label="Descargar Documento en Microsoft Word",
+                    data=doc_bytes.getvalue(),
+                    file_name=file_name,
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
             
     # País
     if eleccion_usuario == "**País:** Explore un informe organizado por país.":
@@ -243,66 +219,50 @@ def documentos():
         pais_elegido = st.selectbox('Seleccione un país:', selectores.selector_paises(sesion_activa, continente_pais), index=None, placeholder='Elija una opción', help = 'Aquí puede elegir el país para descargar el informe de interés. Seleccione un único país para refinar su búsqueda.', key = 'widget_pais')
         # Después de que el usuario haya elegido un país se inicia el proceso de carga de datos y generación del informe automáticamente
         if pais_elegido:
-            # Importar bases de datos para el informe
-            # Base total
-            df_total = exportaciones.generar_listas_tablas_definitivas_exportaciones(session=sesion_activa, continentes=continentes_base, zonas_geograficas=zonas_geograficas,
-                                                                                 paises=pais_elegido, departamentos=departamentos_base, hubs= hubs_base, 
-                                                                                 tlcs=tlcs, tipo_tlcss=tipo_tlcss, tipos=tipos_total, 
-                                                                                 years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, 
-                                                                                 categorias=categorias_total, valores=valores, top_n=top_n_total)
-            # Base NME
-            df_nme = exportaciones.generar_listas_tablas_definitivas_exportaciones(session=sesion_activa, continentes=continentes_base, zonas_geograficas=zonas_geograficas,
-                                                                                 paises=pais_elegido, departamentos=departamentos_base, hubs= hubs_base, 
-                                                                                 tlcs=tlcs, tipo_tlcss=tipo_tlcss, tipos=tipos_nme, 
-                                                                                 years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, 
-                                                                                 categorias=categorias_nme, valores=valores, top_n=top_n_nme)
-            # Generar documento
-            file_path = f"Tres Ejes Países - {pais_elegido}.docx"
-            doc.create_document_pais(df_total=df_total, df_nme=df_nme, file_path=file_path, titulo=pais_elegido, 
-                                               fecha=fecha_actualizacion, 
-                                               header_image_left=r'PRO_PRINCIPAL_HORZ_PNG.png', 
-                                               header_image_right=r'Logo MinCit_Mesa de trabajo 1.png', 
-                                               footer_image=r'Logo_MP_EPDLB2.png', 
-                                               year_cerrado=year_cerrado, year_corrido=year_corrido)
-            with open(file_path, 'rb') as f:
-                doc_bytes = io.BytesIO(f.read())
-            st.download_button(
-                label="Descargar Documento en Microsoft Word",
-                data=doc_bytes,
-                file_name=file_path,
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+            # Medir el informe (tiempos de consultas, del servidor y de etapas, QUERY_TAG de Snowflake); la traza se guarda aunque el informe falle
+            with trazas.traza('pais', pais_elegido, session=sesion_activa):
+                # Importar las tablas que presenta el informe según su especificación (base total y base NME en una sola consulta)
+                resultados = exportaciones.generar_resultados_informe(session=sesion_activa, tipo='pais', entidad=pais_elegido, zonas_geograficas=zonas_geograficas,
+                                                                      tlcs=tlcs, tipo_tlcss=tipo_tlcss, years_cerrado=years_cerrado, years_corrido=years_corrido,
+                                                                      umbral=umbral, max_concurrencia=max_concurrencia, agregado=agregado)
+                # Generar el documento en memoria (sin escribirlo en disco) y ofrecer sus bytes para descarga
+                file_name = f"Tres Ejes Países - {pais_elegido}.docx"
+                doc_bytes = io.BytesIO()
+                doc.create_document_pais(df_total=resultados['total'], df_nme=resultados['nme'], file_path=doc_bytes, titulo=pais_elegido, 
+                                                   fecha=fecha_actualizacion, 
+                                                   header_image_left=r'PRO_PRINCIPAL_HORZ_PNG.png', 
+                                                   header_image_right=r'Logo MinCit_Mesa de trabajo 1.png', 
+                                                   footer_image=r'Logo_MP_EPDLB2.png', 
+                                                   year_cerrado=year_cerrado, year_corrido=year_corrido)
+                st.download_button(
+                    label="Descargar Documento en Microsoft Word",
+                    data=doc_bytes.getvalue(),
+                    file_name=file_name,
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
             
 
     # Colombia 
     if eleccion_usuario =="**Colombia:** Explore un informe organizado de Colombia.":
-        # Importar bases de datos para el informe
-            # Base total
-            df_total = exportaciones.generar_listas_tablas_definitivas_exportaciones(session=sesion_activa, continentes=continentes_base, zonas_geograficas=zonas_geograficas,
-                                                                                 paises=paises_base, departamentos=departamentos_base, hubs= hubs_base, 
-                                                                                 tlcs=tlcs, tipo_tlcss=tipo_tlcss, tipos=tipos_total, 
-                                                                                 years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, 
-                                                                                 categorias=categorias_total, valores=valores, top_n=top_n_total)
-            # Base NME
-            df_nme = exportaciones.generar_listas_tablas_definitivas_exportaciones(session=sesion_activa, continentes=continentes_base, zonas_geograficas=zonas_geograficas,
-                                                                                 paises=paises_base, departamentos=departamentos_base, hubs= hubs_base, 
-                                                                                 tlcs=tlcs, tipo_tlcss=tipo_tlcss, tipos=tipos_nme, 
-                                                                                 years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, 
-                                                                                 categorias=categorias_nme, valores=valores, top_n=top_n_nme)
-            # Generar documento
-            file_path = f"Tres Ejes Colombia.docx"
-            doc.create_document_colombia(df_total=df_total, df_nme=df_nme, file_path=file_path,
-                                               fecha=fecha_actualizacion, 
-                                               header_image_left=r'PRO_PRINCIPAL_HORZ_PNG.png', 
-                                               header_image_right=r'Logo MinCit_Mesa de trabajo 1.png', 
-                                               footer_image=r'Logo_MP_EPDLB2.png', 
-                                               year_cerrado=year_cerrado, year_corrido=year_corrido)
-            with open(file_path, 'rb') as f:
-                doc_bytes = io.BytesIO(f.read())
-            st.download_button(
-                label="Descargar Documento en Microsoft Word",
-                data=doc_bytes,
-                file_name=file_path,
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+            # Medir el informe (tiempos de consultas, del servidor y de etapas, QUERY_TAG de Snowflake); la traza se guarda aunque el informe falle
+            with trazas.traza('colombia', session=sesion_activa):
+                # Importar las tablas que presenta el informe según su especificación (base total y base NME en una sola consulta)
+                resultados = exportaciones.generar_resultados_informe(session=sesion_activa, tipo='colombia', zonas_geograficas=zonas_geograficas,
+                                                                      tlcs=tlcs, tipo_tlcss=tipo_tlcss, years_cerrado=years_cerrado, years_corrido=years_corrido,
+                                                                      umbral=umbral, max_concurrencia=max_concurrencia, agregado=agregado)
+                # Generar el documento en memoria (sin escribirlo en disco) y ofrecer sus bytes para descarga
+                file_name = f"Tres Ejes Colombia.docx"
+                doc_bytes = io.BytesIO()
+                doc.create_document_colombia(df_total=resultados['total'], df_nme=resultados['nme'], file_path=doc_bytes,
+                                                   fecha=fecha_actualizacion, 
+                                                   header_image_left=r'PRO_PRINCIPAL_HORZ_PNG.png', 
+                                                   header_image_right=r'Logo MinCit_Mesa de trabajo 1.png', 
+                                                   footer_image=r'Logo_MP_EPDLB2.png', 
+                                                   year_cerrado=year_cerrado, year_corrido=year_corrido)
+                st.download_button(
+                    label="Descargar Documento en Microsoft Word",
+                    data=doc_bytes.getvalue(),
+                    file_name=file_name,
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
             
 
     # Departamento
@@ -310,34 +270,26 @@ def documentos():
         departamento_elegido = st.selectbox('Seleccione un departamento:', selectores.selector_departamento(sesion_activa), index=None, placeholder='Elija una opción', help = 'Aquí puede elegir el departamento para descargar el informe de interés. Seleccione un único departamento para refinar su búsqueda.', key = 'widget_departamentos')
         # Después de que el usuario haya elegido un país se inicia el proceso de carga de datos y generación del informe automáticamente
         if departamento_elegido:
-            # Importar bases de datos para el informe
-            # Base total
-            df_total = exportaciones.generar_listas_tablas_definitivas_exportaciones(session=sesion_activa, continentes=continentes_base, zonas_geograficas=zonas_geograficas,
-                                                                                 paises=paises_base, departamentos=departamento_elegido, hubs= hubs_base, 
-                                                                                 tlcs=tlcs, tipo_tlcss=tipo_tlcss, tipos=tipos_total, 
-                                                                                 years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, 
-                                                                                 categorias=categorias_total, valores=valores, top_n=top_n_total)
-            # Base NME
-            df_nme = exportaciones.generar_listas_tablas_definitivas_exportaciones(session=sesion_activa, continentes=continentes_base, zonas_geograficas=zonas_geograficas,
-                                                                                 paises=paises_base, departamentos=departamento_elegido, hubs= hubs_base, 
-                                                                                 tlcs=tlcs, tipo_tlcss=tipo_tlcss, tipos=tipos_nme, 
-                                                                                 years_cerrado=years_cerrado, years_corrido=years_corrido, umbral=umbral, 
-                                                                                 categorias=categorias_nme, valores=valores, top_n=top_n_nme)
-            # Generar documento
-            file_path = f"Tres Ejes Departamentos - {departamento_elegido}.docx"
-            doc.create_document_departamento(df_total=df_total, df_nme=df_nme, file_path=file_path, titulo=departamento_elegido, 
-                                               fecha=fecha_actualizacion, 
-                                               header_image_left=r'PRO_PRINCIPAL_HORZ_PNG.png', 
-                                               header_image_right=r'Logo MinCit_Mesa de trabajo 1.png', 
-                                               footer_image=r'Logo_MP_EPDLB2.png', 
-                                               year_cerrado=year_cerrado, year_corrido=year_corrido)
-            with open(file_path, 'rb') as f:
-                doc_bytes = io.BytesIO(f.read())
-            st.download_button(
-                label="Descargar Documento en Microsoft Word",
-                data=doc_bytes,
-                file_name=file_path,
-                mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+            # Medir el informe (tiempos de consultas, del servidor y de etapas, QUERY_TAG de Snowflake); la traza se guarda aunque el informe falle
+            with trazas.traza('departamento', departamento_elegido, session=sesion_activa):
+                # Importar las tablas que presenta el informe según su especificación (base total y base NME en una sola consulta)
+                resultados = exportaciones.generar_resultados_informe(session=sesion_activa, tipo='departamento', entidad=departamento_elegido, zonas_geograficas=zonas_geograficas,
+                                                                      tlcs=tlcs, tipo_tlcss=tipo_tlcss, years_cerrado=years_cerrado, years_corrido=years_corrido,
+                                                                      umbral=umbral, max_concurrencia=max_concurrencia, agregado=agregado)
+                # Generar el documento en memoria (sin escribirlo en disco) y ofrecer sus bytes para descarga
+                file_name = f"Tres Ejes Departamentos - {departamento_elegido}.docx"
+                doc_bytes = io.BytesIO()
+                doc.create_document_departamento(df_total=resultados['total'], df_nme=resultados['nme'], file_path=doc_bytes, titulo=departamento_elegido, 
+                                                   fecha=fecha_actualizacion, 
+                                                   header_image_left=r'PRO_PRINCIPAL_HORZ_PNG.png', 
+                                                   header_image_right=r'Logo MinCit_Mesa de trabajo 1.png', 
+                                                   footer_image=r'Logo_MP_EPDLB2.png', 
+                                                   year_cerrado=year_cerrado, year_corrido=year_corrido)
+                st.download_button(
+                    label="Descargar Documento en Microsoft Word",
+                    data=doc_bytes.getvalue(),
+                    file_name=file_name,
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document")
             
 #########
 # Fuentes
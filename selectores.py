@@ -8,46 +8,95 @@ import numpy as np
 import time
 import re
 import warnings
+import threading
+import conexion
+import consultas
 
 ###############################################################
 # FUNCIONES PARA GENERAR LAS OPCIONES DE ELECCIÓN PARA USUARIOS
 ###############################################################
 
-# Selector de continentes
-def selector_continentes(session):
+# Tiempo en segundos antes de volver a consultar el catálogo de opciones (6 horas)
+INTERVALO_ACTUALIZACION_CATALOGO = 6 * 60 * 60
+
+# Catálogo de opciones en memoria (uno por proceso)
+_catalogo = None
+_catalogo_creado = 0
+_catalogo_lock = threading.Lock()
+
+# Función para obtener el catálogo de opciones de todos los selectores
+def obtener_catalogo(session, forzar=False):
     """
-    Esta función ejecuta una consulta SQL para obtener una lista de continentes distintos
-    desde la base de datos de exportaciones en Snowflake y los devuelve como una lista de opciones ordenada.
+    Obtiene en una sola consulta los valores de continentes, países, hubs y departamentos, y la jerarquía continente -> país.
+    El resultado se guarda en memoria y solo se vuelve a consultar cuando pasa INTERVALO_ACTUALIZACION_CATALOGO.
 
     Parámetros:
     - session: objeto de conexión activo a Snowflake.
+    - forzar: si es True, vuelve a consultar Snowflake aunque el catálogo no haya vencido.
 
     Retorna:
-    - opciones: Lista de continentes distintos ordenada alfabéticamente.
+    - catalogo: diccionario con las listas ordenadas 'continentes', 'paises', 'hubs' y 'departamentos',
+      y el índice 'paises_por_continente' (continente -> lista ordenada de países).
     """
+    global _catalogo, _catalogo_creado
+
+    with _catalogo_lock:
+        if _catalogo is not None and not forzar and time.time() - _catalogo_creado < INTERVALO_ACTUALIZACION_CATALOGO:
+            return _catalogo
+
+        # 1. Construir la consulta SQL con un conjunto de agrupación por selector
+        tabla = consultas.tabla_exportaciones(session, ['CONTINENTE', 'PAIS_DESTINO', 'HUB', 'DEPARTAMENTO_ORIGEN'])
+        query = f"""
+        SELECT A.CONTINENTE,
+            A.PAIS_DESTINO,
+            A.HUB,
+            A.DEPARTAMENTO_ORIGEN,
+            GROUPING(A.CONTINENTE) AS SIN_CONTINENTE,
+            GROUPING(A.HUB) AS SIN_HUB,
+            GROUPING(A.DEPARTAMENTO_ORIGEN) AS SIN_DEPARTAMENTO
+        FROM {tabla} AS A
+        GROUP BY GROUPING SETS ((A.CONTINENTE, A.PAIS_DESTINO), (A.HUB), (A.DEPARTAMENTO_ORIGEN))
+        """
+
+        # 2. Ejecutar la consulta SQL y convertir los resultados en un DataFrame de pandas
+        data = conexion.ejecutar_consulta(session, query)
+
+        # 3. Construir las listas de opciones y el índice continente -> países
+        geografia = data[data['SIN_CONTINENTE'] == 0]
+        paises_por_continente = {}
+        for continente, pais in zip(geografia['CONTINENTE'], geografia['PAIS_DESTINO']):
+            if continente is not None and pais is not None:
+                paises_por_continente.setdefault(continente, set()).add(pais)
+
+        _catalogo = {
+            'continentes': sorted(continente for continente in paises_por_continente if continente != 'No Declarados'),
+            'paises': sorted(set(geografia['PAIS_DESTINO'].dropna())),
+            'hubs': sorted(set(data.loc[data['SIN_HUB'] == 0, 'HUB'].dropna())),
+            'departamentos': sorted(set(data.loc[data['SIN_DEPARTAMENTO'] == 0, 'DEPARTAMENTO_ORIGEN'].dropna())),
+            'paises_por_continente': {continente: sorted(paises) for continente, paises in paises_por_continente.items()},
+        }
+        _catalogo_creado = time.time()
+        return _catalogo
 
-    # 1. Construir la consulta SQL base
-    query = """
-    SELECT DISTINCT A.CONTINENTE
-    FROM DOCUMENTOS_COLOMBIA.EXPORTACIONES.BASE_EXPORTACIONES AS A
-    WHERE A.CONTINENTE NOT IN ('No Declarados')
-    ORDER BY 1 ASC
+# Selector de continentes
+def selector_continentes(session):
     """
+    Esta función devuelve la lista de continentes distintos (excepto 'No Declarados') de la base de datos de exportaciones,
+    a partir del catálogo de opciones en memoria.
 
-    # 2. Ejecutar la consulta SQL y convertir los resultados en un DataFrame de pandas
-    data = session.sql(query).collect()
-
-    # 3. Convertir los resultados en una lista de opciones ordenada
-    opciones = sorted({row['CONTINENTE'] for row in data})
+    Parámetros:
+    - session: objeto de conexión activo a Snowflake.
 
-    # 4. Devolver la lista de opciones
-    return opciones
+    Retorna:
+    - opciones: Lista de continentes distintos ordenada alfabéticamente.
+    """
+    return list(obtener_catalogo(session)['continentes'])
 
 # Selector de HUBS
 def selector_hubs(session):
     """
-    Esta función ejecuta una consulta SQL para obtener una lista de hubs distintos
-    desde la base de datos de exportaciones en Snowflake y los devuelve como una lista de opciones ordenada.
+    Esta función devuelve la lista de hubs distintos de la base de datos de exportaciones,
+    a partir del catálogo de opciones en memoria.
 
     Parámetros:
     - session: objeto de conexión activo a Snowflake.
@@ -55,83 +104,36 @@ def selector_hubs(session):
     Retorna:
     - opciones: Lista de hubs distintos ordenada alfabéticamente.
     """
-
-    # 1. Construir la consulta SQL base
-    query = """
-    SELECT DISTINCT A.HUB
-    FROM DOCUMENTOS_COLOMBIA.EXPORTACIONES.BASE_EXPORTACIONES AS A
-    ORDER BY 1 ASC
-    """
-
-    # 2. Ejecutar la consulta SQL y convertir los resultados en un DataFrame de pandas
-    data = session.sql(query).collect()
-
-    # 3. Convertir los resultados en una lista de opciones ordenada
-    opciones = sorted({row['HUB'] for row in data})
-
-    # 4. Devolver la lista de opciones
-    return opciones
+    return list(obtener_catalogo(session)['hubs'])
 
 # Selector de países
 def selector_paises(session, continentes):
     """
-    Esta función ejecuta una consulta SQL para obtener una lista de países distintos
-    desde la base de datos de exportaciones en Snowflake y los devuelve como una lista de opciones ordenada.
+    Esta función devuelve la lista de países distintos de la base de datos de exportaciones, a partir del índice
+    continente -> países del catálogo de opciones en memoria.
 
     Parámetros:
     - session: objeto de conexión activo a Snowflake.
-    - continentes: lista de strings con los continentes seleccionados para filtrar los países de interés.
+    - continentes: continente seleccionado para filtrar los países de interés. Si es None se devuelven todos los países.
 
     Retorna:
     - opciones: Lista de países distintos ordenada alfabéticamente.
     """
-    # 0. Transformar lista de continentes 
-    continente_pais_list = [continentes] if continentes else []
-
-    # 1. Construir la consulta SQL base
-    query = """
-    SELECT DISTINCT A.PAIS_DESTINO
-    FROM DOCUMENTOS_COLOMBIA.EXPORTACIONES.BASE_EXPORTACIONES AS A
-    WHERE 1=1
-    """
-    # Agrupación geográfica: 
-    if continentes:
-        query += f""" AND A.CONTINENTE IN ({','.join([f"'{continente}'" for continente in continente_pais_list])})"""
-
-    # 2. Ejecutar la consulta SQL y convertir los resultados en un DataFrame de pandas
-    data = session.sql(query).collect()
-
-    # 3. Convertir los resultados en una lista de opciones ordenada
-    opciones = sorted({row['PAIS_DESTINO'] for row in data})
-
-    # 4. Devolver la lista de opciones
-    return opciones
+    catalogo = obtener_catalogo(session)
+    if not continentes:
+        return list(catalogo['paises'])
+    return list(catalogo['paises_por_continente'].get(continentes, []))
 
 # Selector de departamentos
 def selector_departamento(session):
     """
-    Esta función ejecuta una consulta SQL para obtener una lista de departamentos distintos
-    desde la base de datos de exportaciones en Snowflake y los devuelve como una lista de opciones ordenada.
+    Esta función devuelve la lista de departamentos de origen distintos de la base de datos de exportaciones,
+    a partir del catálogo de opciones en memoria.
 
     Parámetros:
     - session: objeto de conexión activo a Snowflake.
 
     Retorna:
-    - opciones: Lista de hubs distintos ordenada alfabéticamente.
-    """
-
-    # 1. Construir la consulta SQL base
-    query = """
-    SELECT DISTINCT A.DEPARTAMENTO_ORIGEN
-    FROM DOCUMENTOS_COLOMBIA.EXPORTACIONES.BASE_EXPORTACIONES AS A
-    ORDER BY 1 ASC
+    - opciones: Lista de departamentos distintos ordenada alfabéticamente.
     """
-
-    # 2. Ejecutar la consulta SQL y convertir los resultados en un DataFrame de pandas
-    data = session.sql(query).collect()
-
-    # 3. Convertir los resultados en una lista de opciones ordenada
-    opciones = sorted({row['DEPARTAMENTO_ORIGEN'] for row in data})
-
-    # 4. Devolver la lista de opciones
-    return opciones
\ No newline at end of file
+    return list(obtener_catalogo(session)['departamentos'])
\ No newline at end of file
@@ -0,0 +1,233 @@
+# Librerias
+import os
+import json
+import time
+import uuid
+import functools
+import contextlib
+import contextvars
+from collections import deque
+
+#########################################################
+# FUNCIONES PARA MEDIR CONSULTAS Y ETAPAS DE CADA INFORME
+#########################################################
+
+# Prefijo del QUERY_TAG de todas las consultas de la aplicación
+PREFIJO_QUERY_TAG = 'documentos_colombia'
+# Número máximo de trazas de informes y de consultas sin informe que se guardan en memoria
+MAXIMO_TRAZAS = 200
+# Archivo JSON Lines donde se agregan las trazas terminadas (opcional)
+ARCHIVO_TRAZAS = os.environ.get('DOCUMENTOS_TRAZAS_ARCHIVO')
+
+# Trazas terminadas y consultas ejecutadas fuera de un informe
+TRAZAS = deque(maxlen=MAXIMO_TRAZAS)
+CONSULTAS_SIN_INFORME = deque(maxlen=MAXIMO_TRAZAS)
+
+# Traza del informe en curso (se propaga a los hilos con contextvars.copy_context)
+_traza_actual = contextvars.ContextVar('traza_actual', default=None)
+
+# Función para iniciar la traza de un informe
+def iniciar_traza(tipo, entidad=None):
+    """
+    Inicia la traza de un informe. Las consultas y etapas que se ejecuten a continuación (también en hilos
+    lanzados con ejecutar_concurrente) se registran en ella y llevan su QUERY_TAG.
+
+    Parámetros:
+    tipo (str): Tipo de informe (e.g., 'continente', 'hub', 'pais', 'departamento', 'colombia').
+    entidad (str): Entidad del informe (e.g., 'América').
+
+    Retorna:
+    dict: Traza del informe.
+    """
+    traza = {
+        'id': uuid.uuid4().hex,
+        'tipo': tipo,
+        'entidad': entidad,
+        'query_tag': ':'.join(str(parte) for parte in [PREFIJO_QUERY_TAG, tipo, entidad] if parte),
+        'inicio': time.time(),
+        'segundos': None,
+        'consultas': [],
+        'etapas': {},
+    }
+    _traza_actual.set(traza)
+    return traza
+
+# Función para terminar la traza de un informe
+def finalizar_traza(traza=None, session=None):
+    """
+    Termina la traza de un informe, la guarda en TRAZAS (y en ARCHIVO_TRAZAS si está definido).
+
+    Parámetros:
+    traza (dict): Traza a terminar. Por defecto la traza en curso.
+    session (snowflake.snowpark.Session): Sesión que ejecutó las consultas. Si se entrega, las consultas se completan con
+        los tiempos de compilación, cola, ejecución y descarga del servidor (ver completar_tiempos_servidor).
+
+    Retorna:
+    dict: Traza terminada o None si no había traza.
+    """
+    traza = traza or _traza_actual.get()
+    if traza is None:
+        return None
+    traza['segundos'] = time.time() - traza['inicio']
+    if _traza_actual.get() is traza:
+        _traza_actual.set(None)
+    if session is not None:
+        # Los tiempos del servidor son informativos: si el historial no está disponible, la traza se guarda sin ellos
+        try:
+            completar_tiempos_servidor(session, traza)
+        except Exception as error:
+            traza['error_tiempos_servidor'] = repr(error)
+    TRAZAS.append(traza)
+    if ARCHIVO_TRAZAS:
+        with open(ARCHIVO_TRAZAS, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(traza, ensure_ascii=False, default=str) + '\n')
+    return traza
+
+# Contexto para medir un informe: la traza se termina y se guarda aunque el informe falle
+@contextlib.contextmanager
+def traza(tipo, entidad=None, session=None):
+    """
+    Inicia la traza de un informe al entrar y la termina al salir, también cuando el informe lanza una excepción
+    (que queda registrada en la llave 'error'), de modo que el siguiente informe no herede la traza en curso.
+
+    Parámetros:
+    tipo (str): Tipo de informe (ver iniciar_traza).
+    entidad (str): Entidad del informe.
+    session (snowflake.snowpark.Session): Sesión para completar los tiempos del servidor (ver finalizar_traza).
+
+    Retorna:
+    dict: Traza del informe (con "with trazas.traza(...) as traza").
+    """
+    traza_informe = iniciar_traza(tipo, entidad)
+    try:
+        yield traza_informe
+    except BaseException as error:
+        traza_informe['error'] = repr(error)
+        raise
+    finally:
+        finalizar_traza(traza_informe, session)
+
+# Función para obtener el QUERY_TAG de las consultas
+def query_tag():
+    """
+    Retorna:
+    str: QUERY_TAG del informe en curso o el prefijo de la aplicación si no hay informe.
+    """
+    traza = _traza_actual.get()
+    return traza['query_tag'] if traza else PREFIJO_QUERY_TAG
+
+# Función para registrar una consulta
+def registrar_consulta(registro):
+    """
+    Agrega el registro de una consulta a la traza en curso (o a CONSULTAS_SIN_INFORME).
+
+    Parámetros:
+    registro (dict): Datos de la consulta (ver conexion.ejecutar_consulta).
+    """
+    traza = _traza_actual.get()
+    if traza is None:
+        CONSULTAS_SIN_INFORME.append(registro)
+    else:
+        traza['consultas'].append(registro)
+
+# Función para registrar la duración de una etapa
+def registrar_etapa(nombre, segundos):
+    """
+    Acumula la duración y el número de llamadas de una etapa (e.g., una función de pandas o de python-docx) en la traza en curso.
+
+    Parámetros:
+    nombre (str): Nombre de la etapa.
+    segundos (float): Duración de la llamada.
+    """
+    traza = _traza_actual.get()
+    if traza is None:
+        return
+    etapa = traza['etapas'].setdefault(nombre, {'llamadas': 0, 'segundos': 0.0})
+    etapa['llamadas'] += 1
+    etapa['segundos'] += segundos
+
+# Decorador para medir una función como etapa de la traza en curso
+def medir(funcion):
+    """
+    Envuelve una función para registrar su duración como etapa de la traza en curso.
+
+    Parámetros:
+    funcion (callable): Función a medir.
+
+    Retorna:
+    callable: Función con el mismo contrato.
+    """
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            registrar_etapa(funcion.__name__, time.perf_counter() - inicio)
+    return envoltura
+
+# Función para consultar las trazas guardadas
+def obtener_trazas(tipo=None, entidad=None):
+    """
+    Devuelve las trazas terminadas, opcionalmente filtradas por tipo de informe y entidad.
+
+    Parámetros:
+    tipo (str): Tipo de informe.
+    entidad (str): Entidad del informe.
+
+    Retorna:
+    list: Trazas (diccionarios), de la más antigua a la más reciente.
+    """
+    return [traza for traza in TRAZAS
+            if (tipo is None or traza['tipo'] == tipo) and (entidad is None or traza['entidad'] == entidad)]
+
+# Función para obtener las consultas más lentas de una traza
+def consultas_lentas(traza, n=5):
+    """
+    Parámetros:
+    traza (dict): Traza de un informe.
+    n (int): Número de consultas a devolver.
+
+    Retorna:
+    list: Las n consultas con mayor tiempo total, de la más lenta a la más rápida.
+    """
+    return sorted(traza['consultas'], key=lambda consulta: consulta['segundos_total'], reverse=True)[:n]
+
+# Función para completar las consultas de una traza con los tiempos del servidor
+def completar_tiempos_servidor(session, traza):
+    """
+    Completa cada consulta de la traza con los tiempos de compilación, cola y ejecución y los bytes escaneados
+    que reporta Snowflake en QUERY_HISTORY_BY_SESSION. El tiempo de descarga se estima como el tiempo total
+    en el cliente menos el tiempo en el servidor.
+
+    Parámetros:
+    session (snowflake.snowpark.Session): Sesión activa en Snowflake (la misma que ejecutó las consultas).
+    traza (dict): Traza de un informe.
+
+    Retorna:
+    dict: La misma traza, completada.
+    """
+    ids = [consulta['query_id'] for consulta in traza['consultas'] if consulta.get('query_id')]
+    if not ids:
+        return traza
+
+    # 1. Consultar el historial de la sesión (los tiempos vienen en milisegundos)
+    marcadores = ', '.join(['?'] * len(ids))
+    query = f"""
+    SELECT QUERY_ID, COMPILATION_TIME, QUEUED_OVERLOAD_TIME + QUEUED_PROVISIONING_TIME AS QUEUED_TIME, EXECUTION_TIME, BYTES_SCANNED
+    FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION(RESULT_LIMIT => 10000))
+    WHERE QUERY_ID IN ({marcadores})
+    """
+    historial = {fila['QUERY_ID']: fila for fila in session.sql(query, params=ids).to_pandas().to_dict('records')}
+
+    # 2. Completar cada consulta
+    for consulta in traza['consultas']:
+        fila = historial.get(consulta.get('query_id'))
+        if fila is None:
+            continue
+        consulta['segundos_compilacion'] = fila['COMPILATION_TIME'] / 1000
+        consulta['segundos_cola'] = fila['QUEUED_TIME'] / 1000
+        consulta['segundos_ejecucion'] = fila['EXECUTION_TIME'] / 1000
+        consulta['bytes_escaneados'] = fila['BYTES_SCANNED']
+        consulta['segundos_descarga'] = max(consulta['segundos_total'] - (fila['COMPILATION_TIME'] + fila['QUEUED_TIME'] + fila['EXECUTION_TIME']) / 1000, 0)
+    return traza
\ No newline at end of file